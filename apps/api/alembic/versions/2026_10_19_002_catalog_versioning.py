@@ -0,0 +1,35 @@
+"""catalog versioning — カタログ差分同期用のハッシュとバージョン管理
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('config_items', sa.Column('content_hash', sa.String(64)))
+
+    op.create_table(
+        'catalog_versions',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('catalog_hash', sa.String(64), nullable=False),
+        sa.Column('inserted_count', sa.Integer(), server_default='0'),
+        sa.Column('updated_count', sa.Integer(), server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_catalog_versions_id', 'catalog_versions', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
+    op.drop_column('config_items', 'content_hash')
@@ -0,0 +1,28 @@
+"""catalog modules — 設定項目のモジュール区分とプロジェクトの対象モジュール
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('config_items', sa.Column('module', sa.String(20)))
+    op.create_index('ix_config_items_module', 'config_items', ['module'])
+    op.add_column('projects', sa.Column('modules', sa.JSON()))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'modules')
+    op.drop_index('ix_config_items_module', table_name='config_items')
+    op.drop_column('config_items', 'module')
@@ -0,0 +1,101 @@
+"""answer versions — 回答・決定事項の追記専用の版管理
+
+既存の回答を各設定項目の最新版として、既存の決定事項（同じ設定項目に複数ある場合は
+古いものも）を版として取り込み、decisions は設定項目ごとに最新の1行に絞る。
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    answer_versions = op.create_table(
+        'answer_versions',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('config_item_id', sa.String(50), sa.ForeignKey('config_items.id'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('answer_values', sa.JSON()),
+        sa.Column('decision_title', sa.String(255)),
+        sa.Column('decision_rationale', sa.Text()),
+        sa.Column('decision_impact', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_answer_versions_id', 'answer_versions', ['id'])
+    op.create_index(
+        'ix_answer_versions_item_version', 'answer_versions',
+        ['project_id', 'config_item_id', 'version'], unique=True
+    )
+    op.create_index('ix_answer_versions_project_revision', 'answer_versions', ['project_id', 'revision'])
+    op.create_index('ix_answers_project_config_item', 'answers', ['project_id', 'config_item_id'])
+
+    # 既存データを版として取り込む
+    conn = op.get_bind()
+    projects = sa.table('projects', sa.column('id'), sa.column('revision'))
+    answers = sa.table(
+        'answers', sa.column('project_id'), sa.column('config_item_id'),
+        sa.column('input_name'), sa.column('value', sa.JSON()), sa.column('created_at', sa.DateTime())
+    )
+    decisions = sa.table(
+        'decisions', sa.column('id'), sa.column('project_id'), sa.column('config_item_id'),
+        sa.column('title'), sa.column('rationale'), sa.column('impact'), sa.column('created_at', sa.DateTime())
+    )
+    revisions = dict(conn.execute(sa.select(projects.c.id, projects.c.revision)).fetchall())
+
+    current_values = {}
+    answered_at = {}
+    for row in conn.execute(sa.select(answers).order_by(answers.c.created_at)):
+        key = (row.project_id, row.config_item_id)
+        current_values.setdefault(key, {})[row.input_name] = row.value
+        answered_at.setdefault(key, row.created_at)
+
+    decisions_by_item = {}
+    for row in conn.execute(sa.select(decisions).order_by(decisions.c.created_at, decisions.c.id)):
+        decisions_by_item.setdefault((row.project_id, row.config_item_id), []).append(row)
+
+    rows = []
+    superseded = []
+    for key in sorted(set(current_values) | set(decisions_by_item)):
+        project_id, config_item_id = key
+        history = decisions_by_item.get(key) or [None]
+        superseded.extend(decision.id for decision in history[:-1])
+        for version, decision in enumerate(history, 1):
+            latest = version == len(history)
+            rows.append({
+                'project_id': project_id,
+                'config_item_id': config_item_id,
+                'version': version,
+                'revision': revisions.get(project_id, 1),
+                'answer_values': current_values.get(key) if latest else None,
+                'decision_title': decision.title if decision else None,
+                'decision_rationale': decision.rationale if decision else None,
+                'decision_impact': decision.impact if decision else None,
+                'created_at': decision.created_at if decision else answered_at.get(key),
+            })
+    if rows:
+        op.bulk_insert(answer_versions, rows)
+    if superseded:
+        conn.execute(sa.delete(decisions).where(decisions.c.id.in_(superseded)))
+
+    op.create_index(
+        'ix_decisions_project_config_item', 'decisions',
+        ['project_id', 'config_item_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_decisions_project_config_item', table_name='decisions')
+    op.drop_index('ix_answers_project_config_item', table_name='answers')
+    op.drop_table('answer_versions')
@@ -0,0 +1,88 @@
+"""artifact blobs — 成果物本文の圧縮・重複排除保存
+
+既存の成果物の本文を gzip で圧縮して artifact_blobs に移し（同じ内容は1件にまとめる）、
+artifacts は本文のハッシュで参照する。
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+import gzip
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    artifact_blobs = op.create_table(
+        'artifact_blobs',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('encoding', sa.String(10), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.add_column('artifacts', sa.Column('content_hash', sa.String(64)))
+
+    # 既存の本文を圧縮して移す
+    conn = op.get_bind()
+    artifacts = sa.table('artifacts', sa.column('id'), sa.column('content'), sa.column('content_hash'))
+    stored = set()
+    for row in conn.execute(sa.select(artifacts.c.id, artifacts.c.content)):
+        data = (row.content or '').encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        if content_hash not in stored:
+            conn.execute(artifact_blobs.insert().values(
+                content_hash=content_hash,
+                encoding='gzip',
+                data=gzip.compress(data, compresslevel=6, mtime=0),
+                size=len(data),
+            ))
+            stored.add(content_hash)
+        conn.execute(
+            artifacts.update().where(artifacts.c.id == row.id).values(content_hash=content_hash)
+        )
+
+    op.alter_column('artifacts', 'content_hash', nullable=False)
+    op.create_foreign_key(
+        'fk_artifacts_content_hash', 'artifacts', 'artifact_blobs', ['content_hash'], ['content_hash']
+    )
+    op.create_index('ix_artifacts_content_hash', 'artifacts', ['content_hash'])
+    op.create_index(
+        'ix_artifacts_project_type_created', 'artifacts', ['project_id', 'artifact_type', 'created_at']
+    )
+    op.drop_column('artifacts', 'content')
+
+
+def downgrade() -> None:
+    op.add_column('artifacts', sa.Column('content', sa.Text()))
+
+    conn = op.get_bind()
+    artifact_blobs = sa.table(
+        'artifact_blobs', sa.column('content_hash'), sa.column('encoding'), sa.column('data', sa.LargeBinary())
+    )
+    artifacts = sa.table('artifacts', sa.column('content'), sa.column('content_hash'))
+    for row in conn.execute(sa.select(artifact_blobs)):
+        if row.encoding != 'gzip':
+            import zstandard
+            content = zstandard.ZstdDecompressor().decompress(row.data).decode('utf-8')
+        else:
+            content = gzip.decompress(row.data).decode('utf-8')
+        conn.execute(
+            artifacts.update().where(artifacts.c.content_hash == row.content_hash).values(content=content)
+        )
+
+    op.alter_column('artifacts', 'content', nullable=False)
+    op.drop_index('ix_artifacts_project_type_created', table_name='artifacts')
+    op.drop_index('ix_artifacts_content_hash', table_name='artifacts')
+    op.drop_constraint('fk_artifacts_content_hash', 'artifacts', type_='foreignkey')
+    op.drop_column('artifacts', 'content_hash')
+    op.drop_table('artifact_blobs')
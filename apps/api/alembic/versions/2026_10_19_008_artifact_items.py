@@ -0,0 +1,33 @@
+"""artifact items — 成果物の行ごとの出力（版間の差分用）
+
+行ごとの出力のJSONを artifact_blobs に保存し、artifacts から参照する。
+既存の成果物には記録が無い（NULL）ため、差分を取るには再生成が必要。
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('artifacts', sa.Column('items_hash', sa.String(64)))
+    op.create_foreign_key(
+        'fk_artifacts_items_hash', 'artifacts', 'artifact_blobs', ['items_hash'], ['content_hash']
+    )
+    op.create_index('ix_artifacts_items_hash', 'artifacts', ['items_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_artifacts_items_hash', table_name='artifacts')
+    op.drop_constraint('fk_artifacts_items_hash', 'artifacts', type_='foreignkey')
+    op.drop_column('artifacts', 'items_hash')
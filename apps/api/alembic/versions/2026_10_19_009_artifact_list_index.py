@@ -0,0 +1,23 @@
+"""artifact list index — 成果物一覧のキーセット方式のページング用インデックス
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_artifacts_project_created', 'artifacts', ['project_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_artifacts_project_created', table_name='artifacts')
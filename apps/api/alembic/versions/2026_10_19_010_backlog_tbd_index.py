@@ -0,0 +1,23 @@
+"""backlog tbd index — 未決定（未回答）のバックログ項目の集計用インデックス
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_backlog_items_project_answered', 'backlog_items', ['project_id', 'answered'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_backlog_items_project_answered', table_name='backlog_items')
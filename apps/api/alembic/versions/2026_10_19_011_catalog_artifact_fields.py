@@ -0,0 +1,29 @@
+"""catalog artifact fields — テスト観点・移行オブジェクトをカタログから読む
+
+Test View の固有テスト観点と Migration View の移行オブジェクト名を
+設定項目の列として持つ（値は次回のカタログ反映で入る）。
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('config_items', sa.Column('test_perspectives', sa.JSON()))
+    op.add_column('config_items', sa.Column('migration_object', sa.String(255)))
+
+
+def downgrade() -> None:
+    op.drop_column('config_items', 'migration_object')
+    op.drop_column('config_items', 'test_perspectives')
@@ -0,0 +1,155 @@
+"""
+成果物生成のベンチマーク
+
+合成カタログの全項目をバックログに載せ、一部に回答・決定事項を付けたプロジェクトで、
+成果物の種類ごとのレンダリング時間と、項目単位のフラグメントキャッシュが効いた状態での
+再生成時間（変更なし / 回答を1件変更）を計測する。
+
+使い方:
+    cd apps/api
+    python benchmarks/bench_artifact_render.py --items 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from synthetic import make_catalog
+
+
+def _timed(label, func, repeat=5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    size = f"  ({len(result) / 1024:,.0f} KiB)" if isinstance(result, str) else ""
+    print(f"{label:<40} {best * 1000:10.1f} ms{size}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--answered', type=float, default=0.5, help="fraction of items answered")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        import models
+        from database import Base
+        from services.catalog_loader import sync_catalog
+        from services.artifact_generator import ArtifactGenerator
+        from services.artifact_fragments import get_fragment_cache
+        from config import get_settings
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'artifacts.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+
+        items = make_catalog(args.items, modules=['FI', 'CO', 'MM'])
+        for i, item in enumerate(items):
+            if i % 5 == 0:
+                item['produces'] = item['produces'] + ['MIGRATION_VIEW']
+        sync_catalog(db, items)
+        project = models.Project(name="bench")
+        db.add(project)
+        db.commit()
+        project_id = project.id
+
+        answered_count = int(args.items * args.answered)
+        rng = random.Random(0)
+        db.execute(insert(models.BacklogItem), [
+            {'project_id': project_id, 'config_item_id': item['id'],
+             'status': models.BacklogStatus.DONE if i < answered_count else models.BacklogStatus.BLOCKED,
+             'answered': i < answered_count, 'status_revision': 0}
+            for i, item in enumerate(items)
+        ])
+        db.execute(insert(models.Answer), [
+            {'project_id': project_id, 'config_item_id': item['id'], 'input_name': name, 'value': value}
+            for item in items[:answered_count]
+            for name, value in (('choice', 'A'), ('memo', ['x', 'y']))
+        ])
+        db.execute(insert(models.Decision), [
+            {'project_id': project_id, 'config_item_id': item['id'], 'title': f"{item['title']}の決定",
+             'rationale': "choice: A; memo: x, y", 'impact': item['description']}
+            for item in items[:answered_count]
+        ])
+        db.commit()
+        print(f"backlog: {args.items} items, {answered_count} answered")
+        print()
+
+        fragment_cache = get_fragment_cache()
+
+        def load():
+            db.expunge_all()
+            return ArtifactGenerator(db, project_id)
+
+        def render(method):
+            def run():
+                fragment_cache.clear()  # 項目単位のフラグメントを使わずに計測
+                generator = ArtifactGenerator(db, project_id)
+                generator._build_context()
+                start = time.perf_counter()
+                content = getattr(generator, method)()
+                return time.perf_counter() - start, content
+            best = min((run() for _ in range(3)), key=lambda result: result[0])
+            label = method.replace('generate_', '').replace('_', ' ')
+            print(f"{label:<40} {best[0] * 1000:10.1f} ms"
+                  f"  ({len(best[1]) / 1024:,.0f} KiB)")
+
+        _timed("load generator data", load, repeat=3)
+
+        def build_context():
+            fragment_cache.clear()
+            return load()._build_context()
+
+        _timed("build template context (cold)", build_context, repeat=3)
+        for method in ('generate_decision_log', 'generate_config_workbook', 'generate_test_view',
+                       'generate_migration_view'):
+            render(method)
+        print()
+
+        def generate_all_cold():
+            fragment_cache.clear()
+            return load().generate_all()
+
+        _timed("load + generate_all (cold cache)", generate_all_cold, repeat=3)
+        settings = get_settings()
+        workers = settings.artifact_render_workers
+        settings.artifact_render_workers = 4
+        _timed("load + generate_all (cold, 4 threads)", generate_all_cold, repeat=3)
+        settings.artifact_render_workers = workers
+        _timed("load + generate_all (no changes)", lambda: load().generate_all())
+
+        # 回答を1件ずつ変えながら再生成（変わった項目の行だけを再レンダリングする）
+        changed = iter(range(1_000_000))
+
+        def change_one_answer():
+            item = items[next(changed) % answered_count]
+            db.execute(
+                update(models.Answer)
+                .where(models.Answer.project_id == project_id, models.Answer.config_item_id == item['id'],
+                       models.Answer.input_name == 'choice')
+                .values(value=rng.choice(['A', 'B', 'C']) + str(next(changed)))
+            )
+            db.commit()
+            return load().generate_all()
+
+        _timed("load + generate_all (1 answer changed)", change_one_answer)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+成果物保存のベンチマーク
+
+合成カタログのプロジェクトで回答を1件ずつ変えながら成果物を --versions 回生成して保存し、
+本文をそのまま保存した場合との保存サイズ、圧縮形式ごとの保存時間・復元（展開）時間と、
+版間の差分（行単位・キャッシュあり）と Markdown 全体のテキスト差分の時間を計測する。
+
+使い方:
+    cd apps/api
+    python benchmarks/bench_artifact_storage.py --items 5000 --versions 20
+"""
+import argparse
+import difflib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from synthetic import make_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--versions', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        import crud
+        import models
+        from config import get_settings
+        from database import Base
+        from services.catalog_loader import sync_catalog
+        from services.artifact_generator import ArtifactGenerator
+        from services import artifact_storage
+        from services.artifact_diff import diff_artifacts, get_diff_cache
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'artifacts.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+
+        items = make_catalog(args.items, modules=['FI', 'CO', 'MM'])
+        sync_catalog(db, items)
+        project = models.Project(name="bench")
+        db.add(project)
+        db.commit()
+        project_id = project.id
+
+        answered_count = args.items // 2
+        db.execute(insert(models.BacklogItem), [
+            {'project_id': project_id, 'config_item_id': item['id'],
+             'status': models.BacklogStatus.DONE if i < answered_count else models.BacklogStatus.BLOCKED,
+             'answered': i < answered_count, 'status_revision': 0}
+            for i, item in enumerate(items)
+        ])
+        db.execute(insert(models.Answer), [
+            {'project_id': project_id, 'config_item_id': item['id'], 'input_name': 'choice', 'value': 'A'}
+            for item in items[:answered_count]
+        ])
+        db.commit()
+
+        # 回答を1件ずつ変えた版を生成しておく
+        versions = []
+        for version in range(args.versions):
+            db.execute(
+                update(models.Answer)
+                .where(models.Answer.project_id == project_id, models.Answer.config_item_id == items[version]['id'])
+                .values(value=f"B{version}")
+            )
+            db.commit()
+            generator = ArtifactGenerator(db, project_id)
+            generated = generator.generate_all()
+            versions.append([
+                (t, content, tbd_count, generator.item_fragments[t]) for t, (content, tbd_count) in generated.items()
+            ])
+        raw_bytes = sum(len(content.encode('utf-8')) for version in versions for _, content, _, _ in version)
+        print(f"backlog: {args.items} items, {args.versions} versions x {len(versions[0])} types")
+        print(f"{'plain text (previous schema)':<32} {raw_bytes / 1024:12,.0f} KiB")
+        print()
+
+        settings = get_settings()
+        for encoding in (artifact_storage.GZIP, artifact_storage.ZSTD):
+            if encoding == artifact_storage.ZSTD:
+                try:
+                    artifact_storage._zstandard()
+                except ImportError:
+                    print(f"{encoding}: zstandard is not installed, skipped")
+                    continue
+            settings.artifact_compression = encoding
+            db.query(models.Artifact).delete()
+            db.query(models.ArtifactBlob).delete()
+            db.commit()
+
+            start = time.perf_counter()
+            for version in versions:
+                crud.create_artifacts(db, project_id, version)
+            store = (time.perf_counter() - start) / len(versions)
+            stored_bytes = db.scalar(select(func.sum(func.length(models.ArtifactBlob.data))))
+            blob_count = db.scalar(select(func.count()).select_from(models.ArtifactBlob))
+
+            artifacts = crud.get_artifacts(db, project_id)
+            start = time.perf_counter()
+            for artifact in artifacts:
+                artifact.content
+            restore = (time.perf_counter() - start) / len(artifacts)
+            start = time.perf_counter()
+            for artifact in artifacts:
+                for _ in artifact_storage.iter_decompressed(artifact.blob.encoding, artifact.blob.data):
+                    pass
+            stream = (time.perf_counter() - start) / len(artifacts)
+
+            print(f"{encoding}: {blob_count} blobs for {len(artifacts)} artifacts")
+            print(f"{'  stored size':<32} {stored_bytes / 1024:12,.0f} KiB  ({raw_bytes / stored_bytes:.1f}x)")
+            print(f"{'  store one generation':<32} {store * 1000:12.1f} ms")
+            print(f"{'  restore one artifact':<32} {restore * 1000:12.2f} ms")
+            print(f"{'  stream one artifact':<32} {stream * 1000:12.2f} ms")
+
+        # 直近の2つの版の Config Workbook の差分
+        new, old = [a for a in artifacts if a.artifact_type == models.ArtifactType.CONFIG_WORKBOOK][:2]
+        print()
+        get_diff_cache().clear()
+        start = time.perf_counter()
+        result = diff_artifacts(old, new)
+        print(f"{'diff by item (cold)':<32} {(time.perf_counter() - start) * 1000:12.1f} ms"
+              f"  ({len(result['items'])} changed, {result['unchanged']} unchanged)")
+        start = time.perf_counter()
+        diff_artifacts(old, new)
+        print(f"{'diff by item (cached)':<32} {(time.perf_counter() - start) * 1000:12.3f} ms")
+        start = time.perf_counter()
+        list(difflib.unified_diff(old.content.splitlines(), new.content.splitlines(), lineterm=''))
+        print(f"{'text diff of whole Markdown':<32} {(time.perf_counter() - start) * 1000:12.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+カタログ起動時ロードのベンチマーク
+
+YAMLパース（SafeLoader / CSafeLoader）とコンパイル済みスナップショットの
+読込時間、およびDBへの初回同期・差分なし同期の時間を比較する。
+
+使い方:
+    cd apps/api
+    python benchmarks/bench_catalog_startup.py --items 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import yaml
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from synthetic import make_catalog
+
+
+def _timed(label, func, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, 'catalog.yml')
+        snapshot_path = os.path.join(tmp, 'catalog.snapshot.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(make_catalog(args.items, modules=['FI', 'CO', 'MM']), f, allow_unicode=True)
+
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        from database import Base
+        from services.catalog_loader import sync_catalog
+        from services.catalog_snapshot import compile_catalog, load_snapshot
+
+        print(f"catalog: {args.items} items, {os.path.getsize(catalog_path) / 1024:.0f} KiB")
+
+        def parse_with(loader):
+            with open(catalog_path, 'r', encoding='utf-8') as f:
+                return yaml.load(f, Loader=loader)
+
+        _timed("yaml SafeLoader", lambda: parse_with(yaml.SafeLoader), repeat=1)
+        if hasattr(yaml, 'CSafeLoader'):
+            _timed("yaml CSafeLoader", lambda: parse_with(yaml.CSafeLoader))
+        _timed("compile snapshot", lambda: compile_catalog(catalog_path, snapshot_path), repeat=1)
+        items = _timed("load snapshot", lambda: load_snapshot(catalog_path, snapshot_path))
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'sync.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        def sync():
+            db = Session()
+            try:
+                return sync_catalog(db, items)
+            finally:
+                db.close()
+
+        _timed("sync into empty database", sync, repeat=1)
+        _timed("sync unchanged catalog", sync)
+
+
+if __name__ == "__main__":
+    main()
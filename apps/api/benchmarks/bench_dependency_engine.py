@@ -0,0 +1,150 @@
+"""
+依存関係エンジンのベンチマーク
+
+合成カタログの全項目をバックログに載せたプロジェクトで、
+ORMオブジェクトを読み込む場合とコンパクトな配列状態（EngineState）の
+メモリ使用量・読込時間・ステータス再計算のスループットを比較する。
+
+使い方:
+    cd apps/api
+    python benchmarks/bench_dependency_engine.py --items 10000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from synthetic import make_catalog
+
+
+def _timed(label, func, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} {best * 1000:10.1f} ms")
+    return result
+
+
+def _measured(label, func):
+    """tracemallocで保持メモリを計測（戻り値を保持したまま）"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {current / 1024 / 1024:10.2f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--answered', type=float, default=0.3, help="fraction of items answered")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        import crud
+        import models
+        from database import Base
+        from services.catalog_loader import sync_catalog
+        from services.catalog_graph import get_catalog_graph
+        from services.dependency_engine import DependencyEngine
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'engine.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+
+        items = make_catalog(args.items, modules=['FI', 'CO', 'MM'])
+        sync_catalog(db, items)
+        project = models.Project(name="bench")
+        db.add(project)
+        db.commit()
+        project_id = project.id
+
+        answered_count = int(args.items * args.answered)
+        db.execute(insert(models.BacklogItem), [
+            {'project_id': project_id, 'config_item_id': item['id'], 'status': models.BacklogStatus.PENDING,
+             'answered': False, 'status_revision': 0}
+            for item in items
+        ])
+        db.execute(insert(models.Answer), [
+            {'project_id': project_id, 'config_item_id': item['id'], 'input_name': 'choice', 'value': 'A'}
+            for item in items[:answered_count]
+        ])
+        db.commit()
+        print(f"backlog: {args.items} items, {answered_count} answered")
+        print()
+
+        _timed("compile catalog graph (cold)", lambda: get_catalog_graph(db), repeat=1)
+
+        def load_orm():
+            db.expunge_all()
+            return (
+                crud.get_answers(db, project_id),
+                crud.get_backlog_items(db, project_id),
+                crud.get_config_items(db),
+            )
+
+        def load_engine():
+            db.expunge_all()
+            return DependencyEngine(db, project_id)
+
+        orm_state = _measured("ORM objects (answers/backlog/items)", load_orm)
+        del orm_state
+        dependency_engine = _measured("compact engine state", load_engine)
+        print()
+
+        _timed("load ORM objects", load_orm)
+        _timed("load engine state", load_engine)
+
+        state = dependency_engine.state
+        elapsed = None
+        for _ in range(3):
+            scratch = state.copy()
+            start = time.perf_counter()
+            scratch.recompute()
+            elapsed = min(elapsed, time.perf_counter() - start) if elapsed else time.perf_counter() - start
+        print(f"{'recompute statuses':<36} {elapsed * 1000:10.1f} ms  ({args.items / elapsed:,.0f} items/s)")
+
+        try:
+            from services.engine_sparse import SparseReadiness
+        except ImportError:
+            print(f"{'recompute statuses (numpy)':<36} {'skipped (numpy/scipy not installed)':>10}")
+        else:
+            readiness = _timed("build sparse matrices", lambda: SparseReadiness(state.graph), repeat=1)
+            for label, beginner in (("recompute statuses (numpy)", False), ("recompute statuses (numpy, BEGINNER)", True)):
+                scratch = state.copy()
+                scratch.beginner = beginner
+                _timed(label, lambda: readiness.recompute(scratch.copy()))
+        _timed("copy state", state.copy)
+        _timed("update_backlog_statuses (first)", dependency_engine.update_backlog_statuses, repeat=1)
+        _timed("update_backlog_statuses (no diff)", dependency_engine.update_backlog_statuses)
+
+        # 保存済みステータスが最新の状態で、仮定の回答を評価
+        scenario = [item['id'] for item in items[answered_count:answered_count + 5]]
+        dependency_engine.simulate(scenario)
+        start = time.perf_counter()
+        for _ in range(100):
+            dependency_engine.simulate(scenario)
+        elapsed = (time.perf_counter() - start) / 100
+        print(f"{'simulate 5 hypothetical answers':<36} {elapsed * 1000:10.3f} ms  ({1 / elapsed:,.0f} scenarios/s)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+ベンチマーク用の合成カタログ生成
+"""
+import random
+from typing import List, Dict, Any
+
+
+def make_catalog(size: int, modules: List[str] = None, max_deps: int = 3, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    DAG構造の合成カタログを生成
+
+    各項目は自分より前の項目にのみ依存するため循環は発生しない。
+
+    Args:
+        size: 設定項目数
+        modules: モジュール接頭辞（例: ['FI', 'CO', 'MM']）
+        max_deps: 1項目あたりの最大依存数
+        seed: 乱数シード
+
+    Returns:
+        fi_core.yml と同じ構造のアイテムのリスト
+    """
+    rng = random.Random(seed)
+    modules = modules or ['FI']
+    ids = [f"{modules[i % len(modules)]}-SYN-{i:06d}" for i in range(size)]
+
+    items = []
+    for i, item_id in enumerate(ids):
+        window = ids[max(0, i - 50):i]
+        depends_on = rng.sample(window, min(len(window), rng.randint(0, max_deps)))
+        items.append({
+            'id': item_id,
+            'title': f"合成設定項目 {i}",
+            'priority': 'P0' if i % 10 == 0 else 'P1',
+            'description': f"ベンチマーク用の合成項目 {i}",
+            'beginner_mode': i % 4 != 0,
+            'inputs': [
+                {'name': 'choice', 'type': 'select', 'options': ['A', 'B', 'C']},
+                {'name': 'memo', 'type': 'string'},
+            ],
+            'depends_on': depends_on,
+            'produces': ['DECISION_LOG', 'CONFIG_WORKBOOK'],
+        })
+    return items
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -7,6 +8,8 @@ class Settings(BaseSettings):
     
     # データベース
     database_url: str = "postgresql://postgres:postgres@db:5432/imgquest"
+    database_replica_urls: list[str] = []  # リードレプリカ（空の場合は全てプライマリ）
+    replica_sticky_seconds: float = 5.0  # 書き込み後に読み取りをプライマリに固定する時間（秒）
     
     # アプリケーション
     app_name: str = "IMG-Quest API"
@@ -16,7 +19,38 @@ class Settings(BaseSettings):
     cors_origins: list[str] = ["http://localhost:3000", "http://web:3000"]
     
     # カタログ
-    catalog_path: str = "/app/catalogue/fi_core.yml"
+    catalog_path: str = "/app/catalogue/fi_core.yml"  # ファイル・ディレクトリ・グロブ（例: /app/catalogue/*.yml）
+    catalog_snapshot_dir: Optional[str] = None  # 省略時はカタログと同じディレクトリ
+    catalog_watch: bool = False  # カタログファイルの変更を監視して自動再読込
+    catalog_watch_interval: float = 2.0  # 監視間隔（秒）
+    
+    # イベント配信（SSE）のバックエンド: memory（プロセス内）/ postgres（LISTEN/NOTIFY）
+    event_backend: str = "memory"
+    
+    # 依存関係エンジンのステータス判定: python（純Python）/ numpy（NumPy/SciPy の疎行列、大規模カタログ向け）
+    engine_backend: str = "python"
+    
+    # 成果物テンプレート（Jinja2）の追加ディレクトリ。同名のテンプレートは組み込みより優先され、
+    # 新しいファイルを置くと独自の成果物として出力できる
+    artifact_template_dir: Optional[str] = None
+    artifact_fragment_cache_size: int = 20000  # 項目単位でキャッシュする成果物の行数（0で無効）
+    # 成果物の種類ごとに並列レンダリングするスレッド数（1以下で逐次）。
+    # Markdown テンプレートは GIL を離さないため、GIL を離す・別プロセスに渡す重い種類がある場合に増やす
+    artifact_render_workers: int = 1
+    # 成果物本文の圧縮形式: gzip / zstd（zstandard パッケージが必要）
+    artifact_compression: str = "gzip"
+    artifact_keep_versions: int = 20  # 成果物の種類ごとに残す版数（0で無制限）
+    artifact_diff_cache_size: int = 256  # キャッシュする成果物の版間の差分の数（0で無効）
+    # 成果物のPDFをレンダリングするプロセス数と、受け付けるレンダリング待ちの上限（超えたら503）
+    artifact_pdf_workers: int = 2
+    artifact_pdf_max_pending: int = 8
+    artifact_pdf_cache_size: int = 32  # キャッシュするPDFの数（0で無効）
+    
+    # 表形式エクスポート（CSV / Parquet）で DB から1回に読む行数（Parquet の行グループの行数）
+    export_batch_size: int = 1000
+    
+    # バックログ整合性ジョブ（保存済みステータスのずれを修復）
+    backlog_repair_interval: float = 0.0  # 実行間隔（秒）。0の場合は起動時のみ
     
     class Config:
         env_file = ".env"
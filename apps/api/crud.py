@@ -1,5 +1,9 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import insert, update, delete, func, select, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from datetime import datetime
+from typing import List, Optional, Tuple, Dict
+import json
 import models
 import schemas
 
@@ -16,6 +20,11 @@ def get_projects(db: Session, skip: int = 0, limit: int = 100) -> List[models.Pr
     return db.query(models.Project).offset(skip).limit(limit).all()
 
 
+def get_project_names(db: Session) -> list:
+    """全プロジェクトの (id, name)"""
+    return db.execute(select(models.Project.id, models.Project.name).order_by(models.Project.id)).all()
+
+
 def create_project(db: Session, project: schemas.ProjectCreate) -> models.Project:
     """プロジェクトを作成"""
     db_project = models.Project(**project.model_dump())
@@ -34,12 +43,34 @@ def update_project(db: Session, project_id: int, project_update: schemas.Project
     update_data = project_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_project, key, value)
+    db_project.revision = models.Project.revision + 1
     
     db.commit()
     db.refresh(db_project)
     return db_project
 
 
+def bump_project_revision(db: Session, project_id: int, commit: bool = True) -> int:
+    """
+    プロジェクトのリビジョンを加算（回答・バックログ・プロジェクトの変更時）
+    
+    条件付きGET（ETag）の判定に使う単調増加の番号。
+    プロジェクトの行をロックしてから加算するため、commit=False の場合は
+    同じトランザクションの残りの書き込みがコミットされるまで他の加算を待たせる。
+    """
+    db.query(models.Project.id).filter(models.Project.id == project_id).with_for_update().scalar()
+    db.query(models.Project).filter(models.Project.id == project_id).update(
+        {
+            models.Project.revision: models.Project.revision + 1,
+            models.Project.updated_at: datetime.utcnow()
+        },
+        synchronize_session=False
+    )
+    if commit:
+        db.commit()
+    return db.query(models.Project.revision).filter(models.Project.id == project_id).scalar()
+
+
 def delete_project(db: Session, project_id: int) -> bool:
     """プロジェクトを削除"""
     db_project = get_project(db, project_id)
@@ -58,9 +89,35 @@ def get_config_item(db: Session, config_item_id: str) -> Optional[models.ConfigI
     return db.query(models.ConfigItem).filter(models.ConfigItem.id == config_item_id).first()
 
 
-def get_config_items(db: Session) -> List[models.ConfigItem]:
-    """設定項目一覧を取得"""
-    return db.query(models.ConfigItem).all()
+def get_config_items(db: Session, modules: Optional[List[str]] = None) -> List[models.ConfigItem]:
+    """設定項目一覧を取得（modulesを指定した場合はそのモジュールのみ）"""
+    query = db.query(models.ConfigItem)
+    if modules is not None:
+        query = query.filter(models.ConfigItem.module.in_(modules))
+    return query.all()
+
+
+def get_config_item_graph_rows(db: Session) -> List[Tuple]:
+    """依存関係グラフの構築に必要な列のみを取得（ORMオブジェクトを作らない）"""
+    return db.query(
+        models.ConfigItem.id,
+        models.ConfigItem.title,
+        models.ConfigItem.priority,
+        models.ConfigItem.module,
+        models.ConfigItem.beginner_mode,
+        models.ConfigItem.depends_on
+    ).all()
+
+
+def get_config_items_by_ids(db: Session, config_item_ids: List[str]) -> List[models.ConfigItem]:
+    """指定したIDの設定項目を、指定順で取得"""
+    if not config_item_ids:
+        return []
+    items = {
+        item.id: item
+        for item in db.query(models.ConfigItem).filter(models.ConfigItem.id.in_(config_item_ids))
+    }
+    return [items[item_id] for item_id in config_item_ids if item_id in items]
 
 
 def create_config_item(db: Session, config_item_data: dict) -> models.ConfigItem:
@@ -69,6 +126,7 @@ def create_config_item(db: Session, config_item_data: dict) -> models.ConfigItem
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    _invalidate_catalog_cache()
     return db_item
 
 
@@ -78,13 +136,68 @@ def upsert_config_item(db: Session, config_item_data: dict) -> models.ConfigItem
     if existing:
         for key, value in config_item_data.items():
             setattr(existing, key, value)
+        if 'content_hash' not in config_item_data:
+            existing.content_hash = None  # 内容と一致しなくなったハッシュは残さない
         db.commit()
         db.refresh(existing)
+        _invalidate_catalog_cache()
         return existing
     else:
         return create_config_item(db, config_item_data)
 
 
+def get_config_item_hashes(db: Session) -> Dict[str, Optional[str]]:
+    """設定項目ID → コンテンツハッシュの辞書を取得"""
+    return dict(db.query(models.ConfigItem.id, models.ConfigItem.content_hash).all())
+
+
+def get_catalog_version(db: Session) -> Optional[models.CatalogVersion]:
+    """現在のカタログバージョンを取得"""
+    return db.query(models.CatalogVersion).order_by(models.CatalogVersion.id.desc()).first()
+
+
+def get_catalog_version_number(db: Session) -> int:
+    """現在のカタログバージョン番号を取得（未ロード時は0）"""
+    return db.query(func.coalesce(func.max(models.CatalogVersion.id), 0)).scalar()
+
+
+def apply_catalog_changes(
+    db: Session,
+    inserts: List[dict],
+    updates: List[dict],
+    catalog_hash: str
+) -> models.CatalogVersion:
+    """
+    カタログの差分を1トランザクションで反映し、バージョンを更新
+    
+    追加・変更された設定項目のみを一括INSERT/UPDATEする。
+    """
+    try:
+        if inserts:
+            db.execute(insert(models.ConfigItem), inserts)
+        if updates:
+            db.execute(update(models.ConfigItem), updates)
+        version = models.CatalogVersion(
+            catalog_hash=catalog_hash,
+            inserted_count=len(inserts),
+            updated_count=len(updates)
+        )
+        db.add(version)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(version)
+    _invalidate_catalog_cache()
+    return version
+
+
+def _invalidate_catalog_cache():
+    """設定項目の変更時にプロセス内のカタログキャッシュを破棄"""
+    from services.catalog_graph import invalidate_catalog_cache
+    invalidate_catalog_cache()
+
+
 # ========== Answer CRUD ==========
 
 def get_answers(db: Session, project_id: int) -> List[models.Answer]:
@@ -92,6 +205,24 @@ def get_answers(db: Session, project_id: int) -> List[models.Answer]:
     return db.query(models.Answer).filter(models.Answer.project_id == project_id).all()
 
 
+def get_answer_rows(db: Session, project_id: int) -> List[Tuple]:
+    """回答を列単位で取得（config_item_id, input_name, value）。登録順"""
+    return db.query(
+        models.Answer.config_item_id,
+        models.Answer.input_name,
+        models.Answer.value
+    ).filter(models.Answer.project_id == project_id).order_by(models.Answer.id).all()
+
+
+def get_answered_config_ids(db: Session, project_id: int) -> List[str]:
+    """回答済みの設定項目IDを取得"""
+    return [
+        row[0] for row in db.query(models.Answer.config_item_id).filter(
+            models.Answer.project_id == project_id
+        ).distinct()
+    ]
+
+
 def get_answers_by_config_item(db: Session, project_id: int, config_item_id: str) -> List[models.Answer]:
     """特定の設定項目に対する回答を取得"""
     return db.query(models.Answer).filter(
@@ -112,6 +243,109 @@ def create_answer(db: Session, project_id: int, answer: schemas.AnswerCreate) ->
     return db_answer
 
 
+def save_answer_version(
+    db: Session,
+    project_id: int,
+    config_item_id: str,
+    values: Dict[str, object],
+    decision: schemas.DecisionCreate
+) -> Tuple[models.AnswerVersion, models.Decision]:
+    """
+    回答と決定事項を新しい版として保存（コミットは1回）
+    
+    プロジェクトのリビジョンを加算し、版を answer_versions に追記して
+    現在値（answers / decisions）を置き換える。決定事項は設定項目ごとに1行を更新する。
+    リビジョンの加算で取ったプロジェクト行のロックにより同じプロジェクトへの同時送信は
+    順に処理されるが、ロックの無いDB（SQLite）で版番号が衝突した場合は1回だけやり直す。
+    
+    Returns:
+        (追記した版, 決定事項)。記録したリビジョンは版の revision
+    """
+    for attempt in range(2):
+        try:
+            revision = bump_project_revision(db, project_id, commit=False)
+            latest = db.query(func.max(models.AnswerVersion.version)).filter(
+                models.AnswerVersion.project_id == project_id,
+                models.AnswerVersion.config_item_id == config_item_id
+            ).scalar()
+            db_version = models.AnswerVersion(
+                project_id=project_id,
+                config_item_id=config_item_id,
+                version=(latest or 0) + 1,
+                revision=revision,
+                answer_values=values,
+                decision_title=decision.title,
+                decision_rationale=decision.rationale,
+                decision_impact=decision.impact
+            )
+            db.add(db_version)
+            
+            db.execute(delete(models.Answer).where(
+                models.Answer.project_id == project_id,
+                models.Answer.config_item_id == config_item_id
+            ))
+            if values:
+                db.execute(insert(models.Answer), [
+                    {'project_id': project_id, 'config_item_id': config_item_id, 'input_name': name, 'value': value}
+                    for name, value in values.items()
+                ])
+            
+            db_decision = get_decision_by_config_item(db, project_id, config_item_id)
+            if db_decision is None:
+                db_decision = models.Decision(project_id=project_id, **decision.model_dump())
+                db.add(db_decision)
+            else:
+                for key, value in decision.model_dump().items():
+                    setattr(db_decision, key, value)
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+        except Exception:
+            db.rollback()
+            raise
+    db.refresh(db_version)
+    db.refresh(db_decision)
+    return db_version, db_decision
+
+
+def get_answer_versions(db: Session, project_id: int, config_item_id: str) -> List[models.AnswerVersion]:
+    """設定項目の全ての版を取得（古い順）"""
+    return db.query(models.AnswerVersion).filter(
+        models.AnswerVersion.project_id == project_id,
+        models.AnswerVersion.config_item_id == config_item_id
+    ).order_by(models.AnswerVersion.version).all()
+
+
+def get_answer_versions_as_of(
+    db: Session,
+    project_id: int,
+    revision: int,
+    config_item_id: Optional[str] = None
+) -> List[models.AnswerVersion]:
+    """指定したプロジェクトリビジョン時点の、設定項目ごとの最新の版を取得"""
+    latest = db.query(
+        models.AnswerVersion.config_item_id,
+        func.max(models.AnswerVersion.version).label('version')
+    ).filter(
+        models.AnswerVersion.project_id == project_id,
+        models.AnswerVersion.revision <= revision
+    )
+    if config_item_id is not None:
+        latest = latest.filter(models.AnswerVersion.config_item_id == config_item_id)
+    latest = latest.group_by(models.AnswerVersion.config_item_id).subquery()
+    
+    return db.query(models.AnswerVersion).join(
+        latest,
+        (models.AnswerVersion.config_item_id == latest.c.config_item_id)
+        & (models.AnswerVersion.version == latest.c.version)
+    ).filter(
+        models.AnswerVersion.project_id == project_id
+    ).order_by(models.AnswerVersion.config_item_id).all()
+
+
 # ========== Decision CRUD ==========
 
 def get_decisions(db: Session, project_id: int) -> List[models.Decision]:
@@ -121,6 +355,32 @@ def get_decisions(db: Session, project_id: int) -> List[models.Decision]:
     ).order_by(models.Decision.created_at.desc()).all()
 
 
+def get_decision_rows(db: Session, project_id: int) -> List[Tuple]:
+    """
+    決定事項を列単位で取得（get_decisions と同じ順）
+    
+    (config_item_id, title, rationale, impact, status, created_at)
+    """
+    return db.query(
+        models.Decision.config_item_id,
+        models.Decision.title,
+        models.Decision.rationale,
+        models.Decision.impact,
+        models.Decision.status,
+        models.Decision.created_at
+    ).filter(
+        models.Decision.project_id == project_id
+    ).order_by(models.Decision.created_at.desc()).all()
+
+
+def get_decision_by_config_item(db: Session, project_id: int, config_item_id: str) -> Optional[models.Decision]:
+    """設定項目の現在の決定事項を取得"""
+    return db.query(models.Decision).filter(
+        models.Decision.project_id == project_id,
+        models.Decision.config_item_id == config_item_id
+    ).first()
+
+
 def create_decision(db: Session, project_id: int, decision: schemas.DecisionCreate) -> models.Decision:
     """決定事項を作成"""
     db_decision = models.Decision(
@@ -136,10 +396,28 @@ def create_decision(db: Session, project_id: int, decision: schemas.DecisionCrea
 # ========== BacklogItem CRUD ==========
 
 def get_backlog_items(db: Session, project_id: int) -> List[models.BacklogItem]:
-    """プロジェクトのバックログ一覧を取得"""
+    """プロジェクトのバックログ一覧を取得（追加順）"""
     return db.query(models.BacklogItem).filter(
         models.BacklogItem.project_id == project_id
-    ).all()
+    ).order_by(models.BacklogItem.id).all()
+
+
+def get_backlog_rows(db: Session, project_id: int) -> List[Tuple]:
+    """バックログの状態のみを列単位で取得（id, config_item_id, status, answered, status_revision、追加順）"""
+    return db.query(
+        models.BacklogItem.id,
+        models.BacklogItem.config_item_id,
+        models.BacklogItem.status,
+        models.BacklogItem.answered,
+        models.BacklogItem.status_revision
+    ).filter(models.BacklogItem.project_id == project_id).order_by(models.BacklogItem.id).all()
+
+
+def update_backlog_states(db: Session, changes: List[dict]):
+    """バックログアイテムの状態を主キー指定で一括更新（コミットは1回）"""
+    if changes:
+        db.execute(update(models.BacklogItem), changes)
+        db.commit()
 
 
 def get_backlog_item(db: Session, project_id: int, item_id: int) -> Optional[models.BacklogItem]:
@@ -164,8 +442,74 @@ def create_backlog_item(db: Session, project_id: int, config_item_id: str) -> mo
     return db_item
 
 
-def update_backlog_item(db: Session, item_id: int, update: schemas.BacklogItemUpdate) -> Optional[models.BacklogItem]:
-    """バックログアイテムを更新"""
+def create_backlog_items(
+    db: Session,
+    project_id: int,
+    entries: List[Tuple[str, models.BacklogStatus]],
+    revision: int = 0
+) -> List[models.BacklogItem]:
+    """バックログアイテムを初期ステータス付きで一括作成（コミットは1回）"""
+    db_items = [
+        models.BacklogItem(
+            project_id=project_id,
+            config_item_id=config_item_id,
+            status=item_status,
+            answered=item_status == models.BacklogStatus.DONE,
+            status_revision=revision
+        )
+        for config_item_id, item_status in entries
+    ]
+    db.add_all(db_items)
+    db.commit()
+    return db_items
+
+
+def replace_backlog_scope(
+    db: Session,
+    project_id: int,
+    add_config_item_ids: List[str],
+    remove_config_item_ids: List[str]
+) -> int:
+    """
+    対象モジュールの変更に合わせてバックログアイテムを追加・削除（コミットは1回）
+    
+    プロジェクトのリビジョンを進め、追加したアイテムにそのリビジョンを記録する。
+    削除した設定項目の回答・決定事項の履歴は残す。
+    
+    Returns:
+        記録したリビジョン
+    """
+    try:
+        revision = bump_project_revision(db, project_id, commit=False)
+        if remove_config_item_ids:
+            db.execute(delete(models.BacklogItem).where(
+                models.BacklogItem.project_id == project_id,
+                models.BacklogItem.config_item_id.in_(remove_config_item_ids)
+            ))
+        db.add_all([
+            models.BacklogItem(
+                project_id=project_id,
+                config_item_id=config_item_id,
+                status=models.BacklogStatus.PENDING,
+                answered=False,
+                status_revision=revision
+            )
+            for config_item_id in add_config_item_ids
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return revision
+
+
+def update_backlog_item(
+    db: Session,
+    item_id: int,
+    update: schemas.BacklogItemUpdate,
+    revision: Optional[int] = None
+) -> Optional[models.BacklogItem]:
+    """バックログアイテムを更新（revision指定時はステータス変更のリビジョンとして記録）"""
     db_item = db.query(models.BacklogItem).filter(models.BacklogItem.id == item_id).first()
     if not db_item:
         return None
@@ -173,38 +517,330 @@ def update_backlog_item(db: Session, item_id: int, update: schemas.BacklogItemUp
     update_data = update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_item, key, value)
+    if revision is not None:
+        db_item.status_revision = revision
     
     db.commit()
     db.refresh(db_item)
     return db_item
 
 
+def get_open_tbd_counts(db: Session) -> list:
+    """
+    全プロジェクトの未決定（未回答）のバックログ項目数を優先度別に集計
+    
+    Returns:
+        (project_id, priority, count) の行のリスト
+    """
+    return db.execute(
+        select(models.BacklogItem.project_id, models.ConfigItem.priority, func.count())
+        .join(models.ConfigItem, models.BacklogItem.config_item_id == models.ConfigItem.id)
+        .where(models.BacklogItem.answered == False)  # noqa: E712
+        .group_by(models.BacklogItem.project_id, models.ConfigItem.priority)
+    ).all()
+
+
 # ========== Artifact CRUD ==========
 
 def get_artifacts(db: Session, project_id: int) -> List[models.Artifact]:
-    """プロジェクトの成果物一覧を取得"""
-    return db.query(models.Artifact).filter(
+    """プロジェクトの成果物一覧を本文ごと取得"""
+    return db.query(models.Artifact).options(
+        selectinload(models.Artifact.blob).undefer(models.ArtifactBlob.data)
+    ).filter(
         models.Artifact.project_id == project_id
-    ).order_by(models.Artifact.created_at.desc()).all()
+    ).order_by(models.Artifact.created_at.desc(), models.Artifact.id.desc()).all()
+
+
+def get_artifact_summaries(
+    db: Session,
+    project_id: int,
+    limit: int = 50,
+    before: Optional[int] = None,
+    artifact_type: Optional[models.ArtifactType] = None
+) -> list:
+    """
+    成果物の一覧をメタデータのみで取得（新しい順、本文は読まない）
+    
+    Args:
+        limit: 取得件数
+        before: この成果物IDより古いものを返す（キーセット方式のカーソル）
+        artifact_type: 成果物の種類で絞り込む
+    
+    Returns:
+        (id, project_id, artifact_type, tbd_count, created_at, content_hash, size) の行のリスト
+    """
+    query = select(
+        models.Artifact.id,
+        models.Artifact.project_id,
+        models.Artifact.artifact_type,
+        models.Artifact.tbd_count,
+        models.Artifact.created_at,
+        models.Artifact.content_hash,
+        models.ArtifactBlob.size,
+    ).join(models.Artifact.blob).where(models.Artifact.project_id == project_id)
+    if artifact_type is not None:
+        query = query.where(models.Artifact.artifact_type == artifact_type)
+    if before is not None:
+        # カーソルの成果物の (created_at, id) より前。カーソルが無い場合は空になる
+        cursor = select(models.Artifact.created_at).where(
+            models.Artifact.id == before, models.Artifact.project_id == project_id
+        ).scalar_subquery()
+        query = query.where(or_(
+            models.Artifact.created_at < cursor,
+            and_(models.Artifact.created_at == cursor, models.Artifact.id < before)
+        ))
+    return db.execute(
+        query.order_by(models.Artifact.created_at.desc(), models.Artifact.id.desc()).limit(limit)
+    ).all()
+
+
+def _artifact_query(db: Session, with_content: bool):
+    """成果物のクエリ（with_content の場合は本文も同じクエリで読む）"""
+    query = db.query(models.Artifact)
+    if with_content:
+        query = query.options(joinedload(models.Artifact.blob).undefer(models.ArtifactBlob.data))
+    return query
 
 
-def get_artifact_by_type(db: Session, project_id: int, artifact_type: models.ArtifactType) -> Optional[models.Artifact]:
+def get_artifact_by_type(
+    db: Session,
+    project_id: int,
+    artifact_type: models.ArtifactType,
+    with_content: bool = True
+) -> Optional[models.Artifact]:
     """特定の種類の成果物を取得（最新）"""
-    return db.query(models.Artifact).filter(
+    return _artifact_query(db, with_content).filter(
+        models.Artifact.project_id == project_id,
+        models.Artifact.artifact_type == artifact_type
+    ).order_by(models.Artifact.created_at.desc(), models.Artifact.id.desc()).first()
+
+
+def get_artifact(
+    db: Session,
+    project_id: int,
+    artifact_type: models.ArtifactType,
+    artifact_id: int,
+    with_content: bool = True
+) -> Optional[models.Artifact]:
+    """成果物の版をIDで取得（プロジェクト・種類が一致しない場合はNone）"""
+    return _artifact_query(db, with_content).filter(
+        models.Artifact.id == artifact_id,
         models.Artifact.project_id == project_id,
         models.Artifact.artifact_type == artifact_type
-    ).order_by(models.Artifact.created_at.desc()).first()
+    ).first()
+
+
+def get_previous_artifact(db: Session, artifact: models.Artifact) -> Optional[models.Artifact]:
+    """同じプロジェクト・種類の1つ前の版を取得"""
+    return db.query(models.Artifact).filter(
+        models.Artifact.project_id == artifact.project_id,
+        models.Artifact.artifact_type == artifact.artifact_type,
+        (models.Artifact.created_at < artifact.created_at)
+        | ((models.Artifact.created_at == artifact.created_at) & (models.Artifact.id < artifact.id))
+    ).order_by(models.Artifact.created_at.desc(), models.Artifact.id.desc()).first()
+
+
+def get_latest_artifact_tbd_counts(db: Session) -> list:
+    """
+    全プロジェクトの成果物の種類ごとの最新版の TBD 数
+    
+    Returns:
+        (project_id, artifact_type, tbd_count) の行のリスト
+    """
+    ranked = select(
+        models.Artifact.project_id,
+        models.Artifact.artifact_type,
+        models.Artifact.tbd_count,
+        func.row_number().over(
+            partition_by=(models.Artifact.project_id, models.Artifact.artifact_type),
+            order_by=(models.Artifact.created_at.desc(), models.Artifact.id.desc())
+        ).label('rank')
+    ).subquery()
+    return db.execute(
+        select(ranked.c.project_id, ranked.c.artifact_type, ranked.c.tbd_count).where(ranked.c.rank == 1)
+    ).all()
+
+
+def store_artifact_blobs(db: Session, contents: List[str]) -> List[str]:
+    """
+    成果物の本文を圧縮して保存し、本文ごとのハッシュを返す（コミットしない）
+    
+    同じ内容の本文が既にあれば保存せずにそのハッシュを返す。
+    """
+    from services.artifact_storage import content_hash, compress
+    
+    if not contents:
+        return []
+    hashes = [content_hash(content) for content in contents]
+    existing = set(db.scalars(
+        select(models.ArtifactBlob.content_hash).where(models.ArtifactBlob.content_hash.in_(set(hashes)))
+    ))
+    for blob_hash, content in zip(hashes, contents):
+        if blob_hash in existing:
+            continue
+        encoding, data = compress(content)
+        db.add(models.ArtifactBlob(
+            content_hash=blob_hash,
+            encoding=encoding,
+            data=data,
+            size=len(content.encode('utf-8'))
+        ))
+        existing.add(blob_hash)
+    return hashes
+
+
+def prune_artifacts(
+    db: Session,
+    project_id: int,
+    artifact_types: List[models.ArtifactType],
+    keep_versions: int
+) -> int:
+    """
+    成果物の種類ごとに新しい keep_versions 件を残して古い版を削除（コミットしない）
+    
+    どの成果物からも参照されなくなった本文も削除する。
+    
+    Returns:
+        削除した成果物の件数
+    """
+    if keep_versions <= 0:
+        return 0
+    
+    stale_ids = []
+    stale_hashes = set()
+    for artifact_type in artifact_types:
+        rows = db.execute(
+            select(models.Artifact.id, models.Artifact.content_hash, models.Artifact.items_hash)
+            .where(models.Artifact.project_id == project_id, models.Artifact.artifact_type == artifact_type)
+            .order_by(models.Artifact.created_at.desc(), models.Artifact.id.desc())
+            .offset(keep_versions)
+        ).all()
+        stale_ids.extend(row.id for row in rows)
+        stale_hashes.update(row.content_hash for row in rows)
+        stale_hashes.update(row.items_hash for row in rows if row.items_hash)
+    if not stale_ids:
+        return 0
+    
+    db.execute(delete(models.Artifact).where(models.Artifact.id.in_(stale_ids)))
+    referenced = set(db.scalars(
+        select(models.Artifact.content_hash).where(models.Artifact.content_hash.in_(stale_hashes))
+    )) | set(db.scalars(
+        select(models.Artifact.items_hash).where(models.Artifact.items_hash.in_(stale_hashes))
+    ))
+    orphaned = stale_hashes - referenced
+    if orphaned:
+        db.execute(delete(models.ArtifactBlob).where(models.ArtifactBlob.content_hash.in_(orphaned)))
+    return len(stale_ids)
 
 
 def create_artifact(db: Session, project_id: int, artifact_type: models.ArtifactType, content: str, tbd_count: int = 0) -> models.Artifact:
     """成果物を作成"""
-    db_artifact = models.Artifact(
-        project_id=project_id,
-        artifact_type=artifact_type,
-        content=content,
-        tbd_count=tbd_count
-    )
-    db.add(db_artifact)
-    db.commit()
-    db.refresh(db_artifact)
-    return db_artifact
+    return create_artifacts(db, project_id, [(artifact_type, content, tbd_count, None)])[0]
+
+
+def create_artifacts(
+    db: Session,
+    project_id: int,
+    artifacts: List[Tuple[models.ArtifactType, str, int, Optional[Dict[str, str]]]],
+    keep_versions: int = 0
+) -> List[models.Artifact]:
+    """
+    複数の成果物を1回のINSERT・コミットで作成
+    
+    本文と行ごとの出力（JSON）は内容のハッシュで重複排除して圧縮保存する。同じ本文を
+    同時に保存しようとして主キーが衝突した場合は、ロールバックして既存の本文を参照し直す。
+    
+    Args:
+        artifacts: (artifact_type, content, tbd_count, items) のリスト。
+            items は行の key → 出力の辞書（記録しない場合はNone）
+        keep_versions: 種類ごとに残す版数（0の場合は古い版を削除しない）
+    """
+    item_documents = [
+        json.dumps(items, ensure_ascii=False) if items is not None else None
+        for _, _, _, items in artifacts
+    ]
+    for attempt in range(2):
+        try:
+            hashes = store_artifact_blobs(db, [content for _, content, _, _ in artifacts])
+            item_hashes = iter(store_artifact_blobs(db, [doc for doc in item_documents if doc is not None]))
+            created_at = datetime.utcnow()
+            db_artifacts = [
+                models.Artifact(
+                    project_id=project_id,
+                    artifact_type=artifact_type,
+                    content_hash=blob_hash,
+                    items_hash=next(item_hashes) if document is not None else None,
+                    tbd_count=tbd_count,
+                    created_at=created_at
+                )
+                for (artifact_type, _, tbd_count, _), blob_hash, document in zip(artifacts, hashes, item_documents)
+            ]
+            db.add_all(db_artifacts)
+            db.flush()
+            prune_artifacts(db, project_id, [artifact_type for artifact_type, _, _, _ in artifacts], keep_versions)
+            db.commit()
+            return db_artifacts
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+        except Exception:
+            db.rollback()
+            raise
+
+
+# ========== Export ==========
+
+def export_query(table: str, project_id: Optional[int] = None):
+    """
+    表形式エクスポート（CSV / Parquet）の行を返すクエリ
+    
+    Args:
+        table: config_items（バックログの設定項目と状態）/ decisions / answers
+        project_id: プロジェクトID（Noneの場合は全プロジェクト）
+        
+    Returns:
+        project_id 順に並べた SELECT（列名がエクスポートの列名）
+    """
+    if table == "config_items":
+        query = select(
+            models.BacklogItem.project_id,
+            models.ConfigItem.id.label("config_item_id"),
+            models.ConfigItem.module,
+            models.ConfigItem.title,
+            models.ConfigItem.priority,
+            models.BacklogItem.status,
+            models.BacklogItem.answered,
+            models.ConfigItem.depends_on,
+            models.BacklogItem.updated_at,
+        ).join(
+            models.ConfigItem, models.BacklogItem.config_item_id == models.ConfigItem.id
+        ).order_by(models.BacklogItem.project_id, models.BacklogItem.id)
+        model = models.BacklogItem
+    elif table == "decisions":
+        query = select(
+            models.Decision.project_id,
+            models.Decision.config_item_id,
+            models.Decision.title,
+            models.Decision.rationale,
+            models.Decision.impact,
+            models.Decision.status,
+            models.Decision.created_at,
+            models.Decision.updated_at,
+        ).order_by(models.Decision.project_id, models.Decision.id)
+        model = models.Decision
+    elif table == "answers":
+        query = select(
+            models.Answer.project_id,
+            models.Answer.config_item_id,
+            models.Answer.input_name,
+            models.Answer.value,
+            models.Answer.created_at,
+        ).order_by(models.Answer.project_id, models.Answer.id)
+        model = models.Answer
+    else:
+        raise ValueError(f"Unknown export table: {table}")
+    
+    if project_id is not None:
+        query = query.where(model.project_id == project_id)
+    return query
@@ -1,39 +1,227 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.orm import ORMExecuteState, sessionmaker, Session
+from sqlalchemy.sql.elements import TextClause
+from typing import Callable, Generator, Dict, List, Optional, Union
+import functools
+import itertools
+import threading
+import time
 from config import get_settings
 
 settings = get_settings()
 
-# SQLAlchemyエンジン作成
-_engine_kwargs = dict(
-    pool_pre_ping=True,
-    echo=settings.debug,
-)
-# SQLite用の設定
-if settings.database_url.startswith("sqlite"):
-    _engine_kwargs["connect_args"] = {"check_same_thread": False}
-    _engine_kwargs.pop("pool_pre_ping")  # SQLiteではpool_pre_pingは不要
 
-engine = create_engine(settings.database_url, **_engine_kwargs)
+def _create_engine(url: str) -> Engine:
+    """SQLAlchemyエンジン作成"""
+    engine_kwargs = dict(
+        pool_pre_ping=True,
+        echo=settings.debug,
+    )
+    # SQLite用の設定
+    if url.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        engine_kwargs.pop("pool_pre_ping")  # SQLiteではpool_pre_pingは不要
+    return create_engine(url, **engine_kwargs)
+
+
+# 書き込み記録のキー（プロジェクトに紐づかない書き込み / プロジェクト一覧）
+_GLOBAL_WRITE = "*"
+_PROJECT_LIST_WRITE = "projects"
+
+# クライアントが最後に見たプロジェクトリビジョン（レプリカがこれより古ければプライマリで読む）
+MIN_REVISION_HEADER = "X-Min-Revision"
+
+
+class ReadOnlySessionError(RuntimeError):
+    """読み取り専用（レプリカ）のセッションで書き込もうとした"""
+
+
+def _is_write_statement(state: ORMExecuteState) -> bool:
+    """INSERT / UPDATE / DELETE（SELECT 以外の生SQLを含む）か"""
+    if state.is_insert or state.is_update or state.is_delete:
+        return True
+    statement = state.statement
+    return isinstance(statement, TextClause) and not statement.text.lstrip().upper().startswith("SELECT")
+
+
+class SessionRouter:
+    """
+    プライマリ・リードレプリカ間のセッション振り分け
+
+    書き込みはプライマリ、読み取り専用の依存関係はレプリカ（ラウンドロビン）に送る。
+    プライマリへの書き込み後 sticky_seconds の間は、同じプロジェクトの読み取りも
+    プライマリに送る（read-your-writes）。書き込みは ORM の flush と、Core の
+    insert / update / delete（db.execute）の両方をコミット時に記録する。
+
+    書き込みの記録はプロセス内のみのため、複数ワーカー・複数台構成では別のワーカーへの
+    書き込みは見えない。その場合はクライアントが最後に受け取ったプロジェクトリビジョンを
+    min_revision（X-Min-Revision ヘッダ）で渡し、レプリカがそれより古ければプライマリで読む。
+    レプリカのセッションで書き込むと ReadOnlySessionError になる。
+    """
+
+    def __init__(self, primary_url: str, replica_urls: List[str] = (), sticky_seconds: float = 5.0):
+        self.primary = _create_engine(primary_url)
+        self.replicas = [_create_engine(url) for url in replica_urls]
+        self.sticky_seconds = sticky_seconds
+
+        self.primary_sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.primary)
+        self._replica_sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica)
+            for replica in self.replicas
+        ]
+        self._next_replica = itertools.count()
+        self._last_write: Dict[Union[int, str], float] = {}
+        self._lock = threading.Lock()
+
+        event.listen(self.primary_sessionmaker, "after_flush", self._on_flush)
+        event.listen(self.primary_sessionmaker, "do_orm_execute", self._on_execute)
+        event.listen(self.primary_sessionmaker, "after_commit", self._on_commit)
+        for replica_sessionmaker in self._replica_sessionmakers:
+            event.listen(replica_sessionmaker, "before_flush", self._reject_flush)
+            event.listen(replica_sessionmaker, "do_orm_execute", self._reject_write)
+
+    def _on_flush(self, session: Session, flush_context):
+        session.info["wrote"] = True
+
+    def _on_execute(self, state: ORMExecuteState):
+        # bulk update や query.update() は flush を経由しないためここで記録する
+        if _is_write_statement(state):
+            state.session.info["wrote"] = True
+
+    def _reject_flush(self, session: Session, flush_context, instances):
+        if session.new or session.dirty or session.deleted:
+            raise ReadOnlySessionError("Cannot flush changes on a read replica session")
+
+    def _reject_write(self, state: ORMExecuteState):
+        if _is_write_statement(state):
+            raise ReadOnlySessionError("Cannot execute a write statement on a read replica session")
+
+    def _on_commit(self, session: Session):
+        if session.info.pop("wrote", False):
+            self.record_write(session.info.get("project_id"))
+
+    def record_write(self, project_id: Optional[int] = None):
+        """
+        プライマリへの書き込みを記録
+
+        プロジェクトに紐づく書き込みはそのプロジェクトとプロジェクト一覧、
+        紐づかない書き込み（カタログ再読込など）は全ての読み取りを一定時間プライマリに固定する。
+        """
+        now = time.monotonic()
+        with self._lock:
+            if project_id is None:
+                self._last_write[_GLOBAL_WRITE] = now
+            else:
+                self._last_write[project_id] = now
+                self._last_write[_PROJECT_LIST_WRITE] = now
+
+    def is_sticky(self, project_id: Optional[int] = None) -> bool:
+        """直近の書き込みにより、読み取りをプライマリに送るべきか"""
+        key = _PROJECT_LIST_WRITE if project_id is None else project_id
+        last_write = max(self._last_write.get(key, 0.0), self._last_write.get(_GLOBAL_WRITE, 0.0))
+        return last_write > 0 and time.monotonic() - last_write < self.sticky_seconds
 
-# セッションファクトリ
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def write_session(self, project_id: Optional[int] = None) -> Session:
+        """プライマリのセッションを作成"""
+        db = self.primary_sessionmaker()
+        db.info["project_id"] = project_id
+        return db
+
+    def read_session(self, project_id: Optional[int] = None, min_revision: Optional[int] = None) -> Session:
+        """
+        読み取り専用セッションを作成
+
+        レプリカが無い・直近に書き込みがある・レプリカのプロジェクトリビジョンが
+        min_revision に追いついていない場合はプライマリのセッションを返す。
+        """
+        if not self.replicas or self.is_sticky(project_id):
+            return self.write_session(project_id)
+        index = next(self._next_replica) % len(self.replicas)
+        db = self._replica_sessionmakers[index]()
+        if project_id is not None and min_revision is not None and not self._has_revision(db, project_id, min_revision):
+            db.close()
+            return self.write_session(project_id)
+        return db
+
+    def _has_revision(self, db: Session, project_id: int, min_revision: int) -> bool:
+        """レプリカにプロジェクトの min_revision 以降が反映済みか"""
+        revision = db.execute(
+            text("SELECT revision FROM projects WHERE id = :project_id"),
+            {"project_id": project_id}
+        ).scalar()
+        return revision is not None and revision >= min_revision
+
+
+session_router = SessionRouter(
+    settings.database_url,
+    settings.database_replica_urls,
+    sticky_seconds=settings.replica_sticky_seconds
+)
+
+# プライマリのエンジンとセッションファクトリ
+engine = session_router.primary
+SessionLocal = session_router.primary_sessionmaker
 
 # ベースクラス
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
-    """データベースセッションを取得する依存関係"""
-    db = SessionLocal()
+def _project_id_from_request(request: Request) -> Optional[int]:
+    """パスパラメータからプロジェクトIDを取得"""
+    project_id = request.path_params.get("project_id")
+    try:
+        return int(project_id) if project_id is not None else None
+    except ValueError:
+        return None
+
+
+def _min_revision_from_request(request: Request) -> Optional[int]:
+    """X-Min-Revision ヘッダからクライアントが最後に見たリビジョンを取得"""
+    min_revision = request.headers.get(MIN_REVISION_HEADER)
+    try:
+        return int(min_revision) if min_revision is not None else None
+    except ValueError:
+        return None
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """データベースセッションを取得する依存関係（プライマリ）"""
+    db = session_router.write_session(_project_id_from_request(request))
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """読み取り専用のデータベースセッションを取得する依存関係（レプリカ）"""
+    db = session_router.read_session(
+        _project_id_from_request(request),
+        min_revision=_min_revision_from_request(request)
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_session_factory(request: Request) -> Callable[[], Session]:
+    """
+    読み取り専用セッションのファクトリを取得する依存関係（ストリーミング応答用）
+
+    依存関係のセッションはレスポンス本文の送信前に閉じられるため、
+    本文を生成する側がこのファクトリでセッションを作り、出力し終えたら閉じる。
+    """
+    return functools.partial(
+        session_router.read_session,
+        _project_id_from_request(request),
+        min_revision=_min_revision_from_request(request)
+    )
+
+
 def init_db():
     """データベースを初期化（テーブル作成）"""
     Base.metadata.create_all(bind=engine)
@@ -1,6 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from database import get_db
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from typing import Optional
+from database import get_db, get_read_db
 import crud
 import models
 
@@ -16,6 +19,11 @@ def get_project_or_404(project_id: int, db: Session = Depends(get_db)) -> models
     return project
 
 
+def get_project_for_read_or_404(project_id: int, db: Session = Depends(get_read_db)) -> models.Project:
+    """読み取り専用のエンドポイント用（リードレプリカから取得）"""
+    return get_project_or_404(project_id, db)
+
+
 def get_config_item_or_404(config_item_id: str, db: Session = Depends(get_db)) -> models.ConfigItem:
     """設定項目を取得、存在しない場合は404エラー"""
     config_item = crud.get_config_item(db, config_item_id)
@@ -25,3 +33,59 @@ def get_config_item_or_404(config_item_id: str, db: Session = Depends(get_db)) -
             detail=f"ConfigItem with id {config_item_id} not found"
         )
     return config_item
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match ヘッダーがETagに一致するか（弱い比較）"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def check_project_not_modified(
+    request: Request,
+    response: Response,
+    project: models.Project,
+    db: Session
+) -> Optional[Response]:
+    """
+    プロジェクトのリビジョンに基づく条件付きGET
+    
+    ETag（プロジェクトID・リビジョン・カタログバージョン）と Last-Modified を
+    レスポンスに付与し、クライアントのキャッシュが最新なら 304 を返す。
+    呼び出し側は 304 の場合、再計算をせずにそのまま返すこと。
+    
+    Returns:
+        304レスポンス。キャッシュが古い場合はNone
+    """
+    catalog_version = crud.get_catalog_version(db)
+    etag = f'W/"p{project.id}-r{project.revision}-c{catalog_version.id if catalog_version else 0}"'
+    
+    last_modified = project.updated_at
+    if catalog_version and catalog_version.created_at and (
+        last_modified is None or catalog_version.created_at > last_modified
+    ):
+        last_modified = catalog_version.created_at
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers.update(headers)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = False
+        if if_modified_since and last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+                not_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+            except (TypeError, ValueError):
+                pass
+    
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -31,10 +31,48 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Catalog loading skipped: {e}")
     
+    # 成果物テンプレートを事前にコンパイル
+    try:
+        from services.artifact_templates import compile_templates
+        logger.info(f"Compiled artifact templates: {', '.join(compile_templates())}")
+    except Exception as e:
+        logger.warning(f"Artifact template compilation failed: {e}")
+    
+    # カタログファイルの変更監視
+    catalog_watcher = None
+    if settings.catalog_watch:
+        from services.catalog_loader import CatalogWatcher
+        catalog_watcher = CatalogWatcher(interval=settings.catalog_watch_interval)
+        catalog_watcher.start()
+        logger.info(f"Watching catalog for changes: {catalog_watcher.catalog_path}")
+    
+    # バックログステータスの整合性チェック（起動時 + 定期実行）
+    from services.dependency_engine import BacklogRepairJob
+    backlog_repair = BacklogRepairJob(interval=settings.backlog_repair_interval)
+    try:
+        repaired = backlog_repair.run_once()
+        if repaired:
+            logger.info(f"Repaired backlog statuses in {len(repaired)} projects")
+    except Exception as e:
+        logger.warning(f"Backlog repair skipped: {e}")
+    if settings.backlog_repair_interval > 0:
+        backlog_repair.start()
+    
+    # イベント配信のバックエンド（LISTEN/NOTIFY 使用時は受信スレッドを開始）
+    from services.event_bus import get_event_bus
+    event_bus = get_event_bus()
+    event_bus.start()
+    
     yield
     
     # 終了時
     logger.info("Shutting down...")
+    event_bus.stop()
+    if catalog_watcher is not None:
+        catalog_watcher.stop()
+    backlog_repair.stop()
+    from services.artifact_pdf import shutdown_pdf_executor
+    shutdown_pdf_executor()
 
 
 app = FastAPI(
@@ -90,6 +128,20 @@ try:
 except ImportError:
     logger.warning("Artifacts router not available")
 
+# イベント配信（SSE）ルーター
+try:
+    from routers import events
+    app.include_router(events.router)
+except ImportError:
+    logger.warning("Events router not available")
+
+# カタログ管理ルーター
+try:
+    from routers import catalog
+    app.include_router(catalog.router)
+except ImportError:
+    logger.warning("Catalog router not available")
+
 @app.get('/health')
 def health():
     """ヘルスチェック"""
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index, LargeBinary, Enum as SQLEnum
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from typing import Dict, Optional
 from database import Base
 import enum
+import json
 
 
 class ProjectMode(str, enum.Enum):
@@ -39,11 +41,14 @@ class Project(Base):
     industry = Column(String(100))
     company_count = Column(Integer)
     description = Column(Text)
+    modules = Column(JSON)  # 対象モジュールのリスト（Noneの場合は全モジュール）
+    revision = Column(Integer, default=1, nullable=False)  # 回答・バックログ・プロジェクト更新ごとに加算
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # リレーション
     answers = relationship("Answer", back_populates="project", cascade="all, delete-orphan")
+    answer_versions = relationship("AnswerVersion", back_populates="project", cascade="all, delete-orphan")
     decisions = relationship("Decision", back_populates="project", cascade="all, delete-orphan")
     backlog_items = relationship("BacklogItem", back_populates="project", cascade="all, delete-orphan")
     artifacts = relationship("Artifact", back_populates="project", cascade="all, delete-orphan")
@@ -54,6 +59,7 @@ class ConfigItem(Base):
     __tablename__ = "config_items"
     
     id = Column(String(50), primary_key=True)  # FI-CORE-001など
+    module = Column(String(20), index=True)  # FI, CO, MM など（カタログのモジュール）
     title = Column(String(255), nullable=False)
     description = Column(Text)
     priority = Column(String(10))  # P0, P1など
@@ -61,6 +67,8 @@ class ConfigItem(Base):
     depends_on = Column(JSON)  # 依存する設定項目IDのリスト
     produces = Column(JSON)  # 生成する成果物のリスト
     notes = Column(JSON)  # 備考
+    test_perspectives = Column(JSON)  # Test View の固有テスト観点のリスト
+    migration_object = Column(String(255))  # Migration View の移行オブジェクト名
     
     # 初心者モード対応フィールド
     beginner_mode = Column(Boolean, default=True)  # 初心者モードで表示するか
@@ -68,13 +76,30 @@ class ConfigItem(Base):
     beginner_description = Column(Text)  # 初心者向け説明
     beginner_why = Column(Text)  # なぜこの質問が必要か
     
+    # カタログ差分検出用のコンテンツハッシュ
+    content_hash = Column(String(64))
+    
     # リレーション
     backlog_items = relationship("BacklogItem", back_populates="config_item")
 
 
+class CatalogVersion(Base):
+    """カタログバージョン（カタログ反映ごとに1行追加）"""
+    __tablename__ = "catalog_versions"
+    
+    id = Column(Integer, primary_key=True, index=True)  # バージョン番号
+    catalog_hash = Column(String(64), nullable=False)  # カタログ全体のハッシュ
+    inserted_count = Column(Integer, default=0)
+    updated_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Answer(Base):
-    """回答"""
+    """回答（現在値。履歴は AnswerVersion に追記する）"""
     __tablename__ = "answers"
+    __table_args__ = (
+        Index("ix_answers_project_config_item", "project_id", "config_item_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -87,9 +112,40 @@ class Answer(Base):
     project = relationship("Project", back_populates="answers")
 
 
+class AnswerVersion(Base):
+    """
+    回答・決定事項の版（追記のみ）
+    
+    回答送信ごとに設定項目単位で1行追加する。現在値は answers / decisions に
+    保持し、この表は時点指定の復元と版間の差分にのみ使う。
+    """
+    __tablename__ = "answer_versions"
+    __table_args__ = (
+        Index("ix_answer_versions_item_version", "project_id", "config_item_id", "version", unique=True),
+        Index("ix_answer_versions_project_revision", "project_id", "revision"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    config_item_id = Column(String(50), ForeignKey("config_items.id"), nullable=False)
+    version = Column(Integer, nullable=False)  # 設定項目ごとの版番号（1から）
+    revision = Column(Integer, nullable=False)  # 記録時のプロジェクトリビジョン
+    answer_values = Column(JSON)  # {input_name: value}（移行前の決定事項のみの版はNone）
+    decision_title = Column(String(255))
+    decision_rationale = Column(Text)
+    decision_impact = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # リレーション
+    project = relationship("Project", back_populates="answer_versions")
+
+
 class Decision(Base):
-    """決定事項"""
+    """決定事項（設定項目ごとの現在値。履歴は AnswerVersion に追記する）"""
     __tablename__ = "decisions"
+    __table_args__ = (
+        Index("ix_decisions_project_config_item", "project_id", "config_item_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -108,12 +164,17 @@ class Decision(Base):
 class BacklogItem(Base):
     """バックログアイテム（プロジェクトに紐づく設定項目）"""
     __tablename__ = "backlog_items"
+    __table_args__ = (
+        # 未決定（TBD）項目の集計用
+        Index("ix_backlog_items_project_answered", "project_id", "answered"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     config_item_id = Column(String(50), ForeignKey("config_items.id"), nullable=False)
     status = Column(SQLEnum(BacklogStatus), default=BacklogStatus.PENDING)
     answered = Column(Boolean, default=False)  # 回答済みか
+    status_revision = Column(Integer, default=0, nullable=False)  # ステータスが最後に変わったプロジェクトリビジョン
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -125,13 +186,46 @@ class BacklogItem(Base):
 class Artifact(Base):
     """成果物"""
     __tablename__ = "artifacts"
+    __table_args__ = (
+        Index("ix_artifacts_project_type_created", "project_id", "artifact_type", "created_at"),
+        Index("ix_artifacts_project_created", "project_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     artifact_type = Column(SQLEnum(ArtifactType), nullable=False)
-    content = Column(Text, nullable=False)  # Markdown内容
+    content_hash = Column(String(64), ForeignKey("artifact_blobs.content_hash"), nullable=False, index=True)
+    # 行ごとの出力（設定項目ID → Markdown のJSON）。版間の差分に使う
+    items_hash = Column(String(64), ForeignKey("artifact_blobs.content_hash"), index=True)
     tbd_count = Column(Integer, default=0)  # 未決項目数
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # リレーション
     project = relationship("Project", back_populates="artifacts")
+    blob = relationship("ArtifactBlob", foreign_keys=[content_hash])
+    items_blob = relationship("ArtifactBlob", foreign_keys=[items_hash])
+    
+    @property
+    def content(self) -> str:
+        """Markdown内容（圧縮保存された本文を展開）"""
+        from services.artifact_storage import decompress
+        return decompress(self.blob.encoding, self.blob.data)
+    
+    @property
+    def items(self) -> Optional[Dict[str, str]]:
+        """行ごとの出力（記録していない成果物はNone）"""
+        if self.items_blob is None:
+            return None
+        from services.artifact_storage import decompress
+        return json.loads(decompress(self.items_blob.encoding, self.items_blob.data))
+
+
+class ArtifactBlob(Base):
+    """成果物の本文（圧縮前の内容のハッシュで重複排除し、圧縮して保存）"""
+    __tablename__ = "artifact_blobs"
+    
+    content_hash = Column(String(64), primary_key=True)  # 圧縮前の本文のSHA-256
+    encoding = Column(String(10), nullable=False)  # gzip / zstd
+    data = deferred(Column(LargeBinary, nullable=False))  # 本文が必要なときだけ読む
+    size = Column(Integer, nullable=False)  # 圧縮前のバイト数
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from jinja2 import TemplateNotFound
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, List, Optional
+import asyncio
 import crud
 import schemas
 import models
-from database import get_db
-from dependencies import get_project_or_404
+from database import get_db, get_read_db, get_read_session_factory
+from dependencies import get_project_or_404, get_project_for_read_or_404
 from services.artifact_generator import generate_artifacts, ArtifactGenerator
+from services.artifact_templates import list_templates
+from services.artifact_storage import GZIP, accepts_gzip, iter_decompressed, iter_range, parse_range
+from services.artifact_diff import diff_artifacts
+from services.artifact_pdf import PdfRenderBusy, cached_pdf, iter_chunks, render_pdf
+from services.tabular_export import (
+    CSV, MEDIA_TYPES, PARQUET, ExportFormatUnavailable, ExportTable, export_stream
+)
+from services.project_events import publish_artifacts_ready
 
 router = APIRouter(prefix="/api/projects/{project_id}/artifacts", tags=["artifacts"])
 
@@ -26,25 +38,75 @@ def generate_project_artifacts(
     artifact_types = request.artifact_types if request.artifact_types else None
     
     artifacts = generate_artifacts(db, project.id, artifact_types)
+    publish_artifacts_ready(project.id, artifacts)
     
     return [schemas.Artifact.model_validate(a) for a in artifacts]
 
 
-@router.get("/", response_model=List[schemas.Artifact])
+@router.get("/", response_model=List[schemas.ArtifactSummary])
 def get_artifacts(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of artifacts to return"),
+    before: Optional[int] = Query(None, description="Cursor: return artifacts older than this artifact id"),
+    artifact_type: Optional[models.ArtifactType] = Query(None, description="Filter by artifact type"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
-    """プロジェクトの成果物一覧を取得"""
-    artifacts = crud.get_artifacts(db, project.id)
-    return [schemas.Artifact.model_validate(a) for a in artifacts]
+    """
+    プロジェクトの成果物一覧を取得（新しい順、本文を含まない）
+    
+    続きがある場合は X-Next-Cursor ヘッダに次のページの before を返す。
+    本文は種類別・ID別の取得、またはダウンロードで取得する。
+    """
+    rows = crud.get_artifact_summaries(db, project.id, limit=limit, before=before, artifact_type=artifact_type)
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return [schemas.ArtifactSummary.model_validate(row) for row in rows]
+
+
+@router.get("/templates", response_model=List[str])
+def get_artifact_templates(
+    project: models.Project = Depends(get_project_for_read_or_404)
+):
+    """利用可能な成果物テンプレートの一覧（組み込み + ARTIFACT_TEMPLATE_DIR）"""
+    return list_templates()
+
+
+@router.get("/render/{template_name}")
+def render_artifact_template(
+    template_name: str,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    テンプレートを指定して成果物をレンダリング（保存はしない）
+    
+    ARTIFACT_TEMPLATE_DIR に置いた独自テンプレートも指定できる。
+    出力はテンプレートの断片ごとにストリーミングする。
+    """
+    generator = ArtifactGenerator(db, project.id)
+    try:
+        chunks = generator.render_stream(template_name)
+    except TemplateNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact template {template_name} not found"
+        )
+    
+    return StreamingResponse(
+        chunks,
+        media_type="text/markdown",
+        headers={
+            "Content-Disposition": f"attachment; filename={template_name}.md"
+        }
+    )
 
 
 @router.get("/{artifact_type}", response_model=schemas.Artifact)
 def get_artifact_by_type(
     artifact_type: models.ArtifactType,
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """特定の種類の成果物を取得（最新）"""
     artifact = crud.get_artifact_by_type(db, project.id, artifact_type)
@@ -58,13 +120,57 @@ def get_artifact_by_type(
     return schemas.Artifact.model_validate(artifact)
 
 
+@router.get("/{artifact_type}/diff", response_model=schemas.ArtifactDiff)
+def diff_artifact_versions(
+    artifact_type: models.ArtifactType,
+    from_id: Optional[int] = Query(None, alias="from", description="Base artifact id (defaults to the version before `to`)"),
+    to_id: Optional[int] = Query(None, alias="to", description="Target artifact id (defaults to the latest version)"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    成果物の2つの版の差分を取得
+    
+    生成時に記録した行（設定項目）ごとの出力を比べ、追加・削除・変更された行と
+    変更された行の unified diff を返す。差分は版の組ごとにキャッシュされる。
+    """
+    if to_id is None:
+        new = crud.get_artifact_by_type(db, project.id, artifact_type, with_content=False)
+    else:
+        new = crud.get_artifact(db, project.id, artifact_type, to_id, with_content=False)
+    if not new:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact of type {artifact_type} not found"
+        )
+    
+    if from_id is None:
+        old = crud.get_previous_artifact(db, new)
+    else:
+        old = crud.get_artifact(db, project.id, artifact_type, from_id, with_content=False)
+    if not old:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Base artifact of type {artifact_type} not found"
+        )
+    
+    result = diff_artifacts(old, new)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Per-item output was not recorded for these artifacts; regenerate them to compare"
+        )
+    return schemas.ArtifactDiff(artifact_type=artifact_type, **result)
+
+
 @router.get("/{artifact_type}/download")
 def download_artifact(
     artifact_type: models.ArtifactType,
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    request: Request,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
-    """成果物をMarkdownファイルとしてダウンロード"""
+    """成果物（最新）をMarkdownファイルとしてダウンロード"""
     artifact = crud.get_artifact_by_type(db, project.id, artifact_type)
     
     if not artifact:
@@ -73,6 +179,136 @@ def download_artifact(
             detail=f"Artifact of type {artifact_type} not found"
         )
     
+    return _markdown_response(artifact, request)
+
+
+@router.get("/{artifact_type}/{artifact_id:int}", response_model=schemas.Artifact)
+def get_artifact(
+    artifact_type: models.ArtifactType,
+    artifact_id: int,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """成果物の版をIDで取得"""
+    artifact = crud.get_artifact(db, project.id, artifact_type, artifact_id)
+    
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact {artifact_id} of type {artifact_type} not found"
+        )
+    
+    return schemas.Artifact.model_validate(artifact)
+
+
+@router.get("/{artifact_type}/{artifact_id:int}/download")
+def download_artifact_version(
+    artifact_type: models.ArtifactType,
+    artifact_id: int,
+    request: Request,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """成果物の版をIDで指定してMarkdownファイルとしてダウンロード"""
+    artifact = crud.get_artifact(db, project.id, artifact_type, artifact_id)
+    
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact {artifact_id} of type {artifact_type} not found"
+        )
+    
+    return _markdown_response(artifact, request)
+
+
+@router.get("/{artifact_type}/pdf")
+async def download_artifact_pdf(
+    artifact_type: models.ArtifactType,
+    request: Request,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """成果物（最新）をPDFとしてダウンロード"""
+    artifact = await run_in_threadpool(crud.get_artifact_by_type, db, project.id, artifact_type, with_content=False)
+    
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact of type {artifact_type} not found"
+        )
+    
+    return await _pdf_response(artifact, request)
+
+
+@router.get("/{artifact_type}/{artifact_id:int}/pdf")
+async def download_artifact_version_pdf(
+    artifact_type: models.ArtifactType,
+    artifact_id: int,
+    request: Request,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """成果物の版をIDで指定してPDFとしてダウンロード"""
+    artifact = await run_in_threadpool(
+        crud.get_artifact, db, project.id, artifact_type, artifact_id, with_content=False
+    )
+    
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact {artifact_id} of type {artifact_type} not found"
+        )
+    
+    return await _pdf_response(artifact, request)
+
+
+async def _pdf_response(artifact: models.Artifact, request: Request) -> Response:
+    """
+    成果物の本文をPDFにして返す
+    
+    レンダリングはプロセスプールで行い、その間このリクエストはワーカースレッドを
+    占有せずに待つ。PDFは本文のハッシュごとにキャッシュし、ETag も本文のハッシュから作る。
+    レンダリング待ちが上限に達している場合は 503 を返す。
+    """
+    etag = f'"{artifact.content_hash}.pdf"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    pdf = cached_pdf(artifact.content_hash)
+    if pdf is None:
+        # 本文はキャッシュに無い場合だけ読み込む
+        markdown = await run_in_threadpool(lambda: artifact.content)
+        try:
+            pdf = await asyncio.wrap_future(render_pdf(artifact.content_hash, markdown))
+        except PdfRenderBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many PDF renderings in progress; retry later",
+                headers={"Retry-After": "5"}
+            )
+    
+    filename = f"{artifact.artifact_type.value.lower()}.pdf"
+    return StreamingResponse(
+        iter_chunks(pdf),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(len(pdf)),
+            "ETag": etag
+        }
+    )
+
+
+def _markdown_response(artifact: models.Artifact, request: Request) -> Response:
+    """
+    成果物の本文をMarkdownファイルとして返す
+    
+    - Range（bytes の単一範囲）: 展開後の本文の該当部分を 206 で返す。If-Range が ETag と
+      一致しない場合は全体を返す
+    - gzip で保存された本文は、クライアントが gzip を受け付ける場合は展開せずに
+      Content-Encoding: gzip で返す
+    - それ以外は展開しながらストリーミングする
+    """
     # ファイル名を生成
     filename_map = {
         models.ArtifactType.DECISION_LOG: "decision_log.md",
@@ -80,21 +316,54 @@ def download_artifact(
         models.ArtifactType.TEST_VIEW: "test_view.md",
         models.ArtifactType.MIGRATION_VIEW: "migration_view.md"
     }
-    filename = filename_map.get(artifact_type, "artifact.md")
+    filename = filename_map.get(artifact.artifact_type, "artifact.md")
+    blob = artifact.blob
+    etag = f'"{artifact.content_hash}"'
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Vary": "Accept-Encoding"
+    }
     
-    return Response(
-        content=artifact.content,
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, blob.size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{blob.size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{blob.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_range(blob.encoding, blob.data, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="text/markdown",
+                headers=headers
+            )
+    
+    if blob.encoding == GZIP and accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = GZIP
+        return Response(content=blob.data, media_type="text/markdown", headers=headers)
+    
+    headers["Content-Length"] = str(blob.size)
+    return StreamingResponse(
+        iter_decompressed(blob.encoding, blob.data),
         media_type="text/markdown",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+        headers=headers
     )
 
 
 @router.get("/export/xlsx")
 def export_xlsx(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     設定ワークブックをXLSX形式でエクスポート
@@ -117,8 +386,8 @@ def export_xlsx(
 
 @router.get("/export/json")
 def export_json(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     全決定事項・設定・回答をJSON形式でエクスポート
@@ -137,3 +406,48 @@ def export_json(
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+@router.get("/export/csv")
+def export_csv(
+    table: ExportTable = Query(ExportTable.CONFIG_ITEMS, description="Table to export"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory)
+):
+    """
+    設定項目（バックログの状態つき）・決定事項・回答の表をCSV形式でエクスポート
+    
+    データウェアハウスへの取り込み向け。DB から一定行数ずつ読みながらストリーミングする
+    """
+    return StreamingResponse(
+        export_stream(table, CSV, session_factory, project.id),
+        media_type=MEDIA_TYPES[CSV],
+        headers={
+            "Content-Disposition": f"attachment; filename=imgquest_{table.value}_{project.id}.csv"
+        }
+    )
+
+
+@router.get("/export/parquet")
+def export_parquet(
+    table: ExportTable = Query(ExportTable.CONFIG_ITEMS, description="Table to export"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory)
+):
+    """
+    設定項目・決定事項・回答の表をParquet形式でエクスポート（pyarrow が必要）
+    
+    DB から読んだ一定行数ごとに1つの行グループとして書き出し、ストリーミングする
+    """
+    try:
+        chunks = export_stream(table, PARQUET, session_factory, project.id)
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[PARQUET],
+        headers={
+            "Content-Disposition": f"attachment; filename=imgquest_{table.value}_{project.id}.parquet"
+        }
+    )
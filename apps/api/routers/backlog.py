@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import crud
 import schemas
 import models
-from database import get_db
-from dependencies import get_project_or_404
+from database import get_db, get_read_db
+from dependencies import get_project_or_404, get_project_for_read_or_404, check_project_not_modified
+from services.project_events import snapshot_backlog, publish_backlog_changes
 from services.dependency_engine import (
-    update_project_backlog,
-    get_dependency_graph_for_project
+    get_dependency_graph_for_project,
+    preview_backlog_expansion
 )
 
 router = APIRouter(prefix="/api/projects/{project_id}/backlog", tags=["backlog"])
@@ -16,19 +17,23 @@ router = APIRouter(prefix="/api/projects/{project_id}/backlog", tags=["backlog"]
 
 @router.get("/", response_model=List[schemas.BacklogItem])
 def get_backlog(
-    project: models.Project = Depends(get_project_or_404),
+    request: Request,
+    response: Response,
+    project: models.Project = Depends(get_project_for_read_or_404),
     status_filter: Optional[str] = Query(None, description="Filter by status: PENDING, BLOCKED, READY, DONE"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     プロジェクトのバックログ一覧を取得
     
-    オプションでステータスによるフィルタリングが可能
+    オプションでステータスによるフィルタリングが可能。
+    If-None-Match が現在のリビジョンと一致する場合は 304 を返す。
     """
-    # バックログステータスを更新
-    update_project_backlog(db, project.id)
+    not_modified = check_project_not_modified(request, response, project, db)
+    if not_modified:
+        return not_modified
     
-    # バックログアイテムを取得
+    # バックログアイテムを取得（ステータスは書き込み時に更新済み）
     items = crud.get_backlog_items(db, project.id)
     
     # ステータスフィルタリング
@@ -65,18 +70,66 @@ def get_backlog(
 
 @router.get("/graph")
 def get_dependency_graph(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    since_revision: Optional[int] = Query(None, description="Return only nodes whose status changed after this revision"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     依存関係グラフデータを取得
     
-    フロントエンドでの可視化用に、ノードとエッジの情報を返す
+    フロントエンドでの可視化用に、ノードとエッジの情報を返す。
+    ノードにはレイヤー（トポロジカル深さ）とクリティカルパスのフラグを含む。
+    since_revision を指定すると、それ以降に変わったノードのみを返す
+    （catalog_version が前回と異なる場合、クライアントは全量を取り直すこと）。
     """
-    graph = get_dependency_graph_for_project(db, project.id)
+    not_modified = check_project_not_modified(request, response, project, db)
+    if not_modified:
+        return not_modified
+    
+    mode_filter = project.mode.value if project.mode else 'EXPERT'
+    graph = get_dependency_graph_for_project(
+        db, project.id, mode_filter=mode_filter, since_revision=since_revision
+    )
     return graph
 
 
+@router.get("/expansion-preview", response_model=schemas.ExpansionPreview)
+def get_expansion_preview(
+    config_item_id: str = Query(..., description="Config item assumed to be answered"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    バックログ展開のプレビューを取得（ドライラン）
+    
+    指定した設定項目に回答した場合に、推移的に追加される
+    バックログ項目と初期ステータスを返す。DBは更新しない。
+    """
+    config_item = crud.get_config_item(db, config_item_id)
+    if not config_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ConfigItem {config_item_id} not found"
+        )
+    
+    mode_filter = project.mode.value if project.mode else 'EXPERT'
+    expansion = preview_backlog_expansion(db, project.id, config_item_id, mode_filter=mode_filter)
+    
+    items = []
+    for entry in expansion:
+        expanded_item = crud.get_config_item(db, entry['config_item_id'])
+        items.append(schemas.ExpansionPreviewItem(
+            config_item_id=expanded_item.id,
+            title=expanded_item.title,
+            priority=expanded_item.priority,
+            status=entry['status']
+        ))
+    
+    return schemas.ExpansionPreview(config_item_id=config_item_id, items=items)
+
+
 @router.patch("/{item_id}", response_model=schemas.BacklogItem)
 def update_backlog_item_status(
     item_id: int,
@@ -97,13 +150,17 @@ def update_backlog_item_status(
             detail=f"BacklogItem {item_id} not found"
         )
     
+    backlog_before = snapshot_backlog(db, project.id)
+    
     # 更新
-    updated = crud.update_backlog_item(db, item_id, update_data)
+    revision = crud.bump_project_revision(db, project.id)
+    updated = crud.update_backlog_item(db, item_id, update_data, revision=revision)
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update backlog item"
         )
+    publish_backlog_changes(db, project, backlog_before, revision)
     
     # ConfigItemを結合
     config_item = crud.get_config_item(db, updated.config_item_id)
@@ -116,16 +173,19 @@ def update_backlog_item_status(
 
 @router.get("/summary")
 def get_backlog_summary(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     バックログのサマリー情報を取得
     
     ステータス別の件数、優先度別の件数などを返す
     """
-    # バックログステータスを更新
-    update_project_backlog(db, project.id)
+    not_modified = check_project_not_modified(request, response, project, db)
+    if not_modified:
+        return not_modified
     
     items = crud.get_backlog_items(db, project.id)
     
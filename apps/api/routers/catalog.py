@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+import crud
+from database import get_read_db
+from services.catalog_loader import reload_catalog
+
+router = APIRouter(prefix="/api/catalog", tags=["catalog"])
+
+
+@router.get("/version")
+def get_catalog_version(db: Session = Depends(get_read_db)):
+    """現在のカタログバージョンを取得"""
+    version = crud.get_catalog_version(db)
+    if not version:
+        return {'version': 0, 'catalog_hash': None, 'loaded_at': None}
+    
+    return {
+        'version': version.id,
+        'catalog_hash': version.catalog_hash,
+        'loaded_at': version.created_at
+    }
+
+
+@router.post("/reload")
+def reload():
+    """
+    カタログを再読込（管理用）
+    
+    CATALOG_PATHのYAMLを読み直し、コンテンツハッシュで差分を取って
+    変更のあった設定項目のみを反映する。APIの再起動は不要。
+    """
+    result = reload_catalog()
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Catalog could not be loaded"
+        )
+    return result
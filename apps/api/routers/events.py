@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Callable, Dict, Any
+from database import get_read_session_factory
+from dependencies import get_project_or_404
+from services.event_bus import get_event_bus, format_sse, Subscription
+from services.project_events import compute_progress
+
+router = APIRouter(prefix="/api/projects/{project_id}", tags=["events"])
+
+# 接続維持のためのコメント送信間隔（秒）
+HEARTBEAT_INTERVAL = 15.0
+
+
+async def event_stream(request: Request, subscription: Subscription, initial: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    SSEストリーム本体
+    
+    接続直後に現在の進捗を送り、以降は発行されたイベントを順に送る。
+    イベントが無い間は一定間隔でコメント行を送り、切断を検知したら購読を解除する。
+    """
+    try:
+        yield format_sse(initial)
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse(event)
+    finally:
+        subscription.close()
+
+
+def _initial_event(project_id: int, session_factory: Callable[[], Session]) -> Dict[str, Any]:
+    """接続時点の進捗イベントを作成（存在しないプロジェクトは404）"""
+    db = session_factory()
+    try:
+        project = get_project_or_404(project_id, db)
+        return {
+            'type': 'progress',
+            'revision': project.revision,
+            'progress': compute_progress(db, project)
+        }
+    finally:
+        db.close()
+
+
+@router.get("/events")
+async def stream_project_events(
+    project_id: int,
+    request: Request,
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory)
+):
+    """
+    プロジェクトのイベントをServer-Sent Eventsで配信
+    
+    - progress: 接続時点の進捗
+    - backlog: 回答送信・バックログ更新によるステータス変化、展開された項目、進捗
+    - artifacts: 成果物の生成完了
+    
+    ストリーム中にDB接続を保持しないよう、セッションは初期イベントの作成後すぐに閉じる。
+    初期イベントの作成中に発行されたイベントを取りこぼさないよう、先に購読を始める
+    （初期イベントに反映済みの変更が重ねて届くことはある。revision で判別できる）。
+    """
+    subscription = get_event_bus().subscribe(project_id)
+    try:
+        initial = await run_in_threadpool(_initial_event, project_id, session_factory)
+    except Exception:
+        subscription.close()
+        raise
+    return StreamingResponse(
+        event_stream(request, subscription, initial),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, List, Optional, Tuple
 import crud
 import schemas
 import models
-from database import get_db
-from dependencies import get_project_or_404
+from database import get_db, get_read_db, get_read_session_factory
+from dependencies import get_project_or_404, get_project_for_read_or_404
+from services.dependency_engine import update_project_backlog
+from services.project_events import publish_backlog_changes, snapshot_backlog
+from services.tabular_export import (
+    CSV, MEDIA_TYPES, PARQUET, ExportFormatUnavailable, ExportTable, export_stream
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,6 +65,39 @@ def _select_initial_backlog_items(
     return selected
 
 
+def _module_scope_changes(
+    db: Session,
+    project: models.Project,
+    old_modules: Optional[List[str]]
+) -> Tuple[List[str], List[str]]:
+    """
+    対象モジュールの変更で追加・削除するバックログ項目を求める
+    
+    追加したモジュールには作成時と同じ規則（_select_initial_backlog_items）で項目を追加し、
+    外したモジュールの項目（回答で展開した項目を含む）は削除する。
+    
+    Returns:
+        (追加する設定項目ID, 削除する設定項目ID)
+    """
+    config_items = crud.get_config_items(db)
+    module_of = {item.id: item.module for item in config_items}
+    all_modules = set(module_of.values())
+    before = all_modules if old_modules is None else set(old_modules)
+    after = all_modules if project.modules is None else set(project.modules)
+    
+    existing = {row.config_item_id for row in crud.get_backlog_rows(db, project.id)}
+    added_modules = after - before
+    add_ids = [
+        item.id
+        for item in _select_initial_backlog_items(
+            [item for item in config_items if item.module in added_modules], project
+        )
+        if item.id not in existing
+    ]
+    remove_ids = sorted(config_item_id for config_item_id in existing if module_of.get(config_item_id) not in after)
+    return add_ids, remove_ids
+
+
 @router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
 def create_project(
     project: schemas.ProjectCreate,
@@ -69,16 +108,24 @@ def create_project(
     
     プロジェクト作成時に、入力内容に応じて必要な設定項目をバックログに自動追加。
     P0項目は全て追加、P1項目は入力値に基づいて条件付き追加。
+    modulesを指定した場合は、そのモジュールの設定項目のみを対象とする。
     """
     # プロジェクト作成
     db_project = crud.create_project(db, project)
     
-    # 入力値に基づいてバックログ項目を選択
-    config_items = crud.get_config_items(db)
+    # 入力値に基づいてバックログ項目を選択（対象モジュールのみ）
+    config_items = crud.get_config_items(db, modules=project.modules)
     selected_items = _select_initial_backlog_items(config_items, project)
     
-    for item in selected_items:
-        crud.create_backlog_item(db, db_project.id, item.id)
+    crud.create_backlog_items(
+        db, db_project.id,
+        [(item.id, models.BacklogStatus.PENDING) for item in selected_items],
+        revision=db_project.revision
+    )
+    
+    # 初期ステータス（READY / BLOCKED）を算出
+    mode_filter = db_project.mode.value if db_project.mode else 'EXPERT'
+    update_project_backlog(db, db_project.id, mode_filter=mode_filter)
     
     logger.info(
         f"Project {db_project.id} created with {len(selected_items)} backlog items "
@@ -93,7 +140,7 @@ def create_project(
 def list_projects(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """プロジェクト一覧を取得（統計情報付き）"""
     projects = crud.get_projects(db, skip=skip, limit=limit)
@@ -120,10 +167,77 @@ def list_projects(
     return result
 
 
+@router.get("/open-tbds", response_model=List[schemas.ProjectTbdSummary])
+def list_open_tbds(db: Session = Depends(get_read_db)):
+    """
+    全プロジェクトの未決定（TBD）項目数を取得（多い順）
+    
+    バックログの回答状態と、保存済みの成果物の TBD 数を集計するだけで、
+    成果物を再レンダリングしない。
+    """
+    summaries = {
+        project_id: schemas.ProjectTbdSummary(
+            project_id=project_id, name=name, open_tbd=0, by_priority={}, artifact_tbd={}
+        )
+        for project_id, name in crud.get_project_names(db)
+    }
+    for project_id, priority, count in crud.get_open_tbd_counts(db):
+        summary = summaries.get(project_id)
+        if summary is not None:
+            summary.open_tbd += count
+            summary.by_priority[priority or '-'] = count
+    for project_id, artifact_type, tbd_count in crud.get_latest_artifact_tbd_counts(db):
+        summary = summaries.get(project_id)
+        if summary is not None:
+            summary.artifact_tbd[artifact_type] = tbd_count or 0
+    
+    return sorted(summaries.values(), key=lambda summary: (-summary.open_tbd, summary.project_id))
+
+
+@router.get("/export/csv")
+def export_portfolio_csv(
+    table: ExportTable = Query(ExportTable.CONFIG_ITEMS, description="Table to export"),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory)
+):
+    """
+    全プロジェクトの設定項目・決定事項・回答の表をCSV形式でエクスポート
+    
+    project_id 列つきで全プロジェクトの行を1つのファイルに出力する。
+    DB のカーソルから一定行数ずつ読みながらストリーミングし、全行をメモリに載せない。
+    """
+    return StreamingResponse(
+        export_stream(table, CSV, session_factory),
+        media_type=MEDIA_TYPES[CSV],
+        headers={
+            "Content-Disposition": f"attachment; filename=imgquest_{table.value}.csv"
+        }
+    )
+
+
+@router.get("/export/parquet")
+def export_portfolio_parquet(
+    table: ExportTable = Query(ExportTable.CONFIG_ITEMS, description="Table to export"),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory)
+):
+    """全プロジェクトの表をParquet形式でエクスポート（pyarrow が必要、一定行数ごとに1行グループ）"""
+    try:
+        chunks = export_stream(table, PARQUET, session_factory)
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[PARQUET],
+        headers={
+            "Content-Disposition": f"attachment; filename=imgquest_{table.value}.parquet"
+        }
+    )
+
+
 @router.get("/{project_id}", response_model=schemas.ProjectWithStats)
 def get_project(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """プロジェクト詳細を取得"""
     # 統計情報を計算
@@ -147,10 +261,34 @@ def update_project(
     project: models.Project = Depends(get_project_or_404),
     db: Session = Depends(get_db)
 ):
-    """プロジェクトを更新"""
+    """
+    プロジェクトを更新
+    
+    対象モジュールを変更した場合は、追加したモジュールの項目をバックログに追加し、
+    外したモジュールの項目を削除する。
+    """
+    old_modules = list(project.modules) if project.modules is not None else None
+    backlog_before = snapshot_backlog(db, project.id)
+    
     updated = crud.update_project(db, project.id, project_update)
     if not updated:
         raise HTTPException(status_code=404, detail="Project not found")
+    revision = updated.revision
+    
+    if 'modules' in project_update.model_fields_set and updated.modules != old_modules:
+        add_ids, remove_ids = _module_scope_changes(db, updated, old_modules)
+        if add_ids or remove_ids:
+            revision = crud.replace_backlog_scope(db, updated.id, add_ids, remove_ids)
+            logger.info(
+                f"Project {updated.id} modules changed: "
+                f"{len(add_ids)} backlog items added, {len(remove_ids)} removed"
+            )
+    
+    # モード・対象モジュールの変更で依存関係の判定が変わるため再計算
+    mode_filter = updated.mode.value if updated.mode else 'EXPERT'
+    update_project_backlog(db, updated.id, mode_filter=mode_filter)
+    publish_backlog_changes(db, updated, backlog_before, revision)
+    db.refresh(updated)
     return updated
 
 
@@ -1,41 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import crud
 import schemas
 import models
-from database import get_db
-from dependencies import get_project_or_404
+from database import get_db, get_read_db
+from dependencies import get_project_or_404, get_project_for_read_or_404, check_project_not_modified
 from services.dependency_engine import (
     get_next_questions_for_project,
     update_project_backlog,
-    expand_backlog_after_answer
+    expand_backlog_after_answer,
+    simulate_answers
 )
+from services.project_events import compute_progress, snapshot_backlog, publish_backlog_changes
+from services.answer_history import answers_as_of, diff_revisions
 
 router = APIRouter(prefix="/api/projects/{project_id}/wizard", tags=["wizard"])
 
 
 @router.get("/questions", response_model=schemas.Question)
 def get_next_question(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    ranking: str = Query('priority', pattern='^(priority|impact)$', description="priority: by priority; impact: by how many items it unblocks"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     次に回答すべき質問を取得
     
     依存関係を考慮し、READYステータスの質問の中から
     優先度の高いものを1つ返す。
+    ranking=impact の場合は、推移的に解放する下流項目が多いものを優先する。
     プロジェクトのmodeに応じてフィルタリングする。
     """
     # プロジェクトのmodeを取得
     mode_filter = project.mode.value if project.mode else 'EXPERT'
     is_beginner = mode_filter == 'BEGINNER'
     
-    # バックログステータスを更新（mode_filter を渡して依存関係チェックに反映）
-    update_project_backlog(db, project.id, mode_filter=mode_filter)
-    
-    # プロジェクトのmodeに応じて質問を取得
-    next_questions = get_next_questions_for_project(db, project.id, limit=1, mode_filter=mode_filter)
+    # プロジェクトのmodeに応じて質問を取得（ステータスは書き込み時に更新済み）
+    next_questions = get_next_questions_for_project(
+        db, project.id, limit=1, mode_filter=mode_filter, ranking=ranking
+    )
     
     if not next_questions:
         raise HTTPException(
@@ -103,8 +107,8 @@ def get_next_question(
 @router.get("/questions/{config_item_id}", response_model=schemas.Question)
 def get_question_by_id(
     config_item_id: str,
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     指定されたconfig_item_idの質問を取得
@@ -172,22 +176,95 @@ def get_question_by_id(
     )
 
 
+@router.get("/answers")
+def get_answers(
+    as_of: Optional[int] = Query(None, ge=1, description="Project revision to reconstruct answers at"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    プロジェクトの回答を取得
+    
+    {config_item_id: {input_name: value}} の辞書形式で返す。
+    as_of（プロジェクトリビジョン）を指定した場合は、その時点の回答を版の履歴から復元する。
+    """
+    if as_of is not None:
+        return {
+            config_item_id: version.answer_values
+            for config_item_id, version in answers_as_of(db, project.id, as_of).items()
+        }
+    
+    answers = {}
+    for answer in crud.get_answers(db, project.id):
+        answers.setdefault(answer.config_item_id, {})[answer.input_name] = answer.value
+    return answers
+
+
 @router.get("/answers/{config_item_id}")
 def get_answers_for_item(
     config_item_id: str,
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    as_of: Optional[int] = Query(None, ge=1, description="Project revision to reconstruct answers at"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     指定されたconfig_item_idの回答を取得
     
     {input_name: value} の辞書形式で返す。
     回答が存在しない場合は空の辞書を返す。
+    as_of（プロジェクトリビジョン）を指定した場合は、その時点の回答を返す。
     """
+    if as_of is not None:
+        versions = crud.get_answer_versions_as_of(db, project.id, as_of, config_item_id=config_item_id)
+        return (versions[0].answer_values or {}) if versions else {}
+    
     answers = crud.get_answers_by_config_item(db, project.id, config_item_id)
     return {answer.input_name: answer.value for answer in answers}
 
 
+@router.get("/history", response_model=List[schemas.AnswerVersion])
+def get_history(
+    as_of: Optional[int] = Query(None, ge=1, description="Project revision (defaults to the current revision)"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    指定したプロジェクトリビジョン時点の、設定項目ごとの最新の版（回答と決定事項）を取得
+    """
+    return crud.get_answer_versions_as_of(db, project.id, as_of if as_of is not None else project.revision)
+
+
+@router.get("/history/diff", response_model=schemas.AnswerDiff)
+def get_history_diff(
+    from_revision: int = Query(..., ge=0, description="Base project revision"),
+    to_revision: Optional[int] = Query(None, ge=0, description="Target project revision (defaults to the current revision)"),
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    2つのプロジェクトリビジョン間の回答の差分を取得
+    
+    設定項目ごとに追加・変更された入力項目と、変更前後の値を返す。
+    """
+    if to_revision is None:
+        to_revision = project.revision
+    return schemas.AnswerDiff(
+        from_revision=from_revision,
+        to_revision=to_revision,
+        items=diff_revisions(db, project.id, from_revision, to_revision)
+    )
+
+
+@router.get("/history/{config_item_id}", response_model=List[schemas.AnswerVersion])
+def get_item_history(
+    config_item_id: str,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """設定項目の回答・決定事項の全ての版を取得（古い順）"""
+    return crud.get_answer_versions(db, project.id, config_item_id)
+
+
 @router.post("/answers", status_code=status.HTTP_201_CREATED)
 def submit_answer(
     answer_data: schemas.AnswerSubmit,
@@ -198,7 +275,8 @@ def submit_answer(
     ウィザードの回答を送信
     
     複数の入力項目に対する回答を一度に保存し、
-    自動的にDecisionを作成する
+    設定項目ごとのDecisionを作成（再回答の場合は更新）する。
+    以前の回答・決定事項は版として履歴に残る。
     """
     # 設定項目が存在するか確認
     config_item = crud.get_config_item(db, answer_data.config_item_id)
@@ -208,26 +286,10 @@ def submit_answer(
             detail=f"ConfigItem {answer_data.config_item_id} not found"
         )
     
-    # 既存の回答を削除（上書き）
-    existing_answers = crud.get_answers_by_config_item(
-        db, project.id, answer_data.config_item_id
-    )
-    for existing in existing_answers:
-        db.delete(existing)
-    db.commit()
-    
-    # 回答を保存
-    saved_answers = []
-    for input_name, value in answer_data.answers.items():
-        answer = schemas.AnswerCreate(
-            config_item_id=answer_data.config_item_id,
-            input_name=input_name,
-            value=value
-        )
-        db_answer = crud.create_answer(db, project.id, answer)
-        saved_answers.append(db_answer)
+    # 差分イベント用に変更前のステータスを記録
+    backlog_before = snapshot_backlog(db, project.id)
     
-    # Decisionを作成
+    # Decisionの内容を作成
     rationale_parts = []
     for input_name, value in answer_data.answers.items():
         if isinstance(value, list):
@@ -242,26 +304,69 @@ def submit_answer(
         rationale="; ".join(rationale_parts),
         impact=config_item.description
     )
-    db_decision = crud.create_decision(db, project.id, decision)
+    
+    # リビジョンを進め、回答・決定事項の版を追記し現在値を置き換える（1トランザクション）
+    db_version, db_decision = crud.save_answer_version(
+        db, project.id, answer_data.config_item_id, answer_data.answers, decision
+    )
+    revision = db_version.revision
     
     # 回答に基づいてバックログを動的展開（P1項目の追加など）
+    # 展開・ステータス変更したアイテムにも同じリビジョンを記録する
     mode_filter = project.mode.value if project.mode else 'EXPERT'
     expand_backlog_after_answer(db, project.id, answer_data.config_item_id, mode_filter=mode_filter)
     
     # バックログステータスを更新
     update_project_backlog(db, project.id, mode_filter=mode_filter)
+    publish_backlog_changes(db, project, backlog_before, revision)
     
     return {
         'message': 'Answer submitted successfully',
-        'answers_count': len(saved_answers),
-        'decision_id': db_decision.id
+        'answers_count': len(answer_data.answers),
+        'decision_id': db_decision.id,
+        'version': db_version.version,
+        'revision': revision
     }
 
 
+@router.post("/simulate", response_model=schemas.SimulationResult)
+def simulate(
+    simulation: schemas.SimulationRequest,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
+):
+    """
+    回答の追加・取り消しを仮定した場合のバックログをシミュレーション（What-if）
+    
+    バックログの状態をメモリ上で複製して評価するため、DBは更新しない。
+    ステータスが変わる項目・新たに展開される項目・仮定後の進捗を返す。
+    """
+    config_item_ids = list(dict.fromkeys(simulation.answered + simulation.unanswered))
+    overlap = set(simulation.answered) & set(simulation.unanswered)
+    if overlap:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"ConfigItems both answered and unanswered: {', '.join(sorted(overlap))}"
+        )
+    found = {item.id for item in crud.get_config_items_by_ids(db, config_item_ids)}
+    missing = [config_item_id for config_item_id in config_item_ids if config_item_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ConfigItem {', '.join(missing)} not found"
+        )
+    
+    mode_filter = project.mode.value if project.mode else 'EXPERT'
+    result = simulate_answers(
+        db, project.id, simulation.answered, simulation.unanswered, mode_filter=mode_filter
+    )
+    return schemas.SimulationResult(revision=project.revision, **result)
+
+
 @router.get("/decisions", response_model=List[schemas.Decision])
 def get_decisions(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """プロジェクトの全決定事項を取得"""
     return crud.get_decisions(db, project.id)
@@ -269,37 +374,18 @@ def get_decisions(
 
 @router.get("/progress")
 def get_progress(
-    project: models.Project = Depends(get_project_or_404),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    project: models.Project = Depends(get_project_for_read_or_404),
+    db: Session = Depends(get_read_db)
 ):
     """
     ウィザードの進捗状況を取得
     
     プロジェクトのmodeに応じてカウント対象をフィルタリングする
     """
-    mode_filter = project.mode.value if project.mode else 'EXPERT'
-    is_beginner = mode_filter == 'BEGINNER'
-    
-    backlog_items = crud.get_backlog_items(db, project.id)
+    not_modified = check_project_not_modified(request, response, project, db)
+    if not_modified:
+        return not_modified
     
-    if is_beginner:
-        config_items_map = {item.id: item for item in crud.get_config_items(db)}
-        backlog_items = [
-            item for item in backlog_items
-            if config_items_map.get(item.config_item_id) and config_items_map[item.config_item_id].beginner_mode
-        ]
-    
-    total = len(backlog_items)
-    answered = sum(1 for item in backlog_items if item.answered)
-    ready = sum(1 for item in backlog_items if item.status == models.BacklogStatus.READY and not item.answered)
-    blocked = sum(1 for item in backlog_items if item.status == models.BacklogStatus.BLOCKED)
-    done = sum(1 for item in backlog_items if item.status == models.BacklogStatus.DONE)
-    
-    return {
-        'total': total,
-        'answered': answered,
-        'ready': ready,
-        'blocked': blocked,
-        'done': done,
-        'progress_percentage': round((answered / total * 100) if total > 0 else 0, 1)
-    }
+    return compute_progress(db, project)
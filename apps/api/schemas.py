@@ -15,6 +15,7 @@ class ProjectBase(BaseModel):
     industry: Optional[str] = None
     company_count: Optional[int] = None
     description: Optional[str] = None
+    modules: Optional[List[str]] = None  # 対象モジュール（Noneの場合は全モジュール）
 
 
 class ProjectCreate(ProjectBase):
@@ -31,11 +32,13 @@ class ProjectUpdate(BaseModel):
     industry: Optional[str] = None
     company_count: Optional[int] = None
     description: Optional[str] = None
+    modules: Optional[List[str]] = None
 
 
 class Project(ProjectBase):
     """プロジェクトレスポンススキーマ"""
     id: int
+    revision: int = 1
     created_at: datetime
     updated_at: datetime
     
@@ -52,6 +55,16 @@ class ProjectWithStats(Project):
     backlog_done: int = 0
 
 
+
+class ProjectTbdSummary(BaseModel):
+    """プロジェクトごとの未決定（TBD）項目数"""
+    project_id: int
+    name: str
+    open_tbd: int  # 未回答のバックログ項目数
+    by_priority: Dict[str, int]  # 優先度別の未回答の項目数
+    artifact_tbd: Dict[ArtifactType, int]  # 成果物の種類ごとの最新版の TBD 数
+
+
 # ========== ConfigItem ==========
 
 class ConfigItemInput(BaseModel):
@@ -64,6 +77,7 @@ class ConfigItemInput(BaseModel):
 class ConfigItem(BaseModel):
     """設定項目スキーマ"""
     id: str
+    module: Optional[str] = None
     title: str
     description: Optional[str] = None
     priority: Optional[str] = None
@@ -71,6 +85,8 @@ class ConfigItem(BaseModel):
     depends_on: List[str]
     produces: List[str]
     notes: Optional[List[str]] = None
+    test_perspectives: Optional[List[str]] = None
+    migration_object: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -98,6 +114,44 @@ class Answer(BaseModel):
         from_attributes = True
 
 
+class AnswerVersion(BaseModel):
+    """回答・決定事項の版"""
+    config_item_id: str
+    version: int
+    revision: int  # 記録時のプロジェクトリビジョン
+    answer_values: Optional[Dict[str, Any]] = None  # 移行前の決定事項のみの版はNone
+    decision_title: Optional[str] = None
+    decision_rationale: Optional[str] = None
+    decision_impact: Optional[str] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class AnswerInputChange(BaseModel):
+    """入力項目ごとの回答値の変化"""
+    input_name: str
+    before: Any = None
+    after: Any = None
+
+
+class AnswerDiffItem(BaseModel):
+    """設定項目ごとの回答の差分"""
+    config_item_id: str
+    change: str  # added / removed / changed
+    from_version: Optional[int] = None
+    to_version: Optional[int] = None
+    inputs: List[AnswerInputChange]
+
+
+class AnswerDiff(BaseModel):
+    """2つのプロジェクトリビジョン間の回答の差分"""
+    from_revision: int
+    to_revision: int
+    items: List[AnswerDiffItem]
+
+
 # ========== Decision ==========
 
 class DecisionCreate(BaseModel):
@@ -138,6 +192,7 @@ class BacklogItem(BaseModel):
     config_item_id: str
     status: BacklogStatus
     answered: bool
+    status_revision: int = 0
     created_at: datetime
     updated_at: datetime
     config_item: Optional[ConfigItem] = None
@@ -146,6 +201,44 @@ class BacklogItem(BaseModel):
         from_attributes = True
 
 
+class ExpansionPreviewItem(BaseModel):
+    """バックログ展開プレビューの項目"""
+    config_item_id: str
+    title: str
+    priority: Optional[str] = None
+    status: BacklogStatus
+
+
+class ExpansionPreview(BaseModel):
+    """バックログ展開プレビュー（回答した場合に追加される項目）"""
+    config_item_id: str
+    items: List[ExpansionPreviewItem]
+
+
+class SimulationRequest(BaseModel):
+    """回答変更のシミュレーション条件"""
+    answered: List[str] = []  # 回答したと仮定する設定項目ID
+    unanswered: List[str] = []  # 回答を取り消したと仮定する設定項目ID
+
+
+class SimulatedItem(BaseModel):
+    """シミュレーションでステータスが変わる（または追加される）バックログ項目"""
+    config_item_id: str
+    title: str
+    priority: Optional[str] = None
+    status: BacklogStatus
+    previous_status: Optional[BacklogStatus] = None  # 追加される項目の場合はNone
+
+
+class SimulationResult(BaseModel):
+    """回答変更のシミュレーション結果（DBは更新しない）"""
+    revision: int  # シミュレーションの基準にしたプロジェクトリビジョン
+    changed: List[SimulatedItem]
+    added: List[SimulatedItem]
+    progress: Dict[str, Any]
+    current_progress: Dict[str, Any]
+
+
 # ========== Artifact ==========
 
 class ArtifactGenerate(BaseModel):
@@ -166,6 +259,38 @@ class Artifact(BaseModel):
         from_attributes = True
 
 
+class ArtifactSummary(BaseModel):
+    """成果物一覧の項目（本文を含まない）"""
+    id: int
+    project_id: int
+    artifact_type: ArtifactType
+    tbd_count: int
+    created_at: datetime
+    size: int  # 本文のバイト数（UTF-8、圧縮前）
+    content_hash: str  # 本文のSHA-256
+    
+    class Config:
+        from_attributes = True
+
+
+class ArtifactDiffItem(BaseModel):
+    """成果物の行（設定項目）ごとの差分"""
+    key: str  # 設定項目ID
+    change: str  # added / removed / changed
+    before: Optional[str] = None
+    after: Optional[str] = None
+    diff: List[str] = []  # changed の場合の unified diff（ヘッダ行を除く）
+
+
+class ArtifactDiff(BaseModel):
+    """成果物の2つの版の差分"""
+    artifact_type: ArtifactType
+    from_id: int
+    to_id: int
+    items: List[ArtifactDiffItem]
+    unchanged: int  # 変わらなかった行の数
+
+
 # ========== Wizard ==========
 
 class QuestionInput(BaseModel):
@@ -0,0 +1,74 @@
+"""
+回答履歴（時点指定の復元と版間の差分）
+
+現在値は answers / decisions を読むだけで済むため、この処理は
+answer_versions（追記のみ）を引く必要がある履歴系の参照でのみ使う。
+"""
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+import crud
+import models
+
+
+def answers_as_of(db: Session, project_id: int, revision: int) -> Dict[str, models.AnswerVersion]:
+    """
+    指定したプロジェクトリビジョン時点の回答を復元
+
+    Returns:
+        設定項目ID → その時点で最新の版（回答値が記録されていない移行前の版は除く）
+    """
+    return {
+        version.config_item_id: version
+        for version in crud.get_answer_versions_as_of(db, project_id, revision)
+        if version.answer_values is not None
+    }
+
+
+def diff_answer_values(before: Dict[str, Any], after: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """入力項目ごとの回答値の変化（値が同じ入力項目は含まない）"""
+    return [
+        {'input_name': name, 'before': before.get(name), 'after': after.get(name)}
+        for name in sorted(set(before) | set(after))
+        if before.get(name) != after.get(name)
+    ]
+
+
+def diff_revisions(db: Session, project_id: int, from_revision: int, to_revision: int) -> List[Dict[str, Any]]:
+    """
+    2つのプロジェクトリビジョン間の回答の差分
+
+    Returns:
+        設定項目ごとの差分 [{'config_item_id', 'change', 'from_version', 'to_version', 'inputs'}]
+        change は added（新規回答）/ removed（回答なしに戻った）/ changed（回答値の変更）
+    """
+    before = answers_as_of(db, project_id, from_revision)
+    after = answers_as_of(db, project_id, to_revision)
+
+    items = []
+    for config_item_id in sorted(set(before) | set(after)):
+        old = before.get(config_item_id)
+        new = after.get(config_item_id)
+        if old is not None and new is not None and old.version == new.version:
+            continue
+
+        inputs = diff_answer_values(
+            old.answer_values if old is not None else {},
+            new.answer_values if new is not None else {}
+        )
+        if old is None:
+            change = 'added'
+        elif new is None:
+            change = 'removed'
+        elif inputs:
+            change = 'changed'
+        else:
+            continue  # 同じ値で再回答した
+
+        items.append({
+            'config_item_id': config_item_id,
+            'change': change,
+            'from_version': old.version if old is not None else None,
+            'to_version': new.version if new is not None else None,
+            'inputs': inputs
+        })
+    return items
@@ -0,0 +1,84 @@
+"""
+成果物の版間の差分
+
+成果物の生成時に記録した行ごとの出力（設定項目ID → Markdown）を版どうしで比べ、
+追加・削除・変更された行だけを返す。巨大な Markdown 全体をテキスト差分にかけず、
+unified diff は変更された行の出力に対してだけ作る。
+
+差分は版の組ごとに、行ごとの出力のハッシュの組をキーにしてプロセス内でキャッシュする
+（内容で引くため、IDの再利用や同じ内容の別プロジェクトの版でも正しく共有できる）。
+"""
+from typing import Any, Dict, List, Optional
+import difflib
+import threading
+
+import models
+from config import get_settings
+from services.artifact_fragments import FragmentCache
+
+
+def diff_items(before: Dict[str, str], after: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    行ごとの出力の差分
+
+    Returns:
+        変わった行 [{'key', 'change', 'before', 'after', 'diff'}]（比較先の並び順、削除された行は末尾）
+        change は added / removed / changed。diff は changed の行の unified diff
+    """
+    items = []
+    for key, text in after.items():
+        previous = before.get(key)
+        if previous is None:
+            items.append({'key': key, 'change': 'added', 'before': None, 'after': text, 'diff': []})
+        elif previous != text:
+            items.append({
+                'key': key,
+                'change': 'changed',
+                'before': previous,
+                'after': text,
+                'diff': list(difflib.unified_diff(previous.splitlines(), text.splitlines(), lineterm='', n=1))[2:],
+            })
+    for key, text in before.items():
+        if key not in after:
+            items.append({'key': key, 'change': 'removed', 'before': text, 'after': None, 'diff': []})
+    return items
+
+
+def diff_artifacts(old: models.Artifact, new: models.Artifact) -> Optional[Dict[str, Any]]:
+    """
+    2つの版の差分（キャッシュ済みならそれを返す）
+
+    Returns:
+        {'from_id', 'to_id', 'items', 'unchanged'}。どちらかの版に行ごとの出力が
+        記録されていない場合はNone
+    """
+    if old.items_hash is None or new.items_hash is None:
+        return None
+
+    cache = get_diff_cache()
+    key = (old.items_hash, new.items_hash)
+    result = cache.get(key)
+    if result is None:
+        before = old.items
+        after = new.items
+        items = diff_items(before, after)
+        result = {
+            'items': items,
+            'unchanged': len(after) - sum(1 for item in items if item['change'] != 'removed'),
+        }
+        cache.put(key, result)
+    return {'from_id': old.id, 'to_id': new.id, **result}
+
+
+_cache_lock = threading.Lock()
+_diff_cache: Optional[FragmentCache] = None
+
+
+def get_diff_cache() -> FragmentCache:
+    """版の組ごとの差分のキャッシュ"""
+    global _diff_cache
+    if _diff_cache is None:
+        with _cache_lock:
+            if _diff_cache is None:
+                _diff_cache = FragmentCache(get_settings().artifact_diff_cache_size)
+    return _diff_cache
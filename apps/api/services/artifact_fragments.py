@@ -0,0 +1,76 @@
+"""
+成果物の項目単位フラグメントキャッシュ
+
+成果物テンプレートの行（設定項目・決定事項）を、内容を表すキー
+（設定項目ID, カタログ上のコンテンツハッシュ, ステータス, 回答のハッシュ）でキャッシュする。
+キャッシュした行には、テンプレートごとにレンダリング済みのフラグメントを持たせるため、
+回答が1件変わった場合に再レンダリングするのはその項目の行だけになる。
+
+キーに内容を含めるので明示的な無効化は不要で、古いキーは件数上限（LRU）で追い出される。
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import hashlib
+import json
+import threading
+
+from config import get_settings
+
+
+def digest(value: Any) -> bytes:
+    """JSONに変換できる値のハッシュ（キャッシュキー用）"""
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+class FragmentCache:
+    """件数上限付きのLRUキャッシュ（スレッドセーフ）"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache_lock = threading.Lock()
+_fragment_cache: Optional[FragmentCache] = None
+
+
+def get_fragment_cache() -> FragmentCache:
+    """プロセス内で共有するフラグメントキャッシュ"""
+    global _fragment_cache
+    if _fragment_cache is None:
+        with _cache_lock:
+            if _fragment_cache is None:
+                _fragment_cache = FragmentCache(get_settings().artifact_fragment_cache_size)
+    return _fragment_cache
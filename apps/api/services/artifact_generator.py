@@ -1,10 +1,18 @@
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Set
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from io import BytesIO
 import json
+import threading
+from types import SimpleNamespace
 import crud
 import models
+from config import get_settings
+from services import artifact_templates
+from services.artifact_fragments import digest, get_fragment_cache
 
 
 class ArtifactGenerator:
@@ -13,32 +21,241 @@ class ArtifactGenerator:
     def __init__(self, db: Session, project_id: int):
         self.db = db
         self.project_id = project_id
+        self._context = None
+        # 成果物の種類ごとの、行の key → 出力（generate 時に記録、版間の差分に使う）
+        self.item_fragments: Dict[models.ArtifactType, Dict[str, str]] = {}
+        # 成果物の種類ごとの、出力した未回答の行の key（generate 時に記録、TBD 数）
+        self.tbd_items: Dict[models.ArtifactType, Set[str]] = {}
         self._load_data()
     
     def _load_data(self):
-        """必要なデータを読み込む"""
-        self.project = crud.get_project(self.db, self.project_id)
-        self.decisions = crud.get_decisions(self.db, self.project_id)
-        self.backlog_items = crud.get_backlog_items(self.db, self.project_id)
-        self.answers = crud.get_answers(self.db, self.project_id)
-        
-        # 設定項目マスタ
-        all_config_items = crud.get_config_items(self.db)
-        self.config_items = {item.id: item for item in all_config_items}
-        
-        # 回答済み設定項目
-        self.answered_config_ids = set(answer.config_item_id for answer in self.answers)
+        """
+        Markdown成果物に必要なデータを列単位で読み込む
         
-        # 回答をconfig_item_id別に整理
-        self.answers_by_config = {}
+        設定項目の本体（ORMオブジェクト）は、フラグメントキャッシュに無い行の分だけ後で読む。
+        """
+        self.project = crud.get_project(self.db, self.project_id)
+        self.backlog_rows = crud.get_backlog_rows(self.db, self.project_id)
+        self.decision_rows = crud.get_decision_rows(self.db, self.project_id)
+        self.config_item_hashes = crud.get_config_item_hashes(self.db)
+        
+        # 回答値をconfig_item_id別に整理（入力名, 値）
+        self.answer_values = {}
+        for config_item_id, input_name, value in crud.get_answer_rows(self.db, self.project_id):
+            self.answer_values.setdefault(config_item_id, []).append((input_name, value))
+    
+    # JSON / XLSX エクスポート用のORMオブジェクト（参照時に読み込む）
+    
+    @cached_property
+    def decisions(self) -> List[models.Decision]:
+        return crud.get_decisions(self.db, self.project_id)
+    
+    @cached_property
+    def backlog_items(self) -> List[models.BacklogItem]:
+        return crud.get_backlog_items(self.db, self.project_id)
+    
+    @cached_property
+    def answers(self) -> List[models.Answer]:
+        return crud.get_answers(self.db, self.project_id)
+    
+    @cached_property
+    def config_items(self) -> Dict[str, models.ConfigItem]:
+        """設定項目マスタ"""
+        return {item.id: item for item in crud.get_config_items(self.db)}
+    
+    @cached_property
+    def answered_config_ids(self) -> Set[str]:
+        """回答済み設定項目"""
+        return set(answer.config_item_id for answer in self.answers)
+    
+    @cached_property
+    def answers_by_config(self) -> Dict[str, List[models.Answer]]:
+        """回答をconfig_item_id別に整理"""
+        answers_by_config = {}
         for answer in self.answers:
-            if answer.config_item_id not in self.answers_by_config:
-                self.answers_by_config[answer.config_item_id] = []
-            self.answers_by_config[answer.config_item_id].append(answer)
+            answers_by_config.setdefault(answer.config_item_id, []).append(answer)
+        return answers_by_config
+    
+    def _load_config_items(self, config_item_ids: Set[str]) -> Dict[str, models.ConfigItem]:
+        """キャッシュに無い行の設定項目を読み込む（大半が必要な場合はまとめて読む）"""
+        if not config_item_ids:
+            return {}
+        if 'config_items' in self.__dict__ or len(config_item_ids) > len(self.config_item_hashes) // 2:
+            return self.config_items
+        return {
+            item.id: item
+            for item in crud.get_config_items_by_ids(self.db, sorted(config_item_ids))
+        }
+    
+    def _item_row(self, config_item: models.ConfigItem, status: models.BacklogStatus, answered: bool, answers: list) -> SimpleNamespace:
+        produces = config_item.produces or []
+        return SimpleNamespace(
+            key=config_item.id,
+            id=config_item.id,
+            title=config_item.title,
+            description=config_item.description,
+            priority=config_item.priority,
+            status=status.value,
+            answered=answered,
+            depends_on=config_item.depends_on or [],
+            produces=produces,
+            answers=answers,
+            test_perspectives=self._test_perspectives(config_item) if answered else [],
+            migration_object=(
+                (config_item.migration_object or config_item.title) if 'MIGRATION_VIEW' in produces else None
+            ),
+            fragments={},
+        )
+    
+    def _decision_row(self, decision, config_item: Optional[models.ConfigItem]) -> SimpleNamespace:
+        config_item_id, title, rationale, impact, status, created_at = decision
+        return SimpleNamespace(
+            key=config_item_id,
+            config_item_id=config_item_id,
+            title=title,
+            priority=config_item.priority if config_item else None,
+            decided_at=created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            status=status,
+            rationale=rationale,
+            impact=impact,
+            fragments={},
+        )
+    
+    def _build_context(self) -> Dict[str, Any]:
+        """
+        テンプレートに渡すコンテキストを組み立てる（生成器ごとに1度だけ）
+        
+        全ての成果物テンプレートが同じコンテキストを使うため、
+        追加ディレクトリに置いた独自テンプレートからも同じ値を参照できる:
+        
+        - project: プロジェクトの列の値（ORMオブジェクトではない）
+        - generated_at: 生成日時（UTC、'%Y-%m-%d %H:%M:%S'）
+        - summary: total / done / ready / blocked / done_rate / answered / test_cases
+        - items: バックログ順の設定項目（id, title, description, priority, status, answered,
+          depends_on, produces, answers[(入力名, 値)], test_perspectives（回答済みのみ）,
+          migration_object（MIGRATION_VIEW を出力する項目のみ））
+        - decisions: 決定事項（config_item_id, title, priority, decided_at, status, rationale, impact）
+        
+        items / decisions の行は key（設定項目ID）を持ち、cached フィルタで出力した部分が
+        版間の差分（項目単位）の単位になる。
+        
+        コンテキストはDBセッションに触れない読み取り専用のスナップショットで、複数のスレッドから
+        同時にレンダリングできる。行は SimpleNamespace で渡し、テンプレートからの属性参照を
+        getattr の1回で済ませる。
+        行は (設定項目ID, コンテンツハッシュ, ステータス, 回答のハッシュ) をキーにフラグメントキャッシュに
+        保持され、前回から変わっていない行はレンダリング済みのフラグメントごと再利用される。
+        """
+        if self._context is not None:
+            return self._context
+        
+        cache = get_fragment_cache()
+        hashes = self.config_item_hashes
+        
+        # 1. キャッシュ済みの行を引き、無い行を洗い出す
+        items = []
+        missing_items = []  # (位置, キー, バックログ行)
+        for backlog_row in self.backlog_rows:
+            config_item_id, status, answered = backlog_row[1], backlog_row[2], backlog_row[3]
+            if config_item_id not in hashes:
+                continue
+            
+            answers = self.answer_values.get(config_item_id, []) if answered else []
+            content_hash = hashes[config_item_id]
+            key = None
+            if content_hash is not None:
+                key = ('item', config_item_id, content_hash, status, answered, digest(answers) if answers else None)
+                row = cache.get(key)
+                if row is not None:
+                    items.append(row)
+                    continue
+            missing_items.append((len(items), key, backlog_row, answers))
+            items.append(None)
+        
+        decisions = []
+        missing_decisions = []
+        for decision in self.decision_rows:
+            content_hash = hashes.get(decision[0])
+            key = None
+            if content_hash is not None:
+                key = ('decision', content_hash, digest([str(value) for value in decision]))
+                row = cache.get(key)
+                if row is not None:
+                    decisions.append(row)
+                    continue
+            missing_decisions.append((len(decisions), key, decision))
+            decisions.append(None)
+        
+        # 2. 変わった行の分だけ設定項目を読み込んで行を作る
+        config_items = self._load_config_items(
+            {entry[2][1] for entry in missing_items} | {entry[2][0] for entry in missing_decisions}
+        )
+        for position, key, backlog_row, answers in missing_items:
+            row = self._item_row(config_items[backlog_row[1]], backlog_row[2], backlog_row[3], answers)
+            items[position] = row
+            if key is not None:
+                cache.put(key, row)
+        for position, key, decision in missing_decisions:
+            row = self._decision_row(decision, config_items.get(decision[0]))
+            decisions[position] = row
+            if key is not None:
+                cache.put(key, row)
+        
+        total = len(self.backlog_rows)
+        status_counts = Counter(backlog_row[2] for backlog_row in self.backlog_rows)
+        done = status_counts[models.BacklogStatus.DONE]
+        answered_items = [item for item in items if item.answered]
+        self._context = {
+            'project': SimpleNamespace(**{
+                column.name: getattr(self.project, column.name) for column in models.Project.__table__.columns
+            }),
+            'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            'summary': {
+                'total': total,
+                'done': done,
+                'ready': status_counts[models.BacklogStatus.READY],
+                'blocked': status_counts[models.BacklogStatus.BLOCKED],
+                'done_rate': round(done / total * 100, 1) if total > 0 else 0,
+                'answered': len(answered_items),
+                'test_cases': sum(len(item.answers) + len(item.test_perspectives) for item in answered_items),
+            },
+            'items': items,
+            'decisions': decisions,
+        }
+        return self._context
     
-    def _count_tbd(self, content: str) -> int:
-        """TBD（未決定）の数をカウント"""
-        return content.count('TBD') + content.count('未決定')
+    def render(
+        self,
+        template: str,
+        item_fragments: Optional[Dict[str, str]] = None,
+        tbd_items: Optional[Set[str]] = None
+    ) -> str:
+        """
+        テンプレート名を指定して成果物をレンダリング
+        
+        item_fragments / tbd_items を渡すと、cached フィルタで出力した行の key ごとの出力と
+        未回答の行の key を記録する。
+        """
+        context = self._build_context()
+        if item_fragments is not None or tbd_items is not None:
+            context = dict(context, item_fragments=item_fragments, tbd_items=tbd_items)
+        return artifact_templates.render(template, context)
+    
+    def render_stream(self, template: str) -> Iterator[str]:
+        """テンプレート名を指定して成果物を断片ごとに出力"""
+        return artifact_templates.render_stream(template, self._build_context())
+    
+    def generate(self, artifact_type: models.ArtifactType) -> str:
+        """
+        成果物の種類に対応するテンプレートでレンダリング
+        
+        行ごとの出力を item_fragments に、出力した未回答の行を tbd_items に記録する。
+        """
+        item_fragments = {}
+        tbd_items = set()
+        content = self.render(artifact_templates.template_name(artifact_type), item_fragments, tbd_items)
+        self.item_fragments[artifact_type] = item_fragments
+        self.tbd_items[artifact_type] = tbd_items
+        return content
     
     def generate_decision_log(self) -> str:
         """
@@ -46,52 +263,7 @@ class ArtifactGenerator:
         
         全ての決定事項を時系列で記録
         """
-        lines = [
-            "# Decision Log（決定事項ログ）",
-            "",
-            f"**プロジェクト**: {self.project.name}",
-            f"**生成日時**: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC",
-            "",
-            "---",
-            ""
-        ]
-        
-        if not self.decisions:
-            lines.append("## まだ決定事項がありません")
-            lines.append("")
-            lines.append("ウィザードで質問に回答すると、ここに決定事項が記録されます。")
-        else:
-            lines.append("## 決定事項一覧")
-            lines.append("")
-            
-            for i, decision in enumerate(self.decisions, 1):
-                config_item = self.config_items.get(decision.config_item_id)
-                
-                lines.append(f"### {i}. {decision.title}")
-                lines.append("")
-                lines.append(f"- **設定項目ID**: {decision.config_item_id}")
-                if config_item:
-                    lines.append(f"- **優先度**: {config_item.priority}")
-                lines.append(f"- **決定日時**: {decision.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-                lines.append(f"- **ステータス**: {decision.status}")
-                lines.append("")
-                
-                if decision.rationale:
-                    lines.append("**決定内容**:")
-                    lines.append("")
-                    lines.append(decision.rationale)
-                    lines.append("")
-                
-                if decision.impact:
-                    lines.append("**影響範囲**:")
-                    lines.append("")
-                    lines.append(decision.impact)
-                    lines.append("")
-                
-                lines.append("---")
-                lines.append("")
-        
-        return "\n".join(lines)
+        return self.generate(models.ArtifactType.DECISION_LOG)
     
     def generate_config_workbook(self) -> str:
         """
@@ -99,259 +271,15 @@ class ArtifactGenerator:
         
         必要な設定項目を一覧表示（ID、タイトル、ステータス、依存関係）
         """
-        lines = [
-            "# Config Workbook（設定作業一覧）",
-            "",
-            f"**プロジェクト**: {self.project.name}",
-            f"**生成日時**: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC",
-            "",
-            "---",
-            ""
-        ]
-        
-        # サマリー
-        total = len(self.backlog_items)
-        done = sum(1 for item in self.backlog_items if item.status == models.BacklogStatus.DONE)
-        ready = sum(1 for item in self.backlog_items if item.status == models.BacklogStatus.READY)
-        blocked = sum(1 for item in self.backlog_items if item.status == models.BacklogStatus.BLOCKED)
-        
-        lines.append("## サマリー")
-        lines.append("")
-        lines.append(f"- **全設定項目数**: {total}")
-        lines.append(f"- **完了**: {done} ({round(done/total*100, 1) if total > 0 else 0}%)")
-        lines.append(f"- **対応可能**: {ready}")
-        lines.append(f"- **ブロック中**: {blocked}")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        
-        # 優先度別に整理
-        items_by_priority = {}
-        for item in self.backlog_items:
-            config_item = self.config_items.get(item.config_item_id)
-            if config_item:
-                priority = config_item.priority or 'UNKNOWN'
-                if priority not in items_by_priority:
-                    items_by_priority[priority] = []
-                items_by_priority[priority].append((item, config_item))
-        
-        # 優先度順に出力
-        for priority in ['P0', 'P1', 'P2', 'P3']:
-            if priority not in items_by_priority:
-                continue
-            
-            lines.append(f"## 優先度: {priority}")
-            lines.append("")
-            lines.append("| ID | タイトル | ステータス | 依存関係 | 設定値 |")
-            lines.append("|---|---|---|---|---|")
-            
-            for backlog_item, config_item in items_by_priority[priority]:
-                status_emoji = {
-                    models.BacklogStatus.DONE: "✅",
-                    models.BacklogStatus.READY: "🟢",
-                    models.BacklogStatus.BLOCKED: "🔴",
-                    models.BacklogStatus.PENDING: "⚪"
-                }.get(backlog_item.status, "❓")
-                
-                # 依存関係
-                depends = config_item.depends_on or []
-                depends_str = ", ".join(depends) if depends else "-"
-                
-                # 設定値
-                if backlog_item.answered:
-                    answers = self.answers_by_config.get(config_item.id, [])
-                    value_parts = []
-                    for ans in answers:
-                        val = ans.value
-                        if isinstance(val, list):
-                            val = ", ".join(str(v) for v in val)
-                        value_parts.append(f"{ans.input_name}={val}")
-                    value_str = "; ".join(value_parts) if value_parts else "設定済み"
-                else:
-                    value_str = "**TBD（未決定）**"
-                
-                lines.append(
-                    f"| {config_item.id} | {config_item.title} | "
-                    f"{status_emoji} {backlog_item.status.value} | {depends_str} | {value_str} |"
-                )
-            
-            lines.append("")
-        
-        return "\n".join(lines)
+        return self.generate(models.ArtifactType.CONFIG_WORKBOOK)
     
-    # 設定項目IDごとの固有テスト観点マッピング
-    _TEST_PERSPECTIVES = {
-        'FI-CORE-001': [
-            "会計年度が正しく設定され、期間が12ヶ月に分割されているか確認",
-            "年度を跨ぐ転記（3月末→4月初）が正しく処理されるか確認",
-            "特別期間（調整期間）の利用可否を確認",
-            "年度末の繰越処理が正常に動作するか確認",
-        ],
-        'FI-CORE-002': [
-            "会社コードでの転記が正しい通貨で記録されるか確認",
-            "外貨取引時に為替レートが適用されるか確認",
-            "国設定に基づく税制が正しくリンクされるか確認",
-            "複数会社コード間の会社間取引が正しく処理されるか確認",
-        ],
-        'FI-CORE-003': [
-            "締め後に通常ユーザーが転記できないことを確認",
-            "期間オープン/クローズの切替が正しく動作するか確認",
-            "例外許可設定が正しく機能するか確認",
-            "締め前の未転記伝票が警告されるか確認",
-        ],
-        'FI-CORE-004': [
-            "伝票タイプごとに採番が正しく連番で付与されるか確認",
-            "年度切替時に採番がリセットされるか確認",
-            "採番キーの組合せ（会社コード×年度×タイプ）が正しく動作するか確認",
-            "採番の重複が発生しないことを確認（同時転記テスト）",
-        ],
-        'FI-CORE-005': [
-            "BS/PL区分が正しく設定されているか確認",
-            "オープンアイテム管理対象の勘定で未消込明細が表示されるか確認",
-            "統制勘定への直接転記が禁止されているか確認",
-            "勘定科目グループの分類が正しいか確認",
-        ],
-        'FI-APAR-001': [
-            "BPマスタの登録・変更・照会が正しく動作するか確認",
-            "得意先/仕入先ロールが正しく設定されるか確認",
-            "BP番号の採番ルールが正しく動作するか確認",
-            "重複BPのチェック機能が動作するか確認",
-        ],
-        'FI-APAR-002': [
-            "統制勘定とサブレジャの残高が一致するか確認",
-            "統制勘定変更時の影響が正しく反映されるか確認",
-            "BPグループ別の統制勘定割当が正しいか確認",
-            "統制勘定への直接転記が禁止されているか確認",
-        ],
-        'FI-APAR-003': [
-            "支払条件に基づく支払期限が正しく計算されるか確認",
-            "消込処理（全額・部分）が正しく動作するか確認",
-            "支払方法（振込・手形等）の切替が正しく動作するか確認",
-            "締め日をまたぐ取引の支払期限計算を確認",
-        ],
-        'FI-TAX-001': [
-            "標準税率（10%）と軽減税率（8%）が正しく計算されるか確認",
-            "内税/外税の切替が正しく動作するか確認",
-            "税計算の端数処理（四捨五入/切り捨て/切り上げ）が正しいか確認",
-            "非課税・免税取引が正しく処理されるか確認",
-            "インボイス制度（適格請求書）への対応を確認",
-        ],
-        'FI-DIFF-001': [
-            "許容差額内の差額が自動消込されるか確認",
-            "許容差額を超える差額が手動消込に回されるか確認",
-            "差額勘定への自動転記が正しく行われるか確認",
-            "通貨端数処理が設定通りに動作するか確認",
-        ],
-        'FI-DIFF-002': [
-            "部分入金時の残余アイテムが正しく生成されるか確認",
-            "過払い時の処理（クレジットメモ/返金）が正しく動作するか確認",
-            "不足払い時の残余処理方針が設定通りに動作するか確認",
-            "複数明細の一括消込が正しく動作するか確認",
-        ],
-        'FI-CLOSE-001': [
-            "例外転記に適切な承認が要求されるか確認",
-            "監査ログに例外操作が記録されるか確認",
-            "承認なしの例外転記が拒否されるか確認",
-            "監査ログの保持期間設定が正しいか確認",
-            "期末決算時の例外権限が正しく管理されるか確認",
-        ],
-        'FI-RPT-001': [
-            "試算表の貸借が一致するか確認",
-            "未消込一覧に正しい明細が表示されるか確認",
-            "エイジング分析の期間区分が正しいか確認",
-            "レポート出力形式（画面/PDF/Excel/CSV）が正しく動作するか確認",
-            "月次/週次のレポート自動生成が正しくスケジューリングされるか確認",
-        ],
-    }
-
     def generate_test_view(self) -> str:
         """
         Test View（テスト観点）を生成
         
         各設定項目の固有テスト観点を提示
         """
-        lines = [
-            "# Test View（テスト観点）",
-            "",
-            f"**プロジェクト**: {self.project.name}",
-            f"**生成日時**: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC",
-            "",
-            "---",
-            "",
-            "## テスト観点一覧",
-            ""
-        ]
-        
-        tested_count = 0
-        total_test_cases = 0
-        
-        for item in self.backlog_items:
-            config_item = self.config_items.get(item.config_item_id)
-            if not config_item:
-                continue
-            
-            lines.append(f"### {config_item.id}: {config_item.title}")
-            lines.append("")
-            
-            if item.answered:
-                lines.append("**ステータス**: ✅ 設定済み")
-                lines.append("")
-                
-                lines.append("**テストケース**:")
-                lines.append("")
-                
-                case_num = 1
-                
-                # 設定値の反映確認テスト
-                answers = self.answers_by_config.get(config_item.id, [])
-                for ans in answers:
-                    val = ans.value
-                    if isinstance(val, list):
-                        val = ", ".join(str(v) for v in val)
-                    lines.append(f"{case_num}. **{ans.input_name}** の設定値 `{val}` が正しく反映されているか確認")
-                    case_num += 1
-                
-                # 項目固有のテスト観点を追加
-                specific_tests = self._TEST_PERSPECTIVES.get(config_item.id, [])
-                for test in specific_tests:
-                    lines.append(f"{case_num}. {test}")
-                    case_num += 1
-                
-                # 固有テストが無い場合はフォールバック
-                if not specific_tests:
-                    if config_item.description:
-                        lines.append(f"{case_num}. {config_item.description}に基づく動作確認")
-                        case_num += 1
-                    lines.append(f"{case_num}. 関連する画面/機能での動作確認")
-                    case_num += 1
-                
-                lines.append("")
-                total_test_cases += case_num - 1
-                tested_count += 1
-            else:
-                lines.append("**ステータス**: ⚠️ 未決定（TBD）")
-                lines.append("")
-                lines.append("設定が完了後、テスト観点を生成します。")
-                lines.append("")
-            
-            lines.append("---")
-            lines.append("")
-        
-        # サマリーを先頭に追加
-        summary = [
-            "## サマリー",
-            "",
-            f"- **テスト対象項目数**: {tested_count}/{len(self.backlog_items)}",
-            f"- **テストケース総数**: {total_test_cases}",
-            f"- **未決定項目数**: {len(self.backlog_items) - tested_count}",
-            "",
-            "---",
-            ""
-        ]
-        
-        lines = lines[:7] + summary + lines[7:]
-        
-        return "\n".join(lines)
+        return self.generate(models.ArtifactType.TEST_VIEW)
     
     def generate_migration_view(self) -> str:
         """
@@ -359,84 +287,18 @@ class ArtifactGenerator:
         
         移行が必要なオブジェクトを一覧化
         """
-        lines = [
-            "# Migration View（移行観点）",
-            "",
-            f"**プロジェクト**: {self.project.name}",
-            f"**生成日時**: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC",
-            "",
-            "---",
-            "",
-            "## 移行対象オブジェクト",
-            ""
-        ]
-        
-        migration_items = []
-        
-        for item in self.backlog_items:
-            config_item = self.config_items.get(item.config_item_id)
-            if not config_item:
-                continue
-            
-            # MIGRATION_VIEWを生成する設定項目のみ
-            produces = config_item.produces or []
-            if 'MIGRATION_VIEW' not in produces:
-                continue
-            
-            migration_items.append((item, config_item))
-        
-        if not migration_items:
-            lines.append("移行対象のマスタデータはありません。")
-        else:
-            lines.append("| 設定項目 | 移行オブジェクト | ステータス | 備考 |")
-            lines.append("|---|---|---|---|")
-            
-            for backlog_item, config_item in migration_items:
-                status = "✅ 設定済み" if backlog_item.answered else "⚠️ TBD（未決定）"
-                
-                # 移行オブジェクト名を推定
-                migration_object = self._estimate_migration_object(config_item)
-                
-                # 備考
-                notes = []
-                if backlog_item.answered:
-                    answers = self.answers_by_config.get(config_item.id, [])
-                    for ans in answers:
-                        notes.append(f"{ans.input_name}={ans.value}")
-                note_str = "; ".join(notes) if notes else "-"
-                
-                lines.append(
-                    f"| {config_item.title} | {migration_object} | {status} | {note_str} |"
-                )
-        
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        lines.append("## 移行手順")
-        lines.append("")
-        lines.append("1. マスタデータの抽出（旧システム）")
-        lines.append("2. データクレンジング・変換")
-        lines.append("3. テストデータ投入")
-        lines.append("4. 整合性確認")
-        lines.append("5. 本番データ移行")
-        lines.append("")
-        
-        return "\n".join(lines)
+        return self.generate(models.ArtifactType.MIGRATION_VIEW)
     
-    def _estimate_migration_object(self, config_item: models.ConfigItem) -> str:
-        """移行オブジェクト名を推定"""
-        title_lower = config_item.title.lower()
-        
-        if '会社' in config_item.title:
-            return '会社コードマスタ'
-        elif '勘定科目' in config_item.title:
-            return '勘定科目マスタ'
-        elif 'bp' in title_lower or '得意先' in config_item.title or '仕入先' in config_item.title:
-            return 'ビジネスパートナーマスタ'
-        elif '年度' in config_item.title:
-            return '会計年度設定'
-        else:
-            return config_item.title
+    def _test_perspectives(self, config_item: models.ConfigItem) -> List[str]:
+        """設定値の反映確認に続くテスト観点（カタログに固有の観点が無い場合は汎用の観点）"""
+        if config_item.test_perspectives:
+            return config_item.test_perspectives
+        
+        fallback = []
+        if config_item.description:
+            fallback.append(f"{config_item.description}に基づく動作確認")
+        fallback.append("関連する画面/機能での動作確認")
+        return fallback
     
     def generate_json_export(self) -> str:
         """
@@ -675,44 +537,61 @@ class ArtifactGenerator:
         output.seek(0)
         return output.getvalue()
 
-    def generate_all(self) -> Dict[models.ArtifactType, tuple[str, int]]:
+    def generate_all(self, artifact_types: List[models.ArtifactType] = None) -> Dict[models.ArtifactType, tuple[str, int]]:
         """
         全ての成果物を生成
         
-        Returns:
-            {ArtifactType: (content, tbd_count)} の辞書
-        """
-        artifacts = {}
-        
-        # Decision Log
-        decision_log = self.generate_decision_log()
-        artifacts[models.ArtifactType.DECISION_LOG] = (
-            decision_log,
-            self._count_tbd(decision_log)
-        )
+        DBからの読み込みはコンテキストの構築（呼び出し元のスレッド）で済ませ、
+        種類ごとのレンダリングはその読み取り専用のスナップショットに対して並列に行う。
         
-        # Config Workbook
-        config_workbook = self.generate_config_workbook()
-        artifacts[models.ArtifactType.CONFIG_WORKBOOK] = (
-            config_workbook,
-            self._count_tbd(config_workbook)
-        )
+        Args:
+            artifact_types: 生成する成果物の種類（Noneの場合は全て）
         
-        # Test View
-        test_view = self.generate_test_view()
-        artifacts[models.ArtifactType.TEST_VIEW] = (
-            test_view,
-            self._count_tbd(test_view)
-        )
+        Returns:
+            {ArtifactType: (content, tbd_count)} の辞書。tbd_count は成果物に出力した
+            未回答の設定項目の数（本文の文字列は数えない）
+        """
+        if artifact_types:
+            artifact_types = [t for t in MARKDOWN_ARTIFACT_TYPES if t in artifact_types]
+        else:
+            artifact_types = list(MARKDOWN_ARTIFACT_TYPES)
+        self._build_context()
         
-        # Migration View
-        migration_view = self.generate_migration_view()
-        artifacts[models.ArtifactType.MIGRATION_VIEW] = (
-            migration_view,
-            self._count_tbd(migration_view)
-        )
+        executor = get_render_executor()
+        if executor is None or len(artifact_types) < 2:
+            contents = [self.generate(artifact_type) for artifact_type in artifact_types]
+        else:
+            contents = list(executor.map(self.generate, artifact_types))
         
-        return artifacts
+        return {
+            artifact_type: (content, len(self.tbd_items[artifact_type]))
+            for artifact_type, content in zip(artifact_types, contents)
+        }
+
+
+# テンプレートからレンダリングする成果物の種類（generate_all の出力順）
+MARKDOWN_ARTIFACT_TYPES = (
+    models.ArtifactType.DECISION_LOG,
+    models.ArtifactType.CONFIG_WORKBOOK,
+    models.ArtifactType.TEST_VIEW,
+    models.ArtifactType.MIGRATION_VIEW,
+)
+
+_executor_lock = threading.Lock()
+_render_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_render_executor() -> Optional[ThreadPoolExecutor]:
+    """成果物の種類ごとのレンダリングに使うスレッドプール（ARTIFACT_RENDER_WORKERS が1以下の場合はNone）"""
+    global _render_executor
+    workers = get_settings().artifact_render_workers
+    if workers <= 1:
+        return None
+    if _render_executor is None:
+        with _executor_lock:
+            if _render_executor is None:
+                _render_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifact-render")
+    return _render_executor
 
 
 def generate_artifacts(db: Session, project_id: int, artifact_types: List[models.ArtifactType] = None) -> List[models.Artifact]:
@@ -728,16 +607,10 @@ def generate_artifacts(db: Session, project_id: int, artifact_types: List[models
         生成された成果物のリスト
     """
     generator = ArtifactGenerator(db, project_id)
-    all_artifacts = generator.generate_all()
-    
-    # 指定された種類のみフィルタ
-    if artifact_types:
-        all_artifacts = {k: v for k, v in all_artifacts.items() if k in artifact_types}
-    
-    # DBに保存
-    saved_artifacts = []
-    for artifact_type, (content, tbd_count) in all_artifacts.items():
-        artifact = crud.create_artifact(db, project_id, artifact_type, content, tbd_count)
-        saved_artifacts.append(artifact)
+    artifacts = generator.generate_all(artifact_types)
     
-    return saved_artifacts
+    # 全種類を1回のINSERT・コミットで保存し、種類ごとに古い版を削除
+    return crud.create_artifacts(db, project_id, [
+        (artifact_type, content, tbd_count, generator.item_fragments.get(artifact_type))
+        for artifact_type, (content, tbd_count) in artifacts.items()
+    ], keep_versions=get_settings().artifact_keep_versions)
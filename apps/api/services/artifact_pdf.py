@@ -0,0 +1,349 @@
+"""
+成果物のPDF出力
+
+保存済みの Markdown 成果物を純Pythonの最小限の PDF ライタで A4 の PDF にする
+（外部コマンド・ネットワーク不要）。フォントは埋め込まず、PDF ビューアが標準で持つ
+日本語フォント HeiseiKakuGo-W5（Adobe-Japan1、UniJIS-UCS2-HW-H）を参照する。
+
+レンダリングは CPU を使うため、ARTIFACT_PDF_WORKERS 個のプロセスプールで行い、
+待ちの件数が ARTIFACT_PDF_MAX_PENDING を超えたら受け付けない（PdfRenderBusy）。
+出力は成果物本文のハッシュをキーにしてプロセス内でキャッシュし、同じ本文の
+レンダリング中の依頼は1つにまとめる。
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import re
+import threading
+import zlib
+
+from config import get_settings
+from services.artifact_fragments import FragmentCache
+from services.artifact_storage import CHUNK_SIZE
+
+PAGE_WIDTH = 595.28  # A4（pt）
+PAGE_HEIGHT = 841.89
+MARGIN = 48.0
+FOOTER_SIZE = 8.0
+
+FONT_NAME = "HeiseiKakuGo-W5"
+FONT_ENCODING = "UniJIS-UCS2-HW-H"  # ASCII・半角カナを半角幅のCIDに割り当てる
+
+# 行の種類ごとの (文字サイズ, インデント)
+_STYLES = {
+    'h1': (16.0, 0.0),
+    'h2': (13.0, 0.0),
+    'h3': (11.0, 0.0),
+    'body': (9.0, 0.0),
+    'list': (9.0, 12.0),
+    'table': (8.0, 6.0),
+}
+_LEADING = 1.5
+
+# Adobe-Japan1 に無い記号の置き換え
+_SYMBOLS = {
+    '✅': '○',
+    '⚠': '△',
+    '🟢': '○',
+    '🔴': '●',
+    '⚪': '－',
+    '️': '',
+}
+
+_INLINE_MARKUP = re.compile(r'\*\*|__|`')
+_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_TABLE_SEPARATOR = re.compile(r'^\|?(\s*:?-{3,}:?\s*\|)+\s*:?-*:?\s*$')
+_RULE = re.compile(r'^(-{3,}|\*{3,}|_{3,})$')
+_LIST_ITEM = re.compile(r'^(\s*)([-*+])\s+(.*)$')
+
+
+class PdfRenderBusy(Exception):
+    """PDFレンダリングの待ちが上限に達している"""
+
+
+def _char_width(char: str) -> float:
+    """文字幅（em）: ASCII・半角カナは半角、それ以外は全角"""
+    code = ord(char)
+    if 0x20 <= code <= 0x7e or 0xff61 <= code <= 0xff9f:
+        return 0.5
+    return 1.0
+
+
+def _clean(text: str) -> str:
+    """インライン記法を外し、フォントに無い文字を置き換える"""
+    text = _INLINE_MARKUP.sub('', _LINK.sub(r'\1', text))
+    for symbol, replacement in _SYMBOLS.items():
+        text = text.replace(symbol, replacement)
+    # UCS-2 で表せない文字（BMP外）は '?' にする
+    return ''.join(char if ord(char) <= 0xffff else '?' for char in text)
+
+
+def _wrap(text: str, width: float) -> List[str]:
+    """text を1行 width em 以内に折り返す（英単語の途中では折り返さない）"""
+    lines = []
+    line = ''
+    used = 0.0
+    for char in text:
+        char_width = _char_width(char)
+        if used + char_width > width and line:
+            # 英単語の途中なら直前の空白で折り返す
+            space = line.rfind(' ')
+            if char != ' ' and line[-1] != ' ' and space > len(line) // 2:
+                lines.append(line[:space])
+                line = line[space + 1:]
+            else:
+                lines.append(line)
+                line = ''
+            used = sum(_char_width(c) for c in line)
+            if char == ' ' and not line:
+                continue
+        line += char
+        used += char_width
+    if line or not lines:
+        lines.append(line)
+    return lines
+
+
+def _blocks(markdown: str) -> Iterator[Tuple[str, str]]:
+    """Markdown を (種類, テキスト) の行に分ける。種類は _STYLES のキー / rule / space"""
+    for raw in markdown.splitlines():
+        line = raw.rstrip()
+        stripped = line.strip()
+        if not stripped:
+            yield 'space', ''
+        elif stripped.startswith('```'):
+            continue
+        elif stripped.startswith('#'):
+            level = len(stripped) - len(stripped.lstrip('#'))
+            yield f"h{min(level, 3)}", _clean(stripped[level:].strip())
+        elif _RULE.match(stripped):
+            yield 'rule', ''
+        elif stripped.startswith('|'):
+            if _TABLE_SEPARATOR.match(stripped):
+                yield 'rule', ''
+            else:
+                cells = [cell.strip() for cell in stripped.strip('|').split('|')]
+                yield 'table', _clean(' | '.join(cells))
+        else:
+            match = _LIST_ITEM.match(line)
+            if match:
+                text = match.group(3)
+                if text.startswith('[ ] ') or text.startswith('[x] '):
+                    text = ('■ ' if text[1] == 'x' else '□ ') + text[4:]
+                else:
+                    text = '・' + text
+                yield 'list', _clean(text)
+            else:
+                yield 'body', _clean(stripped)
+
+
+def _hex(text: str) -> str:
+    """PDF の16進文字列（UCS-2 ビッグエンディアン）"""
+    return text.encode('utf-16-be').hex().upper()
+
+
+def _layout(markdown: str) -> List[List[str]]:
+    """Markdown をページごとの描画命令（コンテンツストリームの行）に割り付ける"""
+    pages: List[List[str]] = []
+    ops: List[str] = []
+    content_width = PAGE_WIDTH - 2 * MARGIN
+    bottom = MARGIN + FOOTER_SIZE * 2
+    y = PAGE_HEIGHT - MARGIN
+    
+    def new_page():
+        nonlocal ops, y
+        ops = []
+        pages.append(ops)
+        y = PAGE_HEIGHT - MARGIN
+    
+    new_page()
+    for kind, text in _blocks(markdown):
+        if kind == 'space':
+            if y < PAGE_HEIGHT - MARGIN:
+                y -= _STYLES['body'][0] * 0.5
+            continue
+        if kind == 'rule':
+            if y - 6 < bottom:
+                new_page()
+                continue
+            y -= 3
+            ops.append(f"0.75 G 0.5 w {MARGIN:.2f} {y:.2f} m {PAGE_WIDTH - MARGIN:.2f} {y:.2f} l S")
+            y -= 3
+            continue
+    
+        size, indent = _STYLES[kind]
+        leading = size * _LEADING
+        if kind.startswith('h'):
+            # 見出しの前に余白、ページ末尾に見出しだけが残らないようにする
+            y -= size * 0.5
+            if y - leading * 2 < bottom:
+                new_page()
+        for index, line in enumerate(_wrap(text, (content_width - indent) / size)):
+            if y - leading < bottom:
+                new_page()
+            y -= leading
+            # 折り返した行は箇条書きの記号の後ろに揃える
+            x = MARGIN + indent + (size if kind == 'list' and index > 0 else 0)
+            ops.append(f"BT /F1 {size:g} Tf {x:.2f} {y + (leading - size) / 2:.2f} Td <{_hex(line)}> Tj ET")
+    
+    total = len(pages)
+    for number, page_ops in enumerate(pages, start=1):
+        footer = f"{number} / {total}"
+        x = (PAGE_WIDTH - len(footer) * 0.5 * FOOTER_SIZE) / 2
+        page_ops.append(f"0 g BT /F1 {FOOTER_SIZE:g} Tf {x:.2f} {MARGIN:.2f} Td <{_hex(footer)}> Tj ET")
+    return pages
+
+
+def markdown_to_pdf(markdown: str) -> bytes:
+    """
+    Markdown を PDF にする（プロセスプールのワーカーで実行）
+    
+    見出し・段落・箇条書き・表（1行1レコード）・区切り線を A4 縦に折り返して並べる。
+    文書のタイトルは最初の見出し。同じ本文からは同じバイト列を出力する。
+    """
+    pages = _layout(markdown)
+    title = next((text for kind, text in _blocks(markdown) if kind == 'h1'), 'IMG-Quest Artifact')
+    
+    # 1: Catalog, 2: Pages, 3: Type0 フォント, 4: CIDFont, 5: FontDescriptor, 6: Info, 7〜: ページとコンテンツ
+    objects: List[bytes] = [b''] * 6
+    kids = []
+    for page_ops in pages:
+        stream = zlib.compress("\n".join(page_ops).encode('ascii'), 6)
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode('ascii')
+        )
+        objects.append(
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii') + stream + b"\nendstream"
+        )
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode('ascii')
+    objects[2] = (
+        f"<< /Type /Font /Subtype /Type0 /BaseFont /{FONT_NAME}-{FONT_ENCODING} "
+        f"/Encoding /{FONT_ENCODING} /DescendantFonts [4 0 R] >>"
+    ).encode('ascii')
+    objects[3] = (
+        f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /{FONT_NAME} "
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (Japan1) /Supplement 2 >> "
+        "/FontDescriptor 5 0 R /DW 1000 /W [231 389 500] >>"
+    ).encode('ascii')
+    objects[4] = (
+        f"<< /Type /FontDescriptor /FontName /{FONT_NAME} /Flags 6 /FontBBox [-92 -250 1010 922] "
+        "/ItalicAngle 0 /Ascent 752 /Descent -221 /CapHeight 737 /XHeight 553 /StemV 114 >>"
+    ).encode('ascii')
+    objects[5] = f"<< /Title <FEFF{_hex(title)}> /Producer (IMG-Quest) >>".encode('ascii')
+    
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    output += b"".join(f"{offset:010d} 00000 n \n".encode('ascii') for offset in offsets)
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 6 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode('ascii')
+    return bytes(output)
+
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """PDF を CHUNK_SIZE ずつ出力"""
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+_lock = threading.RLock()
+_executor: Optional[ProcessPoolExecutor] = None
+_pdf_cache: Optional[FragmentCache] = None
+_pending: Dict[str, Future] = {}
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    PDFレンダリング用のプロセスプール（ARTIFACT_PDF_WORKERS 個）
+    
+    ワーカーは spawn で起動する（スレッドと DB 接続を持つ API プロセスを fork しない）。
+    markdown_to_pdf はアプリの状態を使わないため、新しいインタプリタでそのまま動く。
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=max(get_settings().artifact_pdf_workers, 1),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+def get_pdf_cache() -> FragmentCache:
+    """本文のハッシュごとの PDF のキャッシュ"""
+    global _pdf_cache
+    if _pdf_cache is None:
+        with _lock:
+            if _pdf_cache is None:
+                _pdf_cache = FragmentCache(get_settings().artifact_pdf_cache_size)
+    return _pdf_cache
+
+
+def shutdown_pdf_executor() -> None:
+    """プロセスプールを終了（アプリケーション終了時）"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def cached_pdf(fingerprint: str) -> Optional[bytes]:
+    """キャッシュ済みの PDF（無ければNone）"""
+    return get_pdf_cache().get(fingerprint)
+
+
+def render_pdf(fingerprint: str, markdown: str) -> Future:
+    """
+    Markdown の PDF レンダリングをプロセスプールに依頼
+    
+    Args:
+        fingerprint: 本文のハッシュ（キャッシュのキー）
+        markdown: 本文
+    
+    Returns:
+        PDF のバイト列を返す Future（同じ本文のレンダリング中ならその Future）
+    
+    Raises:
+        PdfRenderBusy: レンダリング待ちが ARTIFACT_PDF_MAX_PENDING 件に達している場合
+    """
+    cache = get_pdf_cache()
+    with _lock:
+        future = _pending.get(fingerprint)
+        if future is not None:
+            return future
+        pdf = cache.get(fingerprint)
+        if pdf is not None:
+            future = Future()
+            future.set_result(pdf)
+            return future
+        if len(_pending) >= get_settings().artifact_pdf_max_pending:
+            raise PdfRenderBusy(fingerprint)
+    
+        try:
+            future = get_pdf_executor().submit(markdown_to_pdf, markdown)
+        except BrokenProcessPool:
+            # ワーカーが異常終了したプールは作り直す
+            shutdown_pdf_executor()
+            future = get_pdf_executor().submit(markdown_to_pdf, markdown)
+        _pending[fingerprint] = future
+    
+    def finished(done: Future):
+        if not done.cancelled() and done.exception() is None:
+            cache.put(fingerprint, done.result())
+        with _lock:
+            _pending.pop(fingerprint, None)
+    
+    future.add_done_callback(finished)
+    return future
@@ -0,0 +1,141 @@
+"""
+成果物本文の圧縮保存
+
+成果物の本文は、圧縮前の内容のハッシュ（SHA-256）をキーにして artifact_blobs に
+圧縮して1回だけ保存する。artifacts の各行はそのハッシュを参照するため、内容が変わらない
+再生成や、プロジェクト間で同じ内容の成果物では本文が重複しない。
+
+圧縮形式は ARTIFACT_COMPRESSION で選ぶ（gzip / zstd）。zstd は zstandard パッケージが
+必要で、無い場合は警告を出して gzip で保存する。gzip の本文は、クライアントが受け付ける
+場合は Content-Encoding: gzip のまま展開せずに返せる。
+
+Range リクエストは展開後の本文（UTF-8 のバイト列）に対する範囲として扱い、
+先頭から展開しながら範囲の部分だけを出力する。
+"""
+from typing import Iterator, Optional, Tuple
+import gzip
+import hashlib
+import logging
+import zlib
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+CHUNK_SIZE = 64 * 1024  # ストリーミング時の1回あたりの展開サイズ（圧縮データ側）
+
+
+def content_hash(content: str) -> str:
+    """本文のハッシュ（blob のキー）"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _zstandard():
+    """zstandard モジュール（未インストールの場合は ImportError）"""
+    import zstandard
+    return zstandard
+
+
+def compress(content: str) -> Tuple[str, bytes]:
+    """
+    本文を設定の形式で圧縮
+
+    Returns:
+        (encoding, 圧縮データ)
+    """
+    data = content.encode('utf-8')
+    if get_settings().artifact_compression == ZSTD:
+        try:
+            return ZSTD, _zstandard().ZstdCompressor(level=10).compress(data)
+        except ImportError:
+            logger.warning("ARTIFACT_COMPRESSION=zstd requires zstandard; storing artifacts as gzip")
+    # mtime=0 で同じ内容からは同じバイト列を作る
+    return GZIP, gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(encoding: str, data: bytes) -> str:
+    """圧縮データを本文に戻す"""
+    if encoding == ZSTD:
+        return _zstandard().ZstdDecompressor().decompress(data).decode('utf-8')
+    return gzip.decompress(data).decode('utf-8')
+
+
+def iter_decompressed(encoding: str, data: bytes) -> Iterator[bytes]:
+    """圧縮データを少しずつ展開して出力（全体を展開したバイト列を作らない）"""
+    if encoding == ZSTD:
+        decompressor = _zstandard().ZstdDecompressor().decompressobj()
+    else:
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = decompressor.decompress(data[start:start + CHUNK_SIZE])
+        if chunk:
+            yield chunk
+    if encoding != ZSTD:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def iter_range(encoding: str, data: bytes, start: int, end: int) -> Iterator[bytes]:
+    """展開後の本文のうち start〜end バイト目（end を含む）を出力"""
+    position = 0
+    for chunk in iter_decompressed(encoding, data):
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            yield chunk[max(start - position, 0):end + 1 - position]
+        position = chunk_end
+        if position > end:
+            break
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range ヘッダ（bytes の単一範囲）を (start, end) に変換（end を含む）
+    
+    解釈できない形式・複数範囲の場合は None（全体を返す）。
+    
+    Raises:
+        ValueError: 範囲が本文の外にある場合（416 を返す）
+    """
+    unit, _, spec = (range_header or "").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    
+    if first:
+        start = int(first)
+        end = int(last) if last else max(size - 1, start)
+        if start > end:
+            return None
+    else:
+        # bytes=-N は末尾の N バイト
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError(range_header)
+        start = max(size - suffix, 0)
+        end = size - 1
+    if start >= size:
+        raise ValueError(range_header)
+    return start, min(end, size - 1)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding ヘッダが gzip を受け付けるか（q=0 は拒否）"""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in (GZIP, "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
@@ -0,0 +1,140 @@
+"""
+成果物テンプレート（Jinja2）
+
+成果物の種類ごとに templates/artifacts/<種類>.md.j2 を1つ持ち、
+ArtifactGenerator が組み立てたコンテキストを1パスでレンダリングする。
+テンプレートは初回読込時にコンパイルされ、プロセス内でキャッシュされる。
+
+ARTIFACT_TEMPLATE_DIR を設定すると、そのディレクトリのテンプレートが組み込みより優先される。
+組み込みにない名前のテンプレートを置けば、コードを変更せずに独自の成果物を出力できる。
+
+行ごとの部分をマクロにして {{ item | cached(マクロ) }} で出力すると、その出力は
+行オブジェクトの fragments にキャッシュされ、内容が変わらない行は次回以降
+レンダリングされない（services/artifact_fragments.py）。
+cached で出力した行は版間の差分の単位になり、未回答の行は成果物の TBD 数に数えられる
+（cached を使わない独自テンプレートの TBD 数は0になる）。
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import re
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, TemplateNotFound, pass_context
+from jinja2.runtime import Context, Macro
+
+import models
+from config import get_settings
+
+BUILTIN_TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "artifacts"
+TEMPLATE_SUFFIX = ".md.j2"
+
+# テンプレート名として受け付ける文字（パス区切りは含めない）
+_TEMPLATE_NAME = re.compile(r"^[a-z0-9_]+$")
+
+
+def format_value(value: Any) -> str:
+    """回答値の表示形式（リストはカンマ区切り）"""
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+@pass_context
+def cached_fragment(context: Context, row: Any, macro: Macro) -> str:
+    """
+    行をマクロでレンダリングし、結果を行の fragments にキャッシュするフィルタ
+    
+    キーはテンプレートとマクロ名。fragments を持たない行はキャッシュせずにレンダリングする。
+    レンダリング時に item_fragments（辞書）が渡されていれば、行の key ごとの出力を記録する
+    （成果物の版間の差分に使う）。tbd_items（集合）が渡されていれば、未回答の行
+    （answered が False）の key を記録する（成果物の TBD 数）。
+    """
+    fragments = getattr(row, 'fragments', None)
+    if fragments is None:
+        fragment = macro(row)
+    else:
+        key = (context.environment, context.name, macro.name)
+        fragment = fragments.get(key)
+        if fragment is None:
+            fragment = fragments[key] = macro(row)
+    
+    item_fragments = context.get('item_fragments')
+    row_key = getattr(row, 'key', None)
+    if item_fragments is not None and row_key is not None:
+        previous = item_fragments.get(row_key)
+        item_fragments[row_key] = fragment if previous is None else previous + "\n" + fragment
+    tbd_items = context.get('tbd_items')
+    if tbd_items is not None and row_key is not None and getattr(row, 'answered', True) is False:
+        tbd_items.add(row_key)
+    return fragment
+
+
+@lru_cache()
+def get_template_environment() -> Environment:
+    """テンプレート環境（シングルトン）"""
+    search_path = [str(BUILTIN_TEMPLATE_DIR)]
+    custom_dir = get_settings().artifact_template_dir
+    if custom_dir:
+        search_path.insert(0, custom_dir)
+
+    environment = Environment(
+        loader=FileSystemLoader(search_path),
+        autoescape=False,  # Markdown を出力するためエスケープしない
+        trim_blocks=True,
+        lstrip_blocks=True,
+        undefined=StrictUndefined,
+        auto_reload=False,  # コンパイル済みテンプレートを再検査せずに使う
+        cache_size=-1,
+    )
+    environment.filters['format_value'] = format_value
+    environment.filters['cached'] = cached_fragment
+    return environment
+
+
+def template_name(artifact_type: models.ArtifactType) -> str:
+    """成果物の種類に対応するテンプレート名"""
+    return artifact_type.value.lower()
+
+
+def get_template(name: str) -> Template:
+    """
+    コンパイル済みテンプレートを取得
+
+    Raises:
+        TemplateNotFound: テンプレートが存在しない、または名前が不正な場合
+    """
+    if not _TEMPLATE_NAME.match(name):
+        raise TemplateNotFound(name)
+    return get_template_environment().get_template(name + TEMPLATE_SUFFIX)
+
+
+def list_templates() -> List[str]:
+    """利用可能なテンプレート名の一覧（組み込み・追加ディレクトリの両方）"""
+    return sorted(
+        filename[:-len(TEMPLATE_SUFFIX)]
+        for filename in get_template_environment().list_templates()
+        if filename.endswith(TEMPLATE_SUFFIX) and _TEMPLATE_NAME.match(filename[:-len(TEMPLATE_SUFFIX)])
+    )
+
+
+def compile_templates() -> List[str]:
+    """
+    全テンプレートを事前にコンパイルしてキャッシュ（起動時に構文エラーを検出する）
+    
+    Returns:
+        コンパイルしたテンプレート名のリスト
+    """
+    names = list_templates()
+    for name in names:
+        get_template(name)
+    return names
+
+
+def render_stream(name: str, context: Dict[str, Any]) -> Iterator[str]:
+    """テンプレートを断片ごとに出力（全体を連結せずにストリーミングできる）"""
+    return get_template(name).generate(context)
+
+
+def render(name: str, context: Dict[str, Any]) -> str:
+    """テンプレートを文字列にレンダリング"""
+    return get_template(name).render(context)
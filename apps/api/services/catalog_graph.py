@@ -0,0 +1,266 @@
+from sqlalchemy.orm import Session
+from typing import List, Dict, Optional, Set, Tuple
+from collections import deque
+import threading
+import logging
+import crud
+import models
+
+logger = logging.getLogger(__name__)
+
+# カタログに存在しない依存先を表すノード番号
+MISSING_NODE = -1
+
+# 下流項目数を数えるビット集合の幅（項目数 × この値のビットが作業メモリの上限）
+_REACH_BLOCK = 1024
+
+
+class CatalogGraph:
+    """
+    カタログの依存関係グラフ
+
+    設定項目マスタから構築する読み取り専用のインデックス。
+    カタログバージョンごとに1度だけ構築し、プロセス内でキャッシュする。
+    """
+
+    def __init__(self, version: int, config_items: List[models.ConfigItem]):
+        self.version = version
+
+        # 設定項目ID → 依存先IDのリスト
+        self.depends_on: Dict[str, List[str]] = {
+            item.id: list(item.depends_on or [])
+            for item in config_items
+        }
+
+        # 設定項目ID → モジュール（FI, CO, MM など）
+        self.modules: Dict[str, Optional[str]] = {
+            item.id: item.module for item in config_items
+        }
+
+        # 逆依存インデックス（依存先ID → その項目に依存する設定項目IDのリスト）
+        self.dependents: Dict[str, List[str]] = {}
+        for item_id, depends_on in self.depends_on.items():
+            for dep_id in depends_on:
+                self.dependents.setdefault(dep_id, []).append(item_id)
+
+        # コンパイル済みノード（ノード番号 = ids のインデックス）
+        # エンジンの状態はこの番号で引く配列として持つ
+        self.ids: List[str] = list(self.depends_on)
+        self.index: Dict[str, int] = {item_id: i for i, item_id in enumerate(self.ids)}
+        # 依存先のノード番号（存在しない依存先は MISSING_NODE）
+        self.deps_idx: List[Tuple[int, ...]] = [
+            tuple(self.index.get(dep_id, MISSING_NODE) for dep_id in self.depends_on[item_id])
+            for item_id in self.ids
+        ]
+        self.dependents_idx: List[Tuple[int, ...]] = [
+            tuple(self.index[dependent] for dependent in self.dependents.get(item_id, ()))
+            for item_id in self.ids
+        ]
+        self.titles: List[str] = [item.title for item in config_items]
+        self.priorities: List[Optional[str]] = [item.priority for item in config_items]
+        self.beginner = bytearray(1 if item.beginner_mode else 0 for item in config_items)
+
+        self._compute_layers()
+
+    def _compute_layers(self):
+        """
+        トポロジカル深さ（レイヤー）とクリティカルパスを算出
+
+        layer: ルート（依存なし）を0とした最長依存チェーン上の位置
+        height: その項目から下流へ続く最長チェーンの項目数
+        critical: layer + height がカタログ全体の最長チェーン長に一致する項目
+        存在しない依存先は無視し、循環に含まれる項目は最深レイヤーの次に置く。
+        """
+        remaining = {
+            item_id: sum(1 for dep_id in deps if dep_id in self.depends_on)
+            for item_id, deps in self.depends_on.items()
+        }
+        self.layers: Dict[str, int] = {}
+        order: List[str] = []
+        queue = deque(item_id for item_id, count in remaining.items() if count == 0)
+        for item_id in queue:
+            self.layers[item_id] = 0
+        while queue:
+            item_id = queue.popleft()
+            order.append(item_id)
+            next_layer = self.layers[item_id] + 1
+            for dependent in self.dependents.get(item_id, ()):
+                if next_layer > self.layers.get(dependent, 0):
+                    self.layers[dependent] = next_layer
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+
+        cyclic_layer = max(self.layers.values(), default=-1) + 1
+        for item_id in self.depends_on:
+            if remaining[item_id] > 0:
+                self.layers[item_id] = cyclic_layer
+
+        self.heights: Dict[str, int] = {}
+        for item_id in reversed(order):
+            self.heights[item_id] = 1 + max(
+                (self.heights.get(dependent, 0) for dependent in self.dependents.get(item_id, ())),
+                default=0
+            )
+
+        self.critical_path_length = max(
+            (self.layers[item_id] + height for item_id, height in self.heights.items()),
+            default=0
+        )
+        self.critical: Set[str] = {
+            item_id for item_id, height in self.heights.items()
+            if self.layers[item_id] + height == self.critical_path_length
+        }
+        self.downstream_counts = self._count_downstream(order)
+
+    def _count_downstream(self, order: List[str]) -> Dict[str, int]:
+        """
+        設定項目ID → 推移的に依存している下流項目の数（グラフ構築時に1度だけ算出）
+
+        下流の項目はトポロジカル順で必ず後ろにあるため、順序上の位置を _REACH_BLOCK 個ずつの
+        ブロックに分け、ブロックごとにトポロジカル逆順でビット集合を合成して数える。
+        ビット集合は1ブロック分の幅しか持たないので、メモリは項目数 × _REACH_BLOCK ビットで抑えられる。
+        循環に含まれる項目とその下流は数えない（0）。
+        """
+        position = {item_id: i for i, item_id in enumerate(order)}
+        dependents = [
+            [position[dependent] for dependent in self.dependents.get(item_id, ()) if dependent in position]
+            for item_id in order
+        ]
+        counts = [0] * len(order)
+        for block_start in range(0, len(order), _REACH_BLOCK):
+            block_end = min(block_start + _REACH_BLOCK, len(order))
+            # ブロックより後ろの項目はブロック内の項目に到達しない
+            masks = [0] * block_end
+            for i in range(block_end - 1, -1, -1):
+                mask = 0
+                for j in dependents[i]:
+                    if j < block_end:
+                        mask |= masks[j]
+                        if j >= block_start:
+                            mask |= 1 << (j - block_start)
+                masks[i] = mask
+                counts[i] += mask.bit_count()
+        return {item_id: counts[i] for i, item_id in enumerate(order)}
+
+
+def find_dangling_references(depends_on: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    """
+    存在しない設定項目への依存を検出
+
+    Args:
+        depends_on: 設定項目ID → 依存先IDのリスト
+
+    Returns:
+        (設定項目ID, 存在しない依存先ID) のリスト
+    """
+    return [
+        (item_id, dep_id)
+        for item_id, deps in depends_on.items()
+        for dep_id in deps
+        if dep_id not in depends_on
+    ]
+
+
+def find_cycles(depends_on: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    循環依存を検出（Tarjanの強連結成分分解、非再帰）
+
+    Args:
+        depends_on: 設定項目ID → 依存先IDのリスト
+
+    Returns:
+        循環を構成する設定項目IDのリスト（強連結成分ごと）
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    cycles: List[List[str]] = []
+    counter = 0
+
+    for root in depends_on:
+        if root in index_of:
+            continue
+        work = [(root, iter(depends_on[root]))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, deps = work[-1]
+            advanced = False
+            for dep_id in deps:
+                if dep_id not in depends_on:
+                    continue
+                if dep_id not in index_of:
+                    index_of[dep_id] = lowlink[dep_id] = counter
+                    counter += 1
+                    stack.append(dep_id)
+                    on_stack.add(dep_id)
+                    work.append((dep_id, iter(depends_on[dep_id])))
+                    advanced = True
+                    break
+                if dep_id in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[dep_id])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in depends_on[node]:
+                    cycles.append(list(reversed(component)))
+
+    return cycles
+
+
+_cache_lock = threading.Lock()
+_cached_graph: Optional[CatalogGraph] = None
+
+
+def get_catalog_graph(db: Session, config_items: List[models.ConfigItem] = None) -> CatalogGraph:
+    """
+    現在のカタログバージョンに対応する依存関係グラフを取得
+
+    DB上のカタログバージョンとキャッシュのバージョンが一致すれば
+    キャッシュを返す（別プロセスでの再読込にも追従する）。
+
+    Args:
+        db: データベースセッション
+        config_items: 構築に使う設定項目（呼び出し元で取得済みの場合。
+            id, title, priority, module, beginner_mode, depends_on を持つ行でよい）
+
+    Returns:
+        依存関係グラフ
+    """
+    global _cached_graph
+    version = crud.get_catalog_version_number(db)
+    graph = _cached_graph
+    if graph is not None and graph.version == version:
+        return graph
+
+    if config_items is None:
+        config_items = crud.get_config_item_graph_rows(db)
+    graph = CatalogGraph(version, config_items)
+    with _cache_lock:
+        _cached_graph = graph
+    return graph
+
+
+def invalidate_catalog_cache():
+    """プロセス内のカタログキャッシュを破棄"""
+    global _cached_graph
+    with _cache_lock:
+        _cached_graph = None
+    logger.debug("Catalog cache invalidated")
@@ -1,12 +1,38 @@
 import yaml
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.orm import Session
+import glob
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import threading
 from database import SessionLocal
 import crud
+from services.catalog_graph import find_dangling_references, find_cycles
+from services.dependency_engine import repair_backlog_statuses
 
 logger = logging.getLogger(__name__)
 
+# libyaml（C実装）が利用可能ならそちらを使う
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class CatalogValidationError(Exception):
+    """カタログの整合性エラー（存在しない依存先、循環依存など）"""
+    
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def parse_catalog_yaml(stream) -> Any:
+    """YAMLをパース（CSafeLoaderが無い環境ではSafeLoader）"""
+    return yaml.load(stream, Loader=_YamlLoader)
+
 
 def load_catalog_file(catalog_path: str) -> List[Dict[str, Any]]:
     """
@@ -25,7 +51,7 @@ def load_catalog_file(catalog_path: str) -> List[Dict[str, Any]]:
             return []
         
         with open(path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = parse_catalog_yaml(f)
         
         if not isinstance(data, list):
             logger.error(f"Invalid catalog format: expected list, got {type(data)}")
@@ -39,6 +65,35 @@ def load_catalog_file(catalog_path: str) -> List[Dict[str, Any]]:
         return []
 
 
+def module_from_id(config_item_id: Optional[str]) -> Optional[str]:
+    """設定項目IDの接頭辞からモジュールを判定（FI-CORE-001 → FI）"""
+    if not config_item_id:
+        return None
+    return str(config_item_id).split('-', 1)[0].upper()
+
+
+def validate_catalog_items(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    正規化済みカタログ全体（複数ファイルのマージ結果）の整合性を検証
+    
+    Args:
+        items: 正規化済みアイテムのリスト
+        
+    Returns:
+        エラーメッセージのリスト（問題なければ空）
+    """
+    depends_on = {item['id']: item.get('depends_on') or [] for item in items}
+    errors = [
+        f"{item_id} depends on unknown item {dep_id}"
+        for item_id, dep_id in find_dangling_references(depends_on)
+    ]
+    errors.extend(
+        f"Dependency cycle among: {', '.join(cycle)}"
+        for cycle in find_cycles(depends_on)
+    )
+    return errors
+
+
 def normalize_config_item(item: Dict[str, Any]) -> Dict[str, Any]:
     """
     カタログアイテムをDBスキーマに正規化
@@ -51,6 +106,7 @@ def normalize_config_item(item: Dict[str, Any]) -> Dict[str, Any]:
     """
     return {
         'id': item.get('id'),
+        'module': item.get('module') or module_from_id(item.get('id')),
         'title': item.get('title', ''),
         'description': item.get('description', ''),
         'priority': item.get('priority', 'P1'),
@@ -58,6 +114,8 @@ def normalize_config_item(item: Dict[str, Any]) -> Dict[str, Any]:
         'depends_on': item.get('depends_on', []),
         'produces': item.get('produces', []),
         'notes': item.get('notes', []),
+        'test_perspectives': item.get('test_perspectives', []),
+        'migration_object': item.get('migration_object'),
         # 初心者モード対応
         'beginner_mode': item.get('beginner_mode', True),
         'beginner_title': item.get('beginner_title'),
@@ -66,50 +124,286 @@ def normalize_config_item(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def load_catalog(catalog_path: str = None) -> int:
+def compute_item_hash(normalized: Dict[str, Any]) -> str:
     """
-    カタログをデータベースにロード
+    正規化済みアイテムのコンテンツハッシュを算出
     
     Args:
-        catalog_path: カタログファイルのパス（省略時は設定から取得）
+        normalized: normalize_config_item() の戻り値
         
     Returns:
-        ロードされた項目数
+        SHA-256の16進文字列
+    """
+    payload = {k: v for k, v in normalized.items() if k != 'content_hash'}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def sync_catalog(db: Session, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    カタログをDBと差分同期
+    
+    コンテンツハッシュで既存の設定項目と比較し、追加・変更された
+    項目のみを1トランザクションで反映する。変更があった場合のみ
+    カタログバージョンを更新する。カタログから削除された項目は
+    バックログから参照されている可能性があるため削除しない。
+    
+    Args:
+        db: データベースセッション
+        items: YAMLから読み込んだアイテムのリスト
+        
+    Returns:
+        同期結果（version, inserted, updated, unchanged, removed）
+        
+    Raises:
+        CatalogValidationError: 依存先が存在しない、または循環依存がある場合
     """
+    # 正規化・ハッシュ付与（重複IDは後勝ち）
+    normalized_items: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        normalized = normalize_config_item(item)
+        if not normalized['id']:
+            logger.warning(f"Skipping item without id: {item}")
+            continue
+        if normalized['id'] in normalized_items:
+            logger.warning(f"Duplicate config item id in catalog: {normalized['id']}")
+        # スナップショット由来のアイテムはハッシュ計算済み
+        normalized['content_hash'] = item.get('content_hash') or compute_item_hash(normalized)
+        normalized_items[normalized['id']] = normalized
+    
+    existing_hashes = crud.get_config_item_hashes(db)
+    inserts = []
+    updates = []
+    for item_id, normalized in normalized_items.items():
+        if item_id not in existing_hashes:
+            inserts.append(normalized)
+        elif existing_hashes[item_id] != normalized['content_hash']:
+            updates.append(normalized)
+    errors = validate_catalog_items(list(normalized_items.values()))
+    if errors:
+        raise CatalogValidationError(errors)
+    
+    removed = sorted(set(existing_hashes) - set(normalized_items))
+    if removed:
+        logger.warning(f"Config items missing from catalog (kept in database): {removed}")
+    
+    catalog_hash = hashlib.sha256(
+        "".join(
+            f"{item_id}:{normalized_items[item_id]['content_hash']}"
+            for item_id in sorted(normalized_items)
+        ).encode('utf-8')
+    ).hexdigest()
+    
+    current = crud.get_catalog_version(db)
+    if inserts or updates or current is None or current.catalog_hash != catalog_hash:
+        current = crud.apply_catalog_changes(db, inserts, updates, catalog_hash)
+        logger.info(
+            f"Catalog version {current.id}: {len(inserts)} inserted, "
+            f"{len(updates)} updated, {len(normalized_items) - len(inserts) - len(updates)} unchanged"
+        )
+    
+    return {
+        'version': current.id,
+        'catalog_hash': current.catalog_hash,
+        'total': len(normalized_items),
+        'inserted': [item['id'] for item in inserts],
+        'updated': [item['id'] for item in updates],
+        'unchanged': len(normalized_items) - len(inserts) - len(updates),
+        'removed': removed
+    }
+
+
+def _resolve_catalog_path(catalog_path: str = None) -> str:
+    """カタログパスを解決（省略時は設定から取得）"""
     if catalog_path is None:
         from config import get_settings
         settings = get_settings()
         catalog_path = settings.catalog_path
+    return catalog_path
+
+
+def resolve_catalog_files(catalog_path: str) -> List[str]:
+    """
+    カタログパスを個々のカタログファイルに展開
+    
+    ファイル、ディレクトリ（配下の *.yml / *.yaml）、グロブパターンに対応する。
+    
+    Args:
+        catalog_path: カタログのパス
+        
+    Returns:
+        カタログファイルのパスのリスト（ソート済み）
+    """
+    if os.path.isdir(catalog_path):
+        return sorted(
+            str(path) for path in Path(catalog_path).iterdir()
+            if path.suffix in ('.yml', '.yaml') and path.is_file()
+        )
+    if glob.has_magic(catalog_path):
+        return sorted(
+            path for path in glob.glob(catalog_path)
+            if path.endswith(('.yml', '.yaml'))
+        )
+    return [catalog_path]
+
+
+def _load_catalog_shard(catalog_file: str) -> List[Dict[str, Any]]:
+    """1ファイル分のカタログを読み込む（スナップショット優先）"""
+    from services.catalog_snapshot import load_snapshot
+    items = load_snapshot(catalog_file)
+    if items is not None:
+        return items
+    return load_catalog_file(catalog_file)
+
+
+def load_catalog_items(catalog_path: str) -> List[Dict[str, Any]]:
+    """
+    カタログの設定項目を読み込む
+    
+    各ファイルについて、コンパイル済みスナップショットが最新ならそれを使い、
+    無い・古い場合はYAMLをパースする。複数ファイルの場合は
+    プロセスプールで並列に読み込んでから結合する。
+    
+    Args:
+        catalog_path: カタログのパス（ファイル・ディレクトリ・グロブ）
+        
+    Returns:
+        設定項目のリスト
+    """
+    catalog_files = resolve_catalog_files(catalog_path)
+    if not catalog_files:
+        logger.error(f"No catalog files found: {catalog_path}")
+        return []
+    if len(catalog_files) == 1:
+        return _load_catalog_shard(catalog_files[0])
+    
+    # 呼び出し元（管理APIの再読込・CatalogWatcher）はスレッドとDB接続を持つAPIプロセスのため fork しない
+    max_workers = min(len(catalog_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        shards = list(executor.map(_load_catalog_shard, catalog_files))
+    
+    items = [item for shard in shards for item in shard]
+    logger.info(f"Loaded {len(items)} config items from {len(catalog_files)} catalog files")
+    return items
+
+
+def load_catalog(catalog_path: str = None) -> int:
+    """
+    カタログをデータベースにロード
+    
+    Args:
+        catalog_path: カタログファイルのパス（省略時は設定から取得）
+        
+    Returns:
+        ロードされた項目数
+    """
+    catalog_path = _resolve_catalog_path(catalog_path)
     
     # カタログファイルを読み込み
-    items = load_catalog_file(catalog_path)
+    items = load_catalog_items(catalog_path)
     if not items:
         logger.warning("No config items loaded from catalog")
         return 0
     
-    # データベースに保存
+    # データベースに差分保存
     db = SessionLocal()
     try:
-        count = 0
-        for item in items:
-            try:
-                normalized = normalize_config_item(item)
-                if not normalized['id']:
-                    logger.warning(f"Skipping item without id: {item}")
-                    continue
-                
-                crud.upsert_config_item(db, normalized)
-                count += 1
-            except Exception as e:
-                logger.error(f"Error saving config item {item.get('id')}: {e}")
+        result = sync_catalog(db, items)
+        logger.info(f"Successfully loaded {result['total']} config items into database")
+        return result['total']
+    except CatalogValidationError as e:
+        for error in e.errors:
+            logger.error(f"Invalid catalog: {error}")
+        return 0
+    finally:
+        db.close()
+
+
+def reload_catalog(catalog_path: str = None) -> Optional[Dict[str, Any]]:
+    """
+    カタログを再読込して差分を反映（APIの再起動不要）
+    
+    Args:
+        catalog_path: カタログファイルのパス（省略時は設定から取得）
         
-        logger.info(f"Successfully loaded {count} config items into database")
-        return count
+    Returns:
+        同期結果。カタログが読み込めない場合はNone
+        
+    Raises:
+        CatalogValidationError: カタログの整合性エラー
+    """
+    catalog_path = _resolve_catalog_path(catalog_path)
+    items = load_catalog_items(catalog_path)
+    if not items:
+        logger.warning(f"Catalog reload skipped: no config items in {catalog_path}")
+        return None
     
+    db = SessionLocal()
+    try:
+        result = sync_catalog(db, items)
+        # 依存関係が変わった可能性があるため、保存済みのバックログステータスを再計算
+        if result['inserted'] or result['updated']:
+            repair_backlog_statuses(db)
+        return result
     finally:
         db.close()
 
 
+class CatalogWatcher:
+    """
+    カタログファイルの変更監視
+    
+    バックグラウンドスレッドでファイルの更新時刻をポーリングし、
+    変更を検知したら reload_catalog() を呼び出す。
+    """
+    
+    def __init__(self, catalog_path: str = None, interval: float = 2.0):
+        self.catalog_path = _resolve_catalog_path(catalog_path)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_mtime = self._get_mtime()
+    
+    def _get_mtime(self) -> Optional[Tuple[Tuple[str, float], ...]]:
+        """監視対象ファイルの更新時刻（ファイルの追加・削除も検知する）"""
+        mtimes = []
+        for catalog_file in resolve_catalog_files(self.catalog_path):
+            try:
+                mtimes.append((catalog_file, os.stat(catalog_file).st_mtime))
+            except OSError:
+                continue
+        return tuple(mtimes) or None
+    
+    def check(self) -> Optional[Dict[str, Any]]:
+        """変更があれば再読込する（1回分のポーリング）"""
+        mtime = self._get_mtime()
+        if mtime is None or mtime == self._last_mtime:
+            return None
+        self._last_mtime = mtime
+        logger.info(f"Catalog file changed, reloading: {self.catalog_path}")
+        return reload_catalog(self.catalog_path)
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except CatalogValidationError as e:
+                logger.error(f"Catalog reload rejected: {e}")
+            except Exception as e:
+                logger.error(f"Error reloading catalog: {e}")
+    
+    def start(self):
+        """監視を開始"""
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """監視を停止"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+
 def get_catalog_stats() -> Dict[str, Any]:
     """
     カタログの統計情報を取得
@@ -0,0 +1,177 @@
+"""
+カタログスナップショット
+
+YAMLカタログを検証・正規化済みのJSONスナップショットにコンパイルする。
+起動時はスナップショットを読み込み、元のYAMLとハッシュが一致しない
+（古い）場合のみYAMLのパースにフォールバックする。
+
+使い方:
+    python -m services.catalog_snapshot [CATALOG_PATH] [-o SNAPSHOT_PATH]
+
+CATALOG_PATHがディレクトリ・グロブの場合はファイルごとにコンパイルする。
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# スナップショット形式のバージョン（正規化ルールを変えたら上げる）
+SNAPSHOT_FORMAT_VERSION = 3
+
+
+class CatalogSnapshotError(Exception):
+    """カタログのコンパイル・検証エラー"""
+
+
+def default_snapshot_path(catalog_path: str, snapshot_dir: str = None) -> str:
+    """
+    カタログファイルに対応するスナップショットのパス
+
+    fi_core.yml → fi_core.snapshot.json（snapshot_dir省略時はカタログと同じディレクトリ）
+    """
+    path = Path(catalog_path)
+    directory = Path(snapshot_dir) if snapshot_dir else path.parent
+    return str(directory / f"{path.stem}.snapshot.json")
+
+
+def _resolve_snapshot_path(catalog_path: str, snapshot_path: str = None) -> str:
+    if snapshot_path is None:
+        from config import get_settings
+        snapshot_path = default_snapshot_path(catalog_path, get_settings().catalog_snapshot_dir)
+    return snapshot_path
+
+
+def hash_file(path: str) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_catalog(catalog_path: str, snapshot_path: str = None) -> Dict[str, Any]:
+    """
+    YAMLカタログをスナップショットにコンパイル
+
+    Args:
+        catalog_path: カタログファイルのパス
+        snapshot_path: 出力先（省略時は設定またはカタログと同じディレクトリ）
+
+    Returns:
+        書き出したスナップショット
+
+    Raises:
+        CatalogSnapshotError: カタログが不正な場合
+    """
+    from services.catalog_loader import parse_catalog_yaml, normalize_config_item, compute_item_hash
+
+    snapshot_path = _resolve_snapshot_path(catalog_path, snapshot_path)
+    source_hash = hash_file(catalog_path)
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        data = parse_catalog_yaml(f)
+
+    if not isinstance(data, list):
+        raise CatalogSnapshotError(f"Invalid catalog format: expected list, got {type(data)}")
+
+    items = []
+    seen_ids = set()
+    for index, raw_item in enumerate(data):
+        if not isinstance(raw_item, dict) or not raw_item.get('id'):
+            raise CatalogSnapshotError(f"Item #{index} has no id")
+        normalized = normalize_config_item(raw_item)
+        if normalized['id'] in seen_ids:
+            raise CatalogSnapshotError(f"Duplicate config item id: {normalized['id']}")
+        seen_ids.add(normalized['id'])
+        normalized['content_hash'] = compute_item_hash(normalized)
+        items.append(normalized)
+
+    snapshot = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'source_hash': source_hash,
+        'compiled_at': datetime.utcnow().isoformat(),
+        'items': items
+    }
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+    Path(tmp_path).replace(snapshot_path)
+
+    logger.info(f"Compiled {len(items)} config items into {snapshot_path}")
+    return snapshot
+
+
+def load_snapshot(catalog_path: str, snapshot_path: str = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    スナップショットから正規化済みの設定項目を読み込む
+
+    Args:
+        catalog_path: 元のカタログファイルのパス（鮮度チェック用）
+        snapshot_path: スナップショットのパス
+
+    Returns:
+        設定項目のリスト。スナップショットが無い・古い・壊れている場合はNone
+    """
+    snapshot_path = _resolve_snapshot_path(catalog_path, snapshot_path)
+    if not Path(snapshot_path).exists() or not Path(catalog_path).exists():
+        return None
+
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable catalog snapshot {snapshot_path}: {e}")
+        return None
+
+    if snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        logger.info(f"Catalog snapshot format is outdated: {snapshot_path}")
+        return None
+    if snapshot.get('source_hash') != hash_file(catalog_path):
+        logger.info(f"Catalog snapshot is stale, falling back to YAML: {snapshot_path}")
+        return None
+
+    items = snapshot.get('items')
+    if not isinstance(items, list):
+        return None
+
+    logger.info(f"Loaded {len(items)} config items from snapshot")
+    return items
+
+
+def main(argv: List[str] = None) -> int:
+    """CLIエントリポイント"""
+    parser = argparse.ArgumentParser(description="Compile the YAML catalog into a snapshot")
+    parser.add_argument('catalog_path', nargs='?', help="catalog YAML, directory or glob (default: CATALOG_PATH)")
+    parser.add_argument('-o', '--output', help="snapshot path for a single catalog file (default: <catalog>.snapshot.json)")
+    args = parser.parse_args(argv)
+
+    from services.catalog_loader import resolve_catalog_files
+    catalog_path = args.catalog_path
+    if catalog_path is None:
+        from config import get_settings
+        catalog_path = get_settings().catalog_path
+
+    catalog_files = resolve_catalog_files(catalog_path)
+    if args.output and len(catalog_files) != 1:
+        print("error: --output requires a single catalog file", file=sys.stderr)
+        return 1
+
+    for catalog_file in catalog_files:
+        try:
+            snapshot = compile_catalog(catalog_file, args.output)
+        except (OSError, CatalogSnapshotError) as e:
+            print(f"error: {catalog_file}: {e}", file=sys.stderr)
+            return 1
+        print(f"{catalog_file}: compiled {len(snapshot['items'])} items (source {snapshot['source_hash'][:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
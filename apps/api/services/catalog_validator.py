@@ -0,0 +1,252 @@
+"""
+カタログ検証CLI
+
+カタログを catalog_loader 経由で読み込み、依存関係グラフを構築して
+整合性エラーとグラフ統計を報告する。
+
+検出するエラー:
+    - 重複ID
+    - 存在しない依存先（depends_on の参照切れ）
+    - 循環依存
+    - 到達不能な項目（参照切れ・循環のため永遠にREADYにならない）
+
+統計:
+    - 最長依存チェーン / クリティカルパス長
+    - 入次数（依存先の数）・出次数（依存されている数）
+    - 初心者モードのギャップ（初心者向け文言の欠落、スキップされる依存先）
+
+使い方:
+    python -m services.catalog_validator [CATALOG_PATH] [--json] [--top N]
+
+エラーがある場合は終了コード1を返す。
+"""
+import argparse
+import heapq
+import json
+import logging
+import sys
+from collections import Counter, deque
+from typing import List, Dict, Any
+
+from services.catalog_graph import find_cycles
+
+logger = logging.getLogger(__name__)
+
+_BEGINNER_FIELDS = ('beginner_title', 'beginner_description', 'beginner_why')
+
+
+def _chain(node: int, predecessor: List[int], ids: List[str]) -> List[str]:
+    """最長チェーンの終端から始点までを辿る"""
+    chain = []
+    while node >= 0:
+        chain.append(ids[node])
+        node = predecessor[node]
+    return list(reversed(chain))
+
+
+def analyze_catalog(items: List[Dict[str, Any]], top: int = 5) -> Dict[str, Any]:
+    """
+    正規化済みカタログを検証し、グラフ統計を算出
+
+    設定項目IDを整数インデックスに変換し、Kahn法によるトポロジカル走査
+    1回で到達可能性・最長チェーンを同時に求める。循環の特定（Tarjan）は
+    走査で処理しきれなかった残りの項目に対してのみ行う。
+
+    Args:
+        items: normalize_config_item() 済みのアイテム（重複を含んでよい）
+        top: ランキング系の出力件数
+
+    Returns:
+        検証結果（errors, stats など）
+    """
+    id_counts = Counter(item['id'] for item in items)
+    duplicates = sorted(item_id for item_id, count in id_counts.items() if count > 1)
+
+    by_id = {item['id']: item for item in items}
+    ids = list(by_id)
+    index = {item_id: i for i, item_id in enumerate(ids)}
+    item_count = len(ids)
+
+    # 隣接リスト（整数インデックス）と参照切れ
+    dangling = []
+    depends_idx: List[List[int]] = []
+    dependents_idx: List[List[int]] = [[] for _ in range(item_count)]
+    for i, item_id in enumerate(ids):
+        raw_deps = by_id[item_id].get('depends_on') or []
+        try:
+            deps = [index[dep_id] for dep_id in raw_deps]
+        except KeyError:
+            deps = []
+            for dep_id in raw_deps:
+                if dep_id in index:
+                    deps.append(index[dep_id])
+                else:
+                    dangling.append((item_id, dep_id))
+        if len(deps) > 1 and len(set(deps)) < len(deps):
+            deps = list(dict.fromkeys(deps))
+        for dep in deps:
+            dependents_idx[dep].append(i)
+        depends_idx.append(deps)
+
+    # Kahn法で走査しながら、到達可能性（参照切れの下流を除外）と最長チェーンを算出
+    remaining = [len(deps) for deps in depends_idx]
+    broken = [False] * item_count
+    for item_id, _ in dangling:
+        broken[index[item_id]] = True
+    depth = [1] * item_count
+    predecessor = [-1] * item_count
+    queue = deque(i for i in range(item_count) if remaining[i] == 0)
+    visited = 0
+    while queue:
+        node = queue.popleft()
+        visited += 1
+        node_broken = broken[node]
+        next_depth = depth[node] + 1
+        for dependent in dependents_idx[node]:
+            if node_broken:
+                broken[dependent] = True
+            if next_depth > depth[dependent]:
+                depth[dependent] = next_depth
+                predecessor[dependent] = node
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                queue.append(dependent)
+
+    # 走査で残った項目は循環またはその下流
+    cycles = []
+    if visited < item_count:
+        leftover = {ids[i]: [ids[dep] for dep in depends_idx[i]] for i in range(item_count) if remaining[i] > 0}
+        cycles = find_cycles(leftover)
+    unreachable = sorted(ids[i] for i in range(item_count) if broken[i] or remaining[i] > 0)
+
+    reachable_depth = {
+        i: depth[i] for i in range(item_count)
+        if not broken[i] and remaining[i] == 0
+    }
+    deepest = heapq.nsmallest(top, reachable_depth, key=lambda i: (-reachable_depth[i], ids[i]))
+    longest_chains = [_chain(i, predecessor, ids) for i in deepest]
+
+    # 次数
+    in_degree = [len(deps) for deps in depends_idx]
+    out_degree = [len(dependents) for dependents in dependents_idx]
+    edge_count = sum(in_degree)
+
+    # 初心者モードのギャップ（初心者向け文言の欠落、スキップされる依存先）
+    missing_beginner_fields: Dict[str, List[str]] = {field: [] for field in _BEGINNER_FIELDS}
+    collapsed_dependencies: List[str] = []
+    expert_only = {i for i, item_id in enumerate(ids) if not by_id[item_id].get('beginner_mode', True)}
+    for i, item_id in enumerate(ids):
+        if i in expert_only:
+            continue
+        item = by_id[item_id]
+        for field in _BEGINNER_FIELDS:
+            if not item.get(field):
+                missing_beginner_fields[field].append(item_id)
+        if expert_only and not expert_only.isdisjoint(depends_idx[i]):
+            collapsed_dependencies.append(item_id)
+
+    errors = (
+        [f"Duplicate config item id: {item_id}" for item_id in duplicates]
+        + [f"{item_id} depends on unknown item {dep_id}" for item_id, dep_id in dangling]
+        + [f"Dependency cycle among: {', '.join(cycle)}" for cycle in cycles]
+    )
+
+    return {
+        'valid': not errors,
+        'errors': errors,
+        'item_count': item_count,
+        'edge_count': edge_count,
+        'duplicates': duplicates,
+        'dangling_references': [{'item': item_id, 'missing': dep_id} for item_id, dep_id in dangling],
+        'cycles': cycles,
+        'unreachable': unreachable,
+        'critical_path_length': max(reachable_depth.values(), default=0),
+        'longest_chains': longest_chains,
+        'degree': {
+            'max_in': max(in_degree, default=0),
+            'max_out': max(out_degree, default=0),
+            'mean': round(edge_count / item_count, 2) if item_count else 0,
+            'roots': in_degree.count(0),
+            'leaves': out_degree.count(0),
+            'top_out': [
+                {'id': ids[i], 'dependents': out_degree[i]}
+                for i in heapq.nsmallest(top, range(item_count), key=lambda i: (-out_degree[i], ids[i]))
+            ],
+        },
+        'beginner_gaps': {
+            'missing_fields': missing_beginner_fields,
+            'collapsed_dependencies': collapsed_dependencies,
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """検証結果を人間向けのテキストに整形"""
+    lines = [
+        f"items: {report['item_count']}  edges: {report['edge_count']}",
+        f"critical path length: {report['critical_path_length']}",
+        f"degree: max in {report['degree']['max_in']}, max out {report['degree']['max_out']}, "
+        f"mean {report['degree']['mean']}, roots {report['degree']['roots']}, leaves {report['degree']['leaves']}",
+        "",
+        "longest dependency chains:",
+    ]
+    for chain in report['longest_chains']:
+        lines.append(f"  ({len(chain)}) {' -> '.join(chain)}")
+
+    lines.append("")
+    lines.append("most depended-on items:")
+    for entry in report['degree']['top_out']:
+        lines.append(f"  {entry['id']}: {entry['dependents']}")
+
+    gaps = report['beginner_gaps']
+    lines.append("")
+    lines.append(f"beginner mode: {len(gaps['collapsed_dependencies'])} items depend on skipped (expert-only) items")
+    for field, item_ids in gaps['missing_fields'].items():
+        if item_ids:
+            lines.append(f"  missing {field} ({len(item_ids)}): {', '.join(item_ids[:10])}{' ...' if len(item_ids) > 10 else ''}")
+
+    if report['unreachable']:
+        lines.append("")
+        lines.append(f"unreachable items ({len(report['unreachable'])}): {', '.join(report['unreachable'])}")
+
+    lines.append("")
+    if report['errors']:
+        lines.append(f"{len(report['errors'])} error(s):")
+        lines.extend(f"  {error}" for error in report['errors'])
+    else:
+        lines.append("catalog is valid")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """CLIエントリポイント"""
+    parser = argparse.ArgumentParser(description="Validate the catalog and report dependency graph statistics")
+    parser.add_argument('catalog_path', nargs='?', help="catalog YAML, directory or glob (default: CATALOG_PATH)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--top', type=int, default=5, help="number of entries in rankings")
+    args = parser.parse_args(argv)
+
+    from services.catalog_loader import load_catalog_items, normalize_config_item
+    catalog_path = args.catalog_path
+    if catalog_path is None:
+        from config import get_settings
+        catalog_path = get_settings().catalog_path
+
+    raw_items = load_catalog_items(catalog_path)
+    if not raw_items:
+        print(f"error: no config items loaded from {catalog_path}", file=sys.stderr)
+        return 1
+
+    items = [normalize_config_item(item) for item in raw_items if item.get('id')]
+    report = analyze_catalog(items, top=args.top)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+    return 0 if report['valid'] else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
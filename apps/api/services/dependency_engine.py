@@ -1,89 +1,116 @@
 from sqlalchemy.orm import Session
 from typing import List, Set, Dict, Optional
 import logging
+import threading
 import crud
 import models
+from database import SessionLocal
+from services.catalog_graph import get_catalog_graph, MISSING_NODE
+from services.engine_state import EngineState, BacklogRecord, STATUSES, STATUS_CODES, NOT_IN_BACKLOG
 
 logger = logging.getLogger(__name__)
 
 
+def get_readiness_evaluator(graph):
+    """
+    設定（ENGINE_BACKEND）に応じた全件再計算の評価器を取得
+
+    numpy の場合は疎行列による評価器を返す。numpy / scipy が無い場合は
+    警告を出して純Python実装（None）にフォールバックする。
+    """
+    from config import get_settings
+    if get_settings().engine_backend != "numpy":
+        return None
+    try:
+        from services.engine_sparse import get_sparse_readiness
+    except ImportError:
+        logger.warning("ENGINE_BACKEND=numpy requires numpy and scipy; using the python backend")
+        return None
+    return get_sparse_readiness(graph)
+
+
 class DependencyEngine:
     """
     依存関係エンジン
     
-    設定項目の依存関係を管理し、次に回答すべき質問を提示する
+    設定項目の依存関係を管理し、次に回答すべき質問を提示する。
+    判定はコンパクトな配列状態（EngineState）で行い、
+    ORMオブジェクトはDBへ差分を反映するとき・質問を返すときにのみ扱う。
     """
     
     def __init__(self, db: Session, project_id: int, mode_filter: str = None):
         self.db = db
         self.project_id = project_id
         self.mode_filter = mode_filter
+        self._config_items: Optional[Dict[str, models.ConfigItem]] = None
+        self._progress_tally: Optional[List[int]] = None
         self._load_state()
     
     def _load_state(self):
         """現在の状態を読み込む"""
-        # プロジェクトの回答を取得
-        self.answers = crud.get_answers(self.db, self.project_id)
+        # プロジェクトの対象モジュール（Noneの場合は全モジュール）
+        project = crud.get_project(self.db, self.project_id)
+        self.modules: Optional[List[str]] = project.modules if project else None
         
-        # 回答済みの設定項目IDセット
-        self.answered_config_ids: Set[str] = set(
-            answer.config_item_id for answer in self.answers
-        )
+        # 現在のプロジェクトリビジョン（ステータス変更の記録に使う）
+        self.revision: int = project.revision if project else 0
         
-        # バックログアイテムを取得
-        self.backlog_items = crud.get_backlog_items(self.db, self.project_id)
+        # 依存関係グラフ（カタログバージョン単位でキャッシュ、全モジュール分）
+        self.graph = get_catalog_graph(self.db)
+        self.dependents = self.graph.dependents
         
-        # 設定項目マスタを取得
-        self.config_items = {
-            item.id: item 
-            for item in crud.get_config_items(self.db)
-        }
+        # バックログの保存済み状態（列のみ取得）
+        index = self.graph.index
+        self.backlog_items: List[BacklogRecord] = [
+            BacklogRecord(row.id, index[row.config_item_id], row.config_item_id, row.status, row.answered, row.status_revision)
+            for row in crud.get_backlog_rows(self.db, self.project_id)
+            if row.config_item_id in index
+        ]
+        
+        self.state = EngineState.build(
+            self.graph,
+            self.mode_filter,
+            self.modules,
+            crud.get_answered_config_ids(self.db, self.project_id),
+            ((record.config_item_id, record.status) for record in self.backlog_items),
+            evaluator=get_readiness_evaluator(self.graph)
+        )
+    
+    @property
+    def config_items(self) -> Dict[str, models.ConfigItem]:
+        """対象モジュールの設定項目マスタ（ORM、初回参照時に取得）"""
+        if self._config_items is None:
+            self._config_items = {
+                item.id: item
+                for item in crud.get_config_items(self.db, modules=self.modules)
+            }
+        return self._config_items
+    
+    @property
+    def answered_config_ids(self) -> Set[str]:
+        """回答済みの設定項目IDセット"""
+        return self.state.answered_ids()
     
-    def is_dependency_satisfied(self, config_item_id: str, _visited: Set[str] = None) -> bool:
+    def is_dependency_satisfied(self, config_item_id: str) -> bool:
         """
         依存関係が満たされているかチェック
         
         初心者モードでは、beginner_mode=false の依存先はスキップするが、
         スキップした項目自身の依存関係は引き継いで再帰的にチェックする。
+        プロジェクトの対象モジュール外の依存先は満たされているものとみなす。
         
         例: FI-APAR-003 → FI-APAR-001(skip) → FI-CORE-002(check)
         
         Args:
             config_item_id: チェックする設定項目ID
-            _visited: 循環参照防止用（内部使用）
             
         Returns:
             全ての依存が満たされている場合True
         """
-        if _visited is None:
-            _visited = set()
-        if config_item_id in _visited:
-            return True  # 循環参照を防止
-        _visited.add(config_item_id)
-        
-        config_item = self.config_items.get(config_item_id)
-        if not config_item:
-            return False
-        
-        depends_on = config_item.depends_on or []
-        
-        for dep_id in depends_on:
-            if dep_id in self.answered_config_ids:
-                continue
-            
-            # 初心者モードでは beginner_mode=false の依存先をスキップ
-            # ただし、スキップした項目の依存関係は引き継いでチェック
-            if self.mode_filter == 'BEGINNER':
-                dep_item = self.config_items.get(dep_id)
-                if dep_item and not dep_item.beginner_mode:
-                    # スキップする項目の依存関係を再帰チェック
-                    if not self.is_dependency_satisfied(dep_id, _visited):
-                        return False
-                    continue
-            
+        node = self.graph.index.get(config_item_id)
+        if node is None:
             return False
-        
-        return True
+        return self.state.is_satisfied(node)
     
     def get_blocking_dependencies(self, config_item_id: str) -> List[str]:
         """
@@ -95,168 +122,303 @@ class DependencyEngine:
         Returns:
             未回答の依存項目IDリスト
         """
-        config_item = self.config_items.get(config_item_id)
-        if not config_item:
+        node = self.graph.index.get(config_item_id)
+        if node is None or not self.state.in_scope[node]:
             return []
         
-        depends_on = config_item.depends_on or []
-        
+        state = self.state
         return [
-            dep_id 
-            for dep_id in depends_on 
-            if dep_id not in self.answered_config_ids
+            dep_id
+            for dep_id, dep in zip(self.graph.depends_on[config_item_id], self.graph.deps_idx[node])
+            if dep == MISSING_NODE or (not state.answered[dep] and state.in_scope[dep])
         ]
     
-    def update_backlog_statuses(self):
+    def update_backlog_statuses(self, revision: int = None) -> int:
         """
         バックログアイテムのステータスを更新
         
         - 回答済み → DONE
         - 依存関係満たされている → READY
         - 依存関係満たされていない → BLOCKED
+        
+        配列上で再計算し、保存済みの状態と異なるアイテムのみを一括更新する。
+        
+        Args:
+            revision: 変更したアイテムに記録するリビジョン（省略時は現在のプロジェクトリビジョン）
+        
+        Returns:
+            ステータスを変更したアイテム数
         """
-        for item in self.backlog_items:
-            new_status = None
-            new_answered = item.config_item_id in self.answered_config_ids
-            
-            if new_answered and item.status != models.BacklogStatus.DONE:
-                new_status = models.BacklogStatus.DONE
-            elif not new_answered:
-                if self.is_dependency_satisfied(item.config_item_id):
-                    if item.status != models.BacklogStatus.READY:
-                        new_status = models.BacklogStatus.READY
-                else:
-                    if item.status != models.BacklogStatus.BLOCKED:
-                        new_status = models.BacklogStatus.BLOCKED
+        if revision is None:
+            revision = self.revision
+        state = self.state
+        state.recompute()
+        
+        changes = []
+        for record in self.backlog_items:
+            new_status = STATUSES[state.status[record.node]]
+            new_answered = bool(state.answered[record.node])
             
             # 更新が必要な場合のみ更新
-            if new_status or item.answered != new_answered:
-                item.answered = new_answered
-                if new_status:
-                    item.status = new_status
-                self.db.commit()
+            if record.status != new_status or record.answered != new_answered:
+                record.status = new_status
+                record.answered = new_answered
+                record.status_revision = revision
+                changes.append({
+                    'id': record.id,
+                    'status': new_status,
+                    'answered': new_answered,
+                    'status_revision': revision
+                })
+        
+        crud.update_backlog_states(self.db, changes)
+        return len(changes)
     
-    def get_next_questions(self, limit: int = 5, mode_filter: str = None) -> List[models.ConfigItem]:
+    def get_next_questions(self, limit: int = 5, mode_filter: str = None, ranking: str = 'priority') -> List[models.ConfigItem]:
         """
         次に回答すべき質問を取得
         
         Args:
             limit: 取得する質問の最大数
             mode_filter: モードフィルタ（'BEGINNER' の場合は beginner_mode=True のみ）
+            ranking: 並び順
+                - 'priority': 優先度 → ID
+                - 'impact': 推移的に解放する下流項目数 → クリティカルパス上の残り長 → 優先度 → ID
+                  （スコアはカタロググラフで事前計算済みのため、READY件数に比例するコストのみ）
             
         Returns:
-            次に回答すべき設定項目のリスト（優先度順）
+            次に回答すべき設定項目のリスト
         """
-        # READYステータスのバックログアイテムを取得
-        ready_items = [
-            item for item in self.backlog_items 
-            if item.status == models.BacklogStatus.READY and not item.answered
-        ]
+        graph = self.graph
+        in_scope = self.state.in_scope
         
-        # 設定項目を取得して優先度でソート
-        next_items = []
-        for item in ready_items:
-            config_item = self.config_items.get(item.config_item_id)
-            if config_item:
-                # モードフィルタ適用
-                if mode_filter == 'BEGINNER':
-                    # 初心者モードでは beginner_mode=True のみ
-                    if not config_item.beginner_mode:
-                        continue
-                next_items.append(config_item)
+        # READYステータスのバックログアイテムを取得（モードフィルタ適用）
+        ready_nodes = [
+            record.node for record in self.backlog_items
+            if record.status == models.BacklogStatus.READY and not record.answered
+            and in_scope[record.node]
+            and (mode_filter != 'BEGINNER' or graph.beginner[record.node])
+        ]
         
         # 優先度でソート（P0 > P1 > ...）
         priority_order = {'P0': 0, 'P1': 1, 'P2': 2, 'P3': 3}
-        next_items.sort(
-            key=lambda x: (
-                priority_order.get(x.priority or 'P3', 99),
-                x.id
+        priorities = graph.priorities
+        ids = graph.ids
+        if ranking == 'impact':
+            downstream_counts = graph.downstream_counts
+            heights = graph.heights
+            ready_nodes.sort(
+                key=lambda node: (
+                    -downstream_counts.get(ids[node], 0),
+                    -heights.get(ids[node], 0),
+                    priority_order.get(priorities[node] or 'P3', 99),
+                    ids[node]
+                )
+            )
+        else:
+            ready_nodes.sort(
+                key=lambda node: (
+                    priority_order.get(priorities[node] or 'P3', 99),
+                    ids[node]
+                )
             )
-        )
         
-        return next_items[:limit]
+        return crud.get_config_items_by_ids(self.db, [ids[node] for node in ready_nodes[:limit]])
     
-    def get_dependency_graph(self) -> Dict[str, any]:
+    def get_dependency_graph(self, since_revision: int = None) -> Dict[str, any]:
         """
         依存関係グラフを取得（フロントエンド用）
         
+        レイヤー（トポロジカル深さ）とクリティカルパスはカタロググラフで
+        事前計算済みの値を使う。ノードは (レイヤー, 優先度, ID) の安定した順序で返す。
+        
+        Args:
+            since_revision: 指定した場合、このリビジョンより後にステータスが
+                変わった（または追加された）ノードとそのエッジのみを返す
+        
         Returns:
             ノードとエッジを含むグラフデータ
         """
-        nodes = []
-        edges = []
+        graph = self.graph
+        in_scope = self.state.in_scope
+        # クライアントのリビジョンが現在より新しい（DBの再作成など）場合は全量を返す
+        is_delta = since_revision is not None and since_revision <= self.revision
         
-        for item in self.backlog_items:
-            config_item = self.config_items.get(item.config_item_id)
-            if not config_item:
+        nodes = []
+        for record in self.backlog_items:
+            node = record.node
+            if not in_scope[node]:
+                continue
+            if is_delta and (record.status_revision or 0) <= since_revision:
                 continue
             
             # ノード作成
             nodes.append({
-                'id': config_item.id,
-                'label': config_item.title,
-                'priority': config_item.priority,
-                'status': item.status.value,
-                'answered': item.answered
+                'id': record.config_item_id,
+                'label': graph.titles[node],
+                'priority': graph.priorities[node],
+                'status': record.status.value,
+                'answered': record.answered,
+                'layer': graph.layers.get(record.config_item_id, 0),
+                'critical': record.config_item_id in graph.critical
             })
-            
-            # エッジ作成（依存関係）
-            for dep_id in (config_item.depends_on or []):
-                edges.append({
-                    'from': dep_id,
-                    'to': config_item.id
-                })
+        
+        priority_order = {'P0': 0, 'P1': 1, 'P2': 2, 'P3': 3}
+        nodes.sort(key=lambda node: (node['layer'], priority_order.get(node['priority'] or 'P3', 99), node['id']))
+        
+        # エッジ作成（依存関係）
+        edges = [
+            {'from': dep_id, 'to': node['id']}
+            for node in nodes
+            for dep_id in sorted(graph.depends_on[node['id']])
+        ]
         
         return {
+            'revision': self.revision,
+            'catalog_version': graph.version,
+            'since_revision': since_revision if is_delta else None,
+            'critical_path_length': graph.critical_path_length,
             'nodes': nodes,
             'edges': edges
         }
     
-    def expand_backlog_from_answer(self, config_item_id: str):
+    def compute_expansion(self, config_item_id: str) -> List[Dict[str, any]]:
+        """
+        回答によってバックログに追加される設定項目を算出（DB更新なし）
+        
+        逆依存インデックスを起点に、回答された項目から下流へ一度だけ辿る。
+        追加された項目がさらに別の項目の依存を満たす場合も、同じパスで
+        推移的に展開する（不動点に達するまで）。
+        状態の複製上で評価するため、エンジン自身の状態は変わらない。
+        
+        Args:
+            config_item_id: 回答された（または回答を仮定する）設定項目ID
+            
+        Returns:
+            追加される項目のリスト [{'config_item_id', 'status'}]（追加順）
+        """
+        node = self.graph.index.get(config_item_id)
+        if node is None:
+            return []
+        
+        # プレビュー時は未回答でも回答済みとみなして評価する
+        state = self.state.copy()
+        state.answered[node] = 1
+        ids = self.graph.ids
+        return [
+            {'config_item_id': ids[added], 'status': STATUSES[code]}
+            for added, code in state.expand(node)
+        ]
+    
+    def simulate(self, answered: List[str], unanswered: List[str] = ()) -> Dict[str, any]:
+        """
+        回答の追加・取り消しを仮定した場合のバックログを算出（DB更新なし）
+        
+        状態の複製上で回答送信と同じ順序（展開 → ステータス再計算）で評価する。
+        再計算は回答状況が変わった項目から影響が及ぶノードに限り、進捗もその差分で求める
+        （保存済みのステータスが最新であることを前提とする）。
+        回答を取り消してもバックログから項目は削除されない（実際の書き込みと同じ）。
+        カタログに存在しない設定項目IDは無視する。
+        
+        Args:
+            answered: 回答したと仮定する設定項目ID
+            unanswered: 回答を取り消したと仮定する設定項目ID
+            
+        Returns:
+            changed: ステータスが変わる項目 [{'config_item_id', 'title', 'priority', 'status', 'previous_status'}]
+            added: バックログに追加される項目 [{'config_item_id', 'title', 'priority', 'status'}]
+            progress: 仮定後の進捗
+            current_progress: 現在の進捗
+        """
+        graph = self.graph
+        base = self.state
+        state = base.copy()
+        
+        toggled = []
+        for config_item_ids, flag in ((unanswered, 0), (answered, 1)):
+            for config_item_id in config_item_ids:
+                node = graph.index.get(config_item_id)
+                if node is not None and state.answered[node] != flag:
+                    state.answered[node] = flag
+                    toggled.append(node)
+        
+        added_nodes = [
+            added
+            for node in toggled if state.answered[node]
+            for added, _ in state.expand(node)
+        ]
+        touched = state.affected_by(toggled + added_nodes)
+        state.recompute(touched)
+        
+        changed = []
+        added = []
+        for node in sorted(touched):
+            code = state.status[node]
+            if code == NOT_IN_BACKLOG or code == base.status[node]:
+                continue
+            entry = {
+                'config_item_id': graph.ids[node],
+                'title': graph.titles[node],
+                'priority': graph.priorities[node],
+                'status': STATUSES[code]
+            }
+            if base.status[node] == NOT_IN_BACKLOG:
+                added.append(entry)
+            else:
+                entry['previous_status'] = STATUSES[base.status[node]]
+                changed.append(entry)
+        
+        if self._progress_tally is None:
+            self._progress_tally = base.tally()
+        counts = [
+            current - before + after
+            for current, before, after in zip(self._progress_tally, base.tally(touched), state.tally(touched))
+        ]
+        return {
+            'changed': changed,
+            'added': added,
+            'progress': state.progress(counts),
+            'current_progress': base.progress(self._progress_tally)
+        }
+    
+    def expand_backlog_from_answer(self, config_item_id: str) -> List[models.BacklogItem]:
         """
         回答に基づいてバックログを展開
         
         回答が追加されたことで、依存関係が満たされた新しい設定項目を
         バックログに自動追加する。P0項目は初期登録済みなので、
-        主にP1項目の動的追加を行う。
+        主にP1項目の動的追加を行う。追加項目は初期ステータス付きで
+        一括登録する（コミットは1回）。
         
         Args:
             config_item_id: 回答された設定項目ID
+            
+        Returns:
+            追加されたバックログアイテムのリスト
         """
-        # 現在バックログに存在する設定項目IDのセット
-        existing_backlog_ids = set(
-            item.config_item_id for item in self.backlog_items
-        )
+        expansion = self.compute_expansion(config_item_id)
+        if not expansion:
+            return []
         
-        # 全設定項目から、まだバックログに追加されていないものを探す
-        for item_id, config_item in self.config_items.items():
-            if item_id in existing_backlog_ids:
-                continue
-            
-            # 依存関係に今回回答された項目が含まれているかチェック
-            depends_on = config_item.depends_on or []
-            if config_item_id not in depends_on:
-                continue
-            
-            # この項目の全ての依存が満たされているかチェック
-            all_deps_have_backlog_or_answered = True
-            for dep_id in depends_on:
-                if dep_id not in existing_backlog_ids and dep_id not in self.answered_config_ids:
-                    all_deps_have_backlog_or_answered = False
-                    break
-            
-            if all_deps_have_backlog_or_answered:
-                # バックログに追加
-                new_item = crud.create_backlog_item(
-                    self.db, self.project_id, item_id
-                )
-                logger.info(
-                    f"Expanded backlog: added {item_id} for project {self.project_id} "
-                    f"(triggered by answer to {config_item_id})"
-                )
-                # 内部状態も更新
-                self.backlog_items.append(new_item)
-                existing_backlog_ids.add(item_id)
+        new_items = crud.create_backlog_items(
+            self.db,
+            self.project_id,
+            [(entry['config_item_id'], entry['status']) for entry in expansion],
+            revision=self.revision
+        )
+        logger.info(
+            f"Expanded backlog: added {[e['config_item_id'] for e in expansion]} "
+            f"for project {self.project_id} (triggered by answer to {config_item_id})"
+        )
+        # 内部状態も更新
+        index = self.graph.index
+        for item in new_items:
+            node = index[item.config_item_id]
+            self.state.status[node] = STATUS_CODES[item.status]
+            self.backlog_items.append(BacklogRecord(
+                item.id, node, item.config_item_id, item.status, item.answered, item.status_revision
+            ))
+        return new_items
 
 
 def expand_backlog_after_answer(db: Session, project_id: int, config_item_id: str, mode_filter: str = None):
@@ -268,25 +430,156 @@ def expand_backlog_after_answer(db: Session, project_id: int, config_item_id: st
         project_id: プロジェクトID
         config_item_id: 回答された設定項目ID
         mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        
+    Returns:
+        追加されたバックログアイテムのリスト
     """
     engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
-    engine.expand_backlog_from_answer(config_item_id)
+    return engine.expand_backlog_from_answer(config_item_id)
 
 
-def update_project_backlog(db: Session, project_id: int, mode_filter: str = None):
+def preview_backlog_expansion(db: Session, project_id: int, config_item_id: str, mode_filter: str = None) -> List[Dict[str, any]]:
+    """
+    回答した場合に追加されるバックログ項目をプレビュー（DB更新なし）
+    
+    Args:
+        db: データベースセッション
+        project_id: プロジェクトID
+        config_item_id: 回答を仮定する設定項目ID
+        mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        
+    Returns:
+        追加される項目のリスト [{'config_item_id', 'status'}]
+    """
+    engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
+    return engine.compute_expansion(config_item_id)
+
+
+def simulate_answers(
+    db: Session,
+    project_id: int,
+    answered: List[str],
+    unanswered: List[str] = (),
+    mode_filter: str = None
+) -> Dict[str, any]:
+    """
+    回答の追加・取り消しを仮定した場合のバックログをシミュレーション（DB更新なし）
+    
+    Args:
+        db: データベースセッション
+        project_id: プロジェクトID
+        answered: 回答したと仮定する設定項目ID
+        unanswered: 回答を取り消したと仮定する設定項目ID
+        mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        
+    Returns:
+        DependencyEngine.simulate() の結果
+    """
+    engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
+    return engine.simulate(answered, unanswered)
+
+
+def update_project_backlog(db: Session, project_id: int, mode_filter: str = None, revision: int = None) -> int:
     """
     プロジェクトのバックログステータスを更新
     
+    書き込み系の処理（回答送信・プロジェクト更新・カタログ再読込）からのみ呼び出す。
+    GETはここで保存されたステータスを読むだけにする。
+    呼び出し側はリビジョンを先に進めておくこと（変更したアイテムに現在のリビジョンを記録する）。
+    
     Args:
         db: データベースセッション
         project_id: プロジェクトID
         mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        revision: 変更したアイテムに記録するリビジョン（省略時は現在のプロジェクトリビジョン）
+        
+    Returns:
+        ステータスを変更したアイテム数
     """
     engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
-    engine.update_backlog_statuses()
+    return engine.update_backlog_statuses(revision)
+
+
+def repair_backlog_statuses(db: Session, project_ids: List[int] = None) -> Dict[int, int]:
+    """
+    保存済みのバックログステータスと、回答・カタログから算出したステータスのずれを修復
+    
+    書き込み経路の取りこぼし（異常終了、他プロセスでのカタログ変更など）を
+    補正する整合性ジョブ。ずれがあったプロジェクトはリビジョンを進める。
+    
+    Args:
+        db: データベースセッション
+        project_ids: 対象プロジェクトID（省略時は全プロジェクト）
+        
+    Returns:
+        プロジェクトID → 修復したアイテム数（ずれがあったプロジェクトのみ）
+    """
+    query = db.query(models.Project)
+    if project_ids is not None:
+        query = query.filter(models.Project.id.in_(project_ids))
+    
+    repaired = {}
+    for project in query.all():
+        mode_filter = project.mode.value if project.mode else 'EXPERT'
+        changed = update_project_backlog(db, project.id, mode_filter=mode_filter, revision=project.revision + 1)
+        if changed:
+            crud.bump_project_revision(db, project.id)
+            repaired[project.id] = changed
+            logger.warning(f"Repaired {changed} backlog statuses in project {project.id}")
+    return repaired
+
+
+class BacklogRepairJob:
+    """
+    バックログ整合性ジョブ
+    
+    バックグラウンドスレッドで定期的に repair_backlog_statuses() を実行する。
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def run_once(self) -> Dict[int, int]:
+        """全プロジェクトを1回修復"""
+        db = SessionLocal()
+        try:
+            return repair_backlog_statuses(db)
+        finally:
+            db.close()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Backlog repair failed: {e}")
+    
+    def start(self):
+        """修復ジョブを開始"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="backlog-repair", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """修復ジョブを停止"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
 
 
-def get_next_questions_for_project(db: Session, project_id: int, limit: int = 5, mode_filter: str = None) -> List[models.ConfigItem]:
+def get_next_questions_for_project(
+    db: Session,
+    project_id: int,
+    limit: int = 5,
+    mode_filter: str = None,
+    ranking: str = 'priority'
+) -> List[models.ConfigItem]:
     """
     プロジェクトの次の質問を取得
     
@@ -295,16 +588,21 @@ def get_next_questions_for_project(db: Session, project_id: int, limit: int = 5,
         project_id: プロジェクトID
         limit: 取得する質問の最大数
         mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        ranking: 並び順（'priority' / 'impact'）
         
     Returns:
         次に回答すべき設定項目のリスト
     """
     engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
-    engine.update_backlog_statuses()
-    return engine.get_next_questions(limit, mode_filter)
+    return engine.get_next_questions(limit, mode_filter, ranking=ranking)
 
 
-def get_dependency_graph_for_project(db: Session, project_id: int, mode_filter: str = None) -> Dict[str, any]:
+def get_dependency_graph_for_project(
+    db: Session,
+    project_id: int,
+    mode_filter: str = None,
+    since_revision: int = None
+) -> Dict[str, any]:
     """
     プロジェクトの依存関係グラフを取得
     
@@ -312,10 +610,10 @@ def get_dependency_graph_for_project(db: Session, project_id: int, mode_filter:
         db: データベースセッション
         project_id: プロジェクトID
         mode_filter: モードフィルタ（'BEGINNER' / 'EXPERT'）
+        since_revision: 差分取得の起点リビジョン
         
     Returns:
         グラフデータ
     """
     engine = DependencyEngine(db, project_id, mode_filter=mode_filter)
-    engine.update_backlog_statuses()
-    return engine.get_dependency_graph()
+    return engine.get_dependency_graph(since_revision)
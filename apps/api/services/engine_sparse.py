@@ -0,0 +1,110 @@
+"""
+NumPy/SciPy による準備完了判定（大規模カタログ向けの任意バックエンド）
+
+depends_on を CSR 疎行列（行: 項目、列: 依存先）として持ち、
+「全ての依存先が回答済み（または対象モジュール外）か」を
+未回答ベクトルとの疎行列・ベクトル積1回で全項目分まとめて判定する。
+
+設定 ENGINE_BACKEND=numpy で有効になる（numpy / scipy が必要）。
+判定結果は純Python実装（EngineState.is_satisfied）と一致させる。
+"""
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from services.catalog_graph import CatalogGraph, MISSING_NODE
+from services.engine_state import EngineState, BLOCKED, READY, DONE, NOT_IN_BACKLOG
+
+
+class SparseReadiness:
+    """
+    カタロググラフ1つ分の疎行列表現
+
+    adjacency: 全依存関係
+    hard / skip: 初心者モード用に列を事前に分割した行列
+        hard は beginner_mode=true の依存先、skip は beginner_mode=false の依存先
+        （初心者モードではスキップし、その依存先の依存関係を引き継ぐ）
+    """
+
+    def __init__(self, graph: CatalogGraph):
+        self.graph = graph
+        size = len(graph.ids)
+
+        rows: List[int] = []
+        cols: List[int] = []
+        self.missing = np.zeros(size, dtype=bool)
+        for node, deps in enumerate(graph.deps_idx):
+            for dep in deps:
+                if dep == MISSING_NODE:
+                    self.missing[node] = True
+                else:
+                    rows.append(node)
+                    cols.append(dep)
+
+        self.adjacency = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(size, size)
+        )
+        beginner = np.frombuffer(bytes(graph.beginner), dtype=np.uint8).astype(bool)
+        self.hard = (self.adjacency @ sparse.diags(beginner.astype(np.int32), dtype=np.int32)).tocsr()
+        self.skip = (self.adjacency @ sparse.diags((~beginner).astype(np.int32), dtype=np.int32)).tocsr()
+        self.hard.eliminate_zeros()
+        self.skip.eliminate_zeros()
+
+    def satisfied(self, state: EngineState) -> np.ndarray:
+        """
+        全項目について依存関係が満たされているかを判定
+
+        初心者モードでは、スキップした依存先が未回答の場合にその依存先自身の判定結果を使う。
+        スキップした依存先が回答済みならそこで連鎖が切れるため、推移閉包を静的に
+        作らず、満たされている候補から偽になる項目がなくなるまで反復する（連鎖の深さ回）。
+        """
+        answered = np.frombuffer(bytes(state.answered), dtype=np.uint8).astype(bool)
+        in_scope = np.frombuffer(bytes(state.in_scope), dtype=np.uint8).astype(bool)
+        # 未回答かつ対象モジュール内の依存先だけが項目をブロックする
+        pending = (in_scope & ~answered).astype(np.int32)
+        base = in_scope & ~self.missing
+
+        if not state.beginner:
+            return base & (self.adjacency @ pending == 0)
+
+        satisfied = base & (self.hard @ pending == 0)
+        while True:
+            unsatisfied_pending = pending * ~satisfied
+            updated = satisfied & (self.skip @ unsatisfied_pending == 0)
+            if np.array_equal(updated, satisfied):
+                return satisfied
+            satisfied = updated
+
+    def recompute(self, state: EngineState) -> List[int]:
+        """
+        バックログ内の全ノードのステータスを再計算（EngineState.recompute と同じ結果）
+
+        Returns:
+            ステータスが変わったノード番号のリスト
+        """
+        answered = np.frombuffer(bytes(state.answered), dtype=np.uint8).astype(bool)
+        codes = np.where(answered, DONE, np.where(self.satisfied(state), READY, BLOCKED)).astype(np.uint8)
+        current = np.frombuffer(bytes(state.status), dtype=np.uint8)
+        changed = np.flatnonzero((current != NOT_IN_BACKLOG) & (current != codes))
+        status = state.status
+        for node in changed.tolist():
+            status[node] = codes[node]
+        return changed.tolist()
+
+
+_cache_lock = threading.Lock()
+_cached: Optional[Tuple[CatalogGraph, SparseReadiness]] = None
+
+
+def get_sparse_readiness(graph: CatalogGraph) -> SparseReadiness:
+    """カタロググラフの疎行列表現を取得（グラフ単位でキャッシュ）"""
+    global _cached
+    cached = _cached
+    if cached is not None and cached[0] is graph:
+        return cached[1]
+
+    readiness = SparseReadiness(graph)
+    with _cache_lock:
+        _cached = (graph, readiness)
+    return readiness
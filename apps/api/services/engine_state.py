@@ -0,0 +1,270 @@
+"""
+依存関係エンジンのコンパクトな状態表現
+
+ORMオブジェクトの代わりに、コンパイル済みカタロググラフのノード番号で引く
+bytearray（回答済みフラグ・対象モジュール・ステータス）を持つ。
+判定処理はこの配列だけで完結し、DBへの反映は差分のみを行う。
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import models
+from services.catalog_graph import CatalogGraph, MISSING_NODE
+
+# ステータスコード（bytearray に格納する値）
+PENDING, BLOCKED, READY, DONE = 0, 1, 2, 3
+NOT_IN_BACKLOG = 255
+
+STATUSES = [
+    models.BacklogStatus.PENDING,
+    models.BacklogStatus.BLOCKED,
+    models.BacklogStatus.READY,
+    models.BacklogStatus.DONE,
+]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class BacklogRecord:
+    """
+    DBに保存されているバックログアイテムの状態（差分の検出と反映用）
+    """
+    __slots__ = ('id', 'node', 'config_item_id', 'status', 'answered', 'status_revision')
+
+    def __init__(
+        self,
+        id: Optional[int],
+        node: int,
+        config_item_id: str,
+        status: models.BacklogStatus,
+        answered: bool,
+        status_revision: int
+    ):
+        self.id = id
+        self.node = node
+        self.config_item_id = config_item_id
+        self.status = status
+        self.answered = answered
+        self.status_revision = status_revision
+
+
+class EngineState:
+    """
+    1プロジェクト分の判定状態
+
+    answered: ノード番号 → 回答済みなら1
+    in_scope: ノード番号 → プロジェクトの対象モジュールなら1
+    status: ノード番号 → ステータスコード（バックログに無い場合は NOT_IN_BACKLOG）
+    evaluator: 全件再計算を委譲する評価器（None の場合は純Python実装）
+    """
+    __slots__ = ('graph', 'beginner', 'answered', 'in_scope', 'status', 'evaluator')
+
+    def __init__(
+        self,
+        graph: CatalogGraph,
+        beginner: bool,
+        answered: bytearray,
+        in_scope: bytearray,
+        status: bytearray,
+        evaluator=None
+    ):
+        self.graph = graph
+        self.beginner = beginner
+        self.answered = answered
+        self.in_scope = in_scope
+        self.status = status
+        self.evaluator = evaluator
+
+    @classmethod
+    def build(
+        cls,
+        graph: CatalogGraph,
+        mode_filter: Optional[str],
+        modules: Optional[List[str]],
+        answered_ids: Iterable[str],
+        backlog: Iterable[Tuple[str, models.BacklogStatus]],
+        evaluator=None
+    ) -> "EngineState":
+        """回答済みID・バックログ（設定項目ID, ステータス）から状態を構築"""
+        size = len(graph.ids)
+        index = graph.index
+
+        answered = bytearray(size)
+        for config_item_id in answered_ids:
+            node = index.get(config_item_id)
+            if node is not None:
+                answered[node] = 1
+
+        if modules is None:
+            in_scope = bytearray(b'\x01') * size
+        else:
+            module_set = set(modules)
+            in_scope = bytearray(1 if graph.modules[item_id] in module_set else 0 for item_id in graph.ids)
+
+        status = bytearray([NOT_IN_BACKLOG]) * size
+        for config_item_id, item_status in backlog:
+            node = index.get(config_item_id)
+            if node is not None:
+                status[node] = STATUS_CODES.get(item_status, PENDING)
+
+        return cls(graph, mode_filter == 'BEGINNER', answered, in_scope, status, evaluator)
+
+    def copy(self) -> "EngineState":
+        """仮定の回答を評価するための複製（グラフは共有）"""
+        return EngineState(
+            self.graph, self.beginner, bytearray(self.answered), self.in_scope, bytearray(self.status), self.evaluator
+        )
+
+    def answered_ids(self) -> Set[str]:
+        """回答済みの設定項目ID"""
+        ids = self.graph.ids
+        return {ids[node] for node, flag in enumerate(self.answered) if flag}
+
+    def is_satisfied(self, node: int, _visited: Set[int] = None) -> bool:
+        """
+        依存関係が満たされているか
+
+        対象モジュール外の依存先は満たされているものとみなす。
+        初心者モードでは beginner_mode=false の依存先をスキップし、
+        その依存先の依存関係を引き継いで再帰的にチェックする。
+        """
+        if _visited is None:
+            _visited = set()
+        if node in _visited:
+            return True  # 循環参照を防止
+        _visited.add(node)
+
+        if not self.in_scope[node]:
+            return False
+
+        answered = self.answered
+        in_scope = self.in_scope
+        for dep in self.graph.deps_idx[node]:
+            if dep == MISSING_NODE:
+                return False
+            if answered[dep] or not in_scope[dep]:
+                continue
+            if self.beginner and not self.graph.beginner[dep]:
+                if not self.is_satisfied(dep, _visited):
+                    return False
+                continue
+            return False
+        return True
+
+    def compute_status(self, node: int) -> int:
+        """回答状況と依存関係からあるべきステータスコードを算出"""
+        if self.answered[node]:
+            return DONE
+        if self.is_satisfied(node):
+            return READY
+        return BLOCKED
+
+    def recompute(self, nodes: Iterable[int] = None) -> List[int]:
+        """
+        バックログ内のノードのステータスを再計算
+
+        Args:
+            nodes: 再計算するノード番号（省略時は全ノード。評価器があれば委譲する）
+
+        Returns:
+            ステータスが変わったノード番号のリスト
+        """
+        if nodes is None and self.evaluator is not None:
+            return self.evaluator.recompute(self)
+
+        status = self.status
+        changed = []
+        for node in (range(len(status)) if nodes is None else nodes):
+            code = status[node]
+            if code == NOT_IN_BACKLOG:
+                continue
+            new_code = self.compute_status(node)
+            if new_code != code:
+                status[node] = new_code
+                changed.append(node)
+        return changed
+
+    def affected_by(self, nodes: Iterable[int]) -> Set[int]:
+        """
+        nodes の回答状況が変わったときにステータスが変わりうるノード
+
+        自身と直接の依存元。初心者モードでは、スキップされる（beginner_mode=false の）
+        依存元の判定結果がさらにその依存元に引き継がれるため、推移的に含める。
+        """
+        graph = self.graph
+        affected = set(nodes)
+        queue = deque(affected)
+        while queue:
+            for dependent in graph.dependents_idx[queue.popleft()]:
+                if dependent in affected:
+                    continue
+                affected.add(dependent)
+                if self.beginner and not graph.beginner[dependent]:
+                    queue.append(dependent)
+        return affected
+
+    def expand(self, source: int) -> List[Tuple[int, int]]:
+        """
+        回答済みの source から下流へ辿り、バックログに追加される項目を算出
+
+        全ての依存先がバックログ内・回答済み・対象モジュール外である項目を追加し、
+        追加した項目を起点にさらに推移的に展開する（不動点に達するまで）。
+        追加した項目は status に反映する。
+
+        Returns:
+            追加した (ノード番号, ステータスコード) のリスト（追加順）
+        """
+        graph = self.graph
+        status = self.status
+        answered = self.answered
+        in_scope = self.in_scope
+
+        added = []
+        queue = deque([source])
+        while queue:
+            for dependent in graph.dependents_idx[queue.popleft()]:
+                if status[dependent] != NOT_IN_BACKLOG or not in_scope[dependent]:
+                    continue
+                if not all(
+                    dep != MISSING_NODE and (status[dep] != NOT_IN_BACKLOG or answered[dep] or not in_scope[dep])
+                    for dep in graph.deps_idx[dependent]
+                ):
+                    continue
+                status[dependent] = self.compute_status(dependent)
+                added.append((dependent, status[dependent]))
+                queue.append(dependent)
+        return added
+
+    def tally(self, nodes: Iterable[int] = None) -> List[int]:
+        """
+        進捗の集計値 [total, answered, ready, blocked, done]（nodes 省略時は全ノード）
+
+        初心者モードでは beginner_mode=True の項目のみカウントする。
+        """
+        beginner = self.graph.beginner if self.beginner else None
+        status = self.status
+        answered = self.answered
+        counts = [0, 0, 0, 0, 0]
+        for node in (range(len(status)) if nodes is None else nodes):
+            code = status[node]
+            if code == NOT_IN_BACKLOG or (beginner is not None and not beginner[node]):
+                continue
+            counts[0] += 1
+            counts[1] += answered[node]
+            if code == READY:
+                counts[2] += not answered[node]
+            elif code == BLOCKED:
+                counts[3] += 1
+            elif code == DONE:
+                counts[4] += 1
+        return counts
+
+    def progress(self, counts: List[int] = None) -> Dict[str, Any]:
+        """進捗を集計（compute_progress と同じ項目。counts は tally() の結果）"""
+        total, answered, ready, blocked, done = self.tally() if counts is None else counts
+        return {
+            'total': total,
+            'answered': answered,
+            'ready': ready,
+            'blocked': blocked,
+            'done': done,
+            'progress_percentage': round((answered / total * 100) if total > 0 else 0, 1)
+        }
@@ -0,0 +1,235 @@
+"""
+プロジェクトイベントのPub/Sub
+
+書き込み系の処理（回答送信・バックログ更新・成果物生成）から発行したイベントを
+SSE（GET /api/projects/{id}/events）の購読者に配信する。
+
+バックエンド:
+    - memory: プロセス内のみで配信（既定）
+    - postgres: PostgreSQL の LISTEN/NOTIFY 経由で全プロセスに配信
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 購読者ごとのキュー上限（遅いクライアントのイベントは古いものから捨てる）
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# LISTEN/NOTIFY のチャンネル名
+NOTIFY_CHANNEL = "imgquest_events"
+
+
+class Subscription:
+    """
+    1つのSSE接続の購読
+
+    イベントは発行側のスレッド（同期エンドポイント）から
+    購読側のイベントループへ call_soon_threadsafe で受け渡す。
+    """
+
+    def __init__(self, bus: "EventBus", project_id: int, loop: asyncio.AbstractEventLoop):
+        self.bus = bus
+        self.project_id = project_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: Dict[str, Any]):
+        """イベントを購読側のループに渡す（任意のスレッドから呼び出し可）"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # ループが既に閉じている（切断済み）
+            self.close()
+
+    async def get(self, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """次のイベントを待つ（タイムアウト時はNone）"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """購読を解除"""
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """プロセス内のPub/Sub"""
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id: int) -> Subscription:
+        """プロジェクトのイベントを購読（イベントループ内で呼び出す）"""
+        subscription = Subscription(self, project_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """購読を解除"""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.project_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.project_id]
+
+    def subscriber_count(self, project_id: int) -> int:
+        """プロジェクトの購読者数"""
+        with self._lock:
+            return len(self._subscriptions.get(project_id, ()))
+
+    def has_listeners(self, project_id: int) -> bool:
+        """イベントを受け取る購読者がいる可能性があるか（無ければ発行を省略できる）"""
+        return self.subscriber_count(project_id) > 0
+
+    def dispatch(self, project_id: int, event: Dict[str, Any]):
+        """このプロセスの購読者にイベントを配信"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(project_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def publish(self, project_id: int, event: Dict[str, Any]):
+        """イベントを発行"""
+        self.dispatch(project_id, event)
+
+    def start(self):
+        """バックエンドの受信処理を開始（プロセス内のみの場合は何もしない）"""
+
+    def stop(self):
+        """バックエンドの受信処理を停止"""
+
+
+class PostgresEventBus(EventBus):
+    """
+    PostgreSQL LISTEN/NOTIFY を使うPub/Sub
+
+    発行は pg_notify で行い、受信スレッドが LISTEN したイベントを
+    このプロセスの購読者に配信する（自プロセスの発行分も NOTIFY 経由で届く）。
+    NOTIFY のペイロード上限（8000バイト）を超えるイベントはプロセス内のみに配信する。
+    """
+
+    _MAX_PAYLOAD = 7900
+
+    def __init__(self, database_url: str, channel: str = NOTIFY_CHANNEL, poll_interval: float = 1.0):
+        super().__init__()
+        self.database_url = database_url
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def has_listeners(self, project_id: int) -> bool:
+        # 他プロセスの購読者は把握できない
+        return True
+
+    def publish(self, project_id: int, event: Dict[str, Any]):
+        payload = json.dumps({'project_id': project_id, 'event': event}, ensure_ascii=False, default=str)
+        if len(payload.encode('utf-8')) > self._MAX_PAYLOAD:
+            logger.warning(f"Event too large for NOTIFY, delivering locally: {event.get('type')}")
+            self.dispatch(project_id, event)
+            return
+
+        from sqlalchemy import text
+        from database import engine
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': self.channel, 'payload': payload})
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(self.database_url)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                        self.dispatch(message['project_id'], message['event'])
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed event notification: {e}")
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Event listener failed, reconnecting: {e}")
+                self._stop_event.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="event-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.poll_interval + 1)
+        self._thread = None
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """設定に応じたイベントバスを取得（シングルトン）"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                from config import get_settings
+                settings = get_settings()
+                if settings.event_backend == "postgres":
+                    _bus = PostgresEventBus(settings.database_url)
+                else:
+                    _bus = EventBus()
+    return _bus
+
+
+def publish_event(project_id: int, event: Dict[str, Any]):
+    """
+    プロジェクトのイベントを発行
+
+    配信の失敗で書き込み処理を失敗させないよう、例外はログに残して握りつぶす。
+    """
+    try:
+        get_event_bus().publish(project_id, event)
+    except Exception as e:
+        logger.error(f"Failed to publish {event.get('type')} event for project {project_id}: {e}")
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """イベントをSSEのテキスト形式に変換"""
+    lines = []
+    if event.get('revision') is not None:
+        lines.append(f"id: {event['revision']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
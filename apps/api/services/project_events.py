@@ -0,0 +1,109 @@
+"""
+プロジェクトイベントの組み立て
+
+書き込み系の処理の前後でバックログのステータスを比較し、
+SSEで配信する差分イベント（ステータス変化・展開された項目・進捗）を作る。
+"""
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Any
+import crud
+import models
+from services.event_bus import get_event_bus, publish_event
+
+
+def compute_progress(db: Session, project: models.Project) -> Dict[str, Any]:
+    """
+    ウィザードの進捗を集計
+    
+    初心者モードでは beginner_mode=True の項目のみカウントする。
+    """
+    mode_filter = project.mode.value if project.mode else 'EXPERT'
+    backlog_items = crud.get_backlog_items(db, project.id)
+    
+    if mode_filter == 'BEGINNER':
+        config_items_map = {item.id: item for item in crud.get_config_items(db)}
+        backlog_items = [
+            item for item in backlog_items
+            if config_items_map.get(item.config_item_id) and config_items_map[item.config_item_id].beginner_mode
+        ]
+    
+    total = len(backlog_items)
+    answered = sum(1 for item in backlog_items if item.answered)
+    ready = sum(1 for item in backlog_items if item.status == models.BacklogStatus.READY and not item.answered)
+    blocked = sum(1 for item in backlog_items if item.status == models.BacklogStatus.BLOCKED)
+    done = sum(1 for item in backlog_items if item.status == models.BacklogStatus.DONE)
+    
+    return {
+        'total': total,
+        'answered': answered,
+        'ready': ready,
+        'blocked': blocked,
+        'done': done,
+        'progress_percentage': round((answered / total * 100) if total > 0 else 0, 1)
+    }
+
+
+def snapshot_backlog(db: Session, project_id: int) -> Optional[Dict[str, str]]:
+    """
+    差分イベント用にバックログのステータスを記録（書き込み前に呼ぶ）
+    
+    Returns:
+        設定項目ID → ステータス。購読者がいない場合はNone（イベントを発行しない）
+    """
+    if not get_event_bus().has_listeners(project_id):
+        return None
+    db.expire_all()
+    return {
+        item.config_item_id: item.status.value
+        for item in crud.get_backlog_items(db, project_id)
+    }
+
+
+def publish_backlog_changes(db: Session, project: models.Project, before: Optional[Dict[str, str]], revision: int):
+    """
+    書き込み前後のバックログを比較して backlog イベントを発行
+    
+    Args:
+        db: データベースセッション
+        project: プロジェクト
+        before: snapshot_backlog() の結果（Noneの場合は何もしない）
+        revision: 書き込み後のプロジェクトリビジョン
+    """
+    if before is None:
+        return
+    
+    db.expire_all()
+    changed: List[Dict[str, str]] = []
+    added: List[Dict[str, str]] = []
+    current = set()
+    for item in crud.get_backlog_items(db, project.id):
+        current.add(item.config_item_id)
+        entry = {'config_item_id': item.config_item_id, 'status': item.status.value}
+        if item.config_item_id not in before:
+            added.append(entry)
+        elif before[item.config_item_id] != item.status.value:
+            changed.append(entry)
+    
+    removed = sorted(set(before) - current)
+    
+    publish_event(project.id, {
+        'type': 'backlog',
+        'revision': revision,
+        'changed': changed,
+        'added': added,
+        'removed': removed,
+        'progress': compute_progress(db, project)
+    })
+
+
+def publish_artifacts_ready(project_id: int, artifacts: List[models.Artifact]):
+    """成果物の生成完了を通知する artifacts イベントを発行"""
+    if not artifacts or not get_event_bus().has_listeners(project_id):
+        return
+    publish_event(project_id, {
+        'type': 'artifacts',
+        'artifacts': [
+            {'id': artifact.id, 'artifact_type': artifact.artifact_type.value, 'tbd_count': artifact.tbd_count}
+            for artifact in artifacts
+        ]
+    })
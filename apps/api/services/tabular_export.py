@@ -0,0 +1,226 @@
+"""
+設定ワークブックの表形式エクスポート（CSV / Parquet）
+
+データウェアハウスへの取り込み向けに、設定項目（バックログの状態つき）・決定事項・回答の
+表を1表ずつ出力する。XLSX と違い書式やサマリーは持たず、全プロジェクト分を1回で出力できる。
+
+行は DB のカーソルから EXPORT_BATCH_SIZE 行ずつ読み（yield_per）、バッチごとに
+CSV の行・Parquet の行グループとして書き出してすぐに送るため、全行をメモリに載せない。
+Parquet は pyarrow パッケージが必要（無い場合は parquet_available() が False）。
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import csv
+import enum
+import io
+import json
+
+from sqlalchemy.orm import Session
+
+import crud
+from config import get_settings
+
+# 読み取り専用セッションを作る関数（database.get_read_session_factory）
+SessionFactory = Callable[[], Session]
+
+
+CSV = "csv"
+PARQUET = "parquet"
+MEDIA_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatUnavailable(Exception):
+    """エクスポート形式に必要なパッケージが無い"""
+
+
+class ExportTable(str, enum.Enum):
+    """エクスポートする表"""
+    CONFIG_ITEMS = "config_items"
+    DECISIONS = "decisions"
+    ANSWERS = "answers"
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _joined(value: Any) -> Optional[str]:
+    return ", ".join(str(v) for v in value) if value else None
+
+
+def _json(value: Any) -> Optional[str]:
+    # 回答値は文字列・数値・リストが混在するため JSON 文字列で出力する
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+# 表ごとの列: (列名, pyarrow の型名, 値の変換)
+_STRING, _INT, _BOOL, _TIMESTAMP = "string", "int64", "bool", "timestamp"
+_COLUMNS: Dict[ExportTable, List[tuple]] = {
+    ExportTable.CONFIG_ITEMS: [
+        ("project_id", _INT, None),
+        ("config_item_id", _STRING, None),
+        ("module", _STRING, None),
+        ("title", _STRING, None),
+        ("priority", _STRING, None),
+        ("status", _STRING, _enum_value),
+        ("answered", _BOOL, None),
+        ("depends_on", _STRING, _joined),
+        ("updated_at", _TIMESTAMP, None),
+    ],
+    ExportTable.DECISIONS: [
+        ("project_id", _INT, None),
+        ("config_item_id", _STRING, None),
+        ("title", _STRING, None),
+        ("rationale", _STRING, None),
+        ("impact", _STRING, None),
+        ("status", _STRING, None),
+        ("created_at", _TIMESTAMP, None),
+        ("updated_at", _TIMESTAMP, None),
+    ],
+    ExportTable.ANSWERS: [
+        ("project_id", _INT, None),
+        ("config_item_id", _STRING, None),
+        ("input_name", _STRING, None),
+        ("value", _STRING, _json),
+        ("created_at", _TIMESTAMP, None),
+    ],
+}
+
+
+def column_names(table: ExportTable) -> List[str]:
+    return [name for name, _, _ in _COLUMNS[table]]
+
+
+def iter_batches(
+    table: ExportTable,
+    session_factory: SessionFactory,
+    project_id: Optional[int] = None
+) -> Iterator[List[Sequence[Any]]]:
+    """
+    表の行を EXPORT_BATCH_SIZE 行ずつ出力（列の値は変換済み）
+    
+    ストリーミング中に使うセッションを session_factory で作り、出力し終えたら閉じる
+    （リクエストのセッションはレスポンスの送信前に閉じられるため）。
+    """
+    converters: List[Optional[Callable]] = [convert for _, _, convert in _COLUMNS[table]]
+    db = session_factory()
+    try:
+        result = db.execute(
+            crud.export_query(table.value, project_id).execution_options(yield_per=get_settings().export_batch_size)
+        )
+        for partition in result.partitions():
+            yield [
+                [convert(value) if convert else value for convert, value in zip(converters, row)]
+                for row in partition
+            ]
+    finally:
+        db.close()
+
+
+def iter_csv(
+    table: ExportTable,
+    session_factory: SessionFactory,
+    project_id: Optional[int] = None
+) -> Iterator[bytes]:
+    """表を CSV（UTF-8、ヘッダ行つき）でバッチごとに出力"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(column_names(table))
+    for batch in iter_batches(table, session_factory, project_id):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _pyarrow():
+    """pyarrow モジュール（未インストールの場合は ImportError）"""
+    import pyarrow
+    import pyarrow.parquet
+    return pyarrow
+
+
+def parquet_available() -> bool:
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter の出力先（書かれたバイト列をバッチごとに取り出す）"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(
+    table: ExportTable,
+    session_factory: SessionFactory,
+    project_id: Optional[int] = None
+) -> Iterator[bytes]:
+    """表を Parquet（バッチごとに1行グループ、zstd 圧縮）で出力"""
+    pa = _pyarrow()
+    types = {_STRING: pa.string(), _INT: pa.int64(), _BOOL: pa.bool_(), _TIMESTAMP: pa.timestamp("us")}
+    schema = pa.schema([(name, types[type_name]) for name, type_name, _ in _COLUMNS[table]])
+    
+    sink = _ChunkSink()
+    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in iter_batches(table, session_factory, project_id):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_stream(
+    table: ExportTable,
+    export_format: str,
+    session_factory: SessionFactory,
+    project_id: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    表を指定の形式で出力するイテレータ
+    
+    Raises:
+        ExportFormatUnavailable: Parquet で pyarrow が無い場合（出力を始める前に判定する）
+    """
+    if export_format == PARQUET:
+        if not parquet_available():
+            raise ExportFormatUnavailable("Parquet export requires pyarrow")
+        return iter_parquet(table, session_factory, project_id)
+    return iter_csv(table, session_factory, project_id)
@@ -21,7 +21,7 @@ os.environ["CATALOG_PATH"] = os.path.join(
 
 from database import Base
 from main import app
-from database import get_db
+from database import get_db, get_read_db, get_read_session_factory
 
 
 # テスト用SQLiteエンジン
@@ -43,6 +43,8 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
 
 
 @pytest.fixture(scope="function")
@@ -57,6 +57,21 @@ class TestArtifactGeneration:
         assert len(data) == 1
         assert data[0]["artifact_type"] == "DECISION_LOG"
 
+    def test_parallel_rendering(self, client, monkeypatch):
+        """スレッドプールで並列にレンダリングしても同じ順・同じ内容で保存されること"""
+        from config import get_settings
+        project_id = self._create_project_with_answers(client)
+        sequential = client.post(f"/api/projects/{project_id}/artifacts/generate", json={}).json()
+
+        monkeypatch.setattr(get_settings(), "artifact_render_workers", 4)
+        parallel = client.post(f"/api/projects/{project_id}/artifacts/generate", json={}).json()
+
+        assert [a["artifact_type"] for a in parallel] == [a["artifact_type"] for a in sequential]
+        assert [a["tbd_count"] for a in parallel] == [a["tbd_count"] for a in sequential]
+        # 1回の保存で作られた成果物は同じ作成日時を持つ
+        assert len({a["created_at"] for a in parallel}) == 1
+        assert all(a["id"] > max(b["id"] for b in sequential) for a in parallel)
+
     def test_artifact_contains_tbd(self, client):
         """未回答項目がTBDとして出力されること"""
         project_id = self._create_project_with_answers(client)
@@ -70,6 +85,21 @@ class TestArtifactGeneration:
         assert data[0]["tbd_count"] > 0
         assert "TBD" in data[0]["content"]
 
+    def test_tbd_count_from_backlog_state(self, client):
+        """TBD数は出力した未回答の項目数で、本文中の文字列を数えないこと"""
+        project_id = self._create_project_with_answers(client)
+        backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+        unanswered = sum(1 for item in backlog if not item["answered"])
+
+        response = client.post(f"/api/projects/{project_id}/artifacts/generate", json={})
+        artifacts = {a["artifact_type"]: a for a in response.json()}
+
+        # 「TBD（未決定）」は1項目につき1件
+        workbook = artifacts["CONFIG_WORKBOOK"]
+        assert workbook["tbd_count"] == workbook["content"].count("**TBD（未決定）**") == unanswered
+        assert artifacts["TEST_VIEW"]["tbd_count"] == unanswered
+        assert artifacts["DECISION_LOG"]["tbd_count"] == 0
+
     def test_decision_log_content(self, client):
         """Decision Logに決定内容が含まれること"""
         project_id = self._create_project_with_answers(client)
@@ -97,6 +127,24 @@ class TestArtifactGeneration:
         assert "会計年度" in content
         assert "テストケース総数" in content
 
+    def test_perspectives_and_migration_object_from_catalog(self, client, db_session):
+        """テスト観点と移行オブジェクト名がカタログの値で出力されること"""
+        import models
+
+        project_id = self._create_project_with_answers(client)
+        item = db_session.get(models.ConfigItem, "FI-CORE-001")
+        assert item.migration_object == "会計年度設定"
+
+        response = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["TEST_VIEW", "MIGRATION_VIEW"]}
+        )
+        contents = {artifact["artifact_type"]: artifact["content"] for artifact in response.json()}
+        assert all(perspective in contents["TEST_VIEW"] for perspective in item.test_perspectives)
+        assert "| 会計年度バリアント | 会計年度設定 |" in contents["MIGRATION_VIEW"]
+        # 移行オブジェクト名の無い項目はタイトルのまま
+        assert "| 伝票タイプと採番ルール | 伝票タイプと採番ルール |" in contents["MIGRATION_VIEW"]
+
     def test_list_artifacts(self, client):
         """成果物一覧を取得できること"""
         project_id = self._create_project_with_answers(client)
@@ -157,3 +205,589 @@ class TestArtifactGeneration:
         assert "spreadsheetml" in response.headers["content-type"]
         # XLSXファイルはPKZIPのマジックバイトで始まる
         assert response.content[:2] == b'PK'
+
+    def test_test_view_summary_precedes_items(self, client):
+        """Test Viewのサマリーが観点一覧より前に出力されること"""
+        project_id = self._create_project_with_answers(client)
+
+        response = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["TEST_VIEW"]}
+        )
+        content = response.json()[0]["content"]
+        assert content.index("## サマリー") < content.index("## テスト観点一覧")
+        assert "1. **fiscal_year_variant** の設定値 `K4` が正しく反映されているか確認" in content
+
+    def test_rows_keep_backlog_order_after_answer(self, client):
+        """回答しても成果物の行はバックログの追加順のまま並ぶこと"""
+        import re
+        project_id = self._create_project_with_answers(client)
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-002", "answers": {"company_code": "1000"}}
+        )
+        backlog = sorted(client.get(f"/api/projects/{project_id}/backlog").json(), key=lambda item: item["id"])
+        expected = [item["config_item_id"] for item in backlog]
+
+        response = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["CONFIG_WORKBOOK", "TEST_VIEW", "MIGRATION_VIEW"]}
+        )
+        for artifact in response.json():
+            seen = list(dict.fromkeys(re.findall(r"FI-[A-Z]+-\d{3}", artifact["content"])))
+            assert seen == [item_id for item_id in expected if item_id in seen], artifact["artifact_type"]
+
+
+class TestArtifactTemplates:
+    """成果物テンプレートのテスト"""
+
+    @pytest.fixture
+    def template_dir(self, tmp_path, monkeypatch):
+        """追加テンプレートディレクトリを設定（テスト後に環境を作り直す）"""
+        from config import get_settings
+        from services.artifact_templates import get_template_environment
+        monkeypatch.setattr(get_settings(), "artifact_template_dir", str(tmp_path))
+        get_template_environment.cache_clear()
+        yield tmp_path
+        get_template_environment.cache_clear()
+
+    def _create_project(self, client):
+        response = client.post("/api/projects/", json={"name": "テンプレートテスト", "mode": "EXPERT"})
+        return response.json()["id"]
+
+    def test_list_builtin_templates(self, client):
+        """組み込みテンプレートが一覧に含まれること"""
+        project_id = self._create_project(client)
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/templates")
+        assert response.status_code == 200
+        assert {"decision_log", "config_workbook", "test_view", "migration_view"} <= set(response.json())
+
+    def test_render_custom_template(self, client, template_dir):
+        """追加ディレクトリに置いたテンプレートをコード変更なしでレンダリングできること"""
+        (template_dir / "item_list.md.j2").write_text(
+            "# {{ project.name }}\n{% for item in items %}\n- {{ item.id }} {{ item.status }}\n{% endfor %}\n",
+            encoding="utf-8"
+        )
+        project_id = self._create_project(client)
+
+        assert "item_list" in client.get(f"/api/projects/{project_id}/artifacts/templates").json()
+        response = client.get(f"/api/projects/{project_id}/artifacts/render/item_list")
+        assert response.status_code == 200
+        assert "text/markdown" in response.headers["content-type"]
+        assert response.text.startswith("# テンプレートテスト\n")
+        assert "- FI-CORE-001 " in response.text
+
+    def test_custom_template_overrides_builtin(self, client, template_dir):
+        """同名のテンプレートが組み込みより優先されること"""
+        (template_dir / "decision_log.md.j2").write_text("決定 {{ decisions | length }} 件", encoding="utf-8")
+        project_id = self._create_project(client)
+
+        response = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["DECISION_LOG"]}
+        )
+        assert response.json()[0]["content"] == "決定 0 件"
+
+    def test_render_unknown_template(self, client):
+        """存在しない・不正な名前のテンプレートは404"""
+        project_id = self._create_project(client)
+
+        assert client.get(f"/api/projects/{project_id}/artifacts/render/missing").status_code == 404
+        assert client.get(f"/api/projects/{project_id}/artifacts/render/..%2Fsecret").status_code == 404
+
+
+class TestArtifactFragments:
+    """項目単位のフラグメントキャッシュのテスト"""
+
+    def _answer(self, client, project_id, value):
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": value}}
+        )
+
+    def test_unchanged_rows_are_reused(self, client, db_session):
+        """回答が変わった項目の行だけが作り直され、他の行はレンダリング済みのまま再利用されること"""
+        from services.artifact_generator import ArtifactGenerator
+
+        project_id = client.post("/api/projects/", json={"name": "フラグメント", "mode": "EXPERT"}).json()["id"]
+        self._answer(client, project_id, "K4")
+        first = ArtifactGenerator(db_session, project_id)
+        first.generate_all()
+        before = {row.id: row for row in first._build_context()["items"]}
+
+        self._answer(client, project_id, "V3")
+        db_session.expire_all()
+        second = ArtifactGenerator(db_session, project_id)
+        artifacts = second.generate_all()
+        after = {row.id: row for row in second._build_context()["items"]}
+
+        assert after["FI-CORE-001"] is not before["FI-CORE-001"]
+        unchanged = [item_id for item_id in after if item_id != "FI-CORE-001"]
+        assert unchanged and all(after[item_id] is before[item_id] for item_id in unchanged)
+        # 再利用した行はテンプレートごとのフラグメントを持っている
+        assert all(len(after[item_id].fragments) >= 3 for item_id in unchanged)
+
+        from models import ArtifactType
+        workbook = artifacts[ArtifactType.CONFIG_WORKBOOK][0]
+        assert "fiscal_year_variant=V3" in workbook
+        assert "fiscal_year_variant=K4" not in workbook
+
+    def test_cached_output_matches_uncached(self, client, db_session):
+        """キャッシュを使った出力がキャッシュなしの出力と一致すること"""
+        from services.artifact_generator import ArtifactGenerator
+        from services.artifact_fragments import get_fragment_cache
+
+        project_id = client.post("/api/projects/", json={"name": "フラグメント", "mode": "EXPERT"}).json()["id"]
+        self._answer(client, project_id, "K4")
+
+        get_fragment_cache().clear()
+        uncached = ArtifactGenerator(db_session, project_id).generate_all()
+        cached = ArtifactGenerator(db_session, project_id).generate_all()
+        for artifact_type, (content, tbd_count) in uncached.items():
+            # 生成日時の行を除いて比較
+            strip = lambda text: [line for line in text.splitlines() if "生成日時" not in line]
+            assert strip(cached[artifact_type][0]) == strip(content)
+            assert cached[artifact_type][1] == tbd_count
+
+
+class TestArtifactStorage:
+    """成果物本文の圧縮・重複排除保存のテスト"""
+
+    def _create_project(self, client):
+        response = client.post("/api/projects/", json={"name": "保存テスト", "mode": "EXPERT"})
+        return response.json()["id"]
+
+    def test_identical_content_is_stored_once(self, client, db_session):
+        """同じ内容の本文は1件だけ圧縮して保存され、各版から参照されること"""
+        import crud
+        import models
+        project_id = self._create_project(client)
+        content = "# 決定ログ\n\n" + "同じ内容の行\n" * 200
+
+        first = crud.create_artifact(db_session, project_id, models.ArtifactType.DECISION_LOG, content)
+        second = crud.create_artifact(db_session, project_id, models.ArtifactType.DECISION_LOG, content)
+
+        assert first.id != second.id
+        assert first.content_hash == second.content_hash
+        blobs = db_session.query(models.ArtifactBlob).all()
+        assert len(blobs) == 1
+        assert blobs[0].encoding == "gzip"
+        assert len(blobs[0].data) < blobs[0].size
+        assert second.content == content
+
+    def test_failed_insert_rolls_back(self, client, db_session, monkeypatch):
+        """保存中にエラーが起きた場合はロールバックされ、セッションを使い続けられること"""
+        import crud
+        import models
+        project_id = self._create_project(client)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("prune failed")
+
+        monkeypatch.setattr(crud, "prune_artifacts", fail)
+        with pytest.raises(RuntimeError):
+            crud.create_artifact(db_session, project_id, models.ArtifactType.DECISION_LOG, "# 決定ログ\n")
+
+        assert db_session.query(models.Artifact).count() == 0
+        assert db_session.query(models.ArtifactBlob).count() == 0
+
+    def test_retention_keeps_latest_versions(self, client, db_session):
+        """種類ごとに新しい版だけが残り、参照されなくなった本文も削除されること"""
+        import crud
+        import models
+        project_id = self._create_project(client)
+
+        for version in range(4):
+            crud.create_artifacts(db_session, project_id, [
+                (models.ArtifactType.DECISION_LOG, f"決定ログ v{version}", 0, None),
+                (models.ArtifactType.TEST_VIEW, "テスト観点", 0, None),
+            ], keep_versions=2)
+
+        remaining = crud.get_artifacts(db_session, project_id)
+        decision_logs = [a.content for a in remaining if a.artifact_type == models.ArtifactType.DECISION_LOG]
+        assert decision_logs == ["決定ログ v3", "決定ログ v2"]
+        assert len([a for a in remaining if a.artifact_type == models.ArtifactType.TEST_VIEW]) == 2
+        assert db_session.query(models.ArtifactBlob).count() == 3
+
+    def test_download_passes_gzip_through(self, client):
+        """gzip を受け付けるクライアントには圧縮済みの本文をそのまま返すこと"""
+        project_id = self._create_project(client)
+        generated = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["TEST_VIEW"]}
+        ).json()[0]["content"]
+        url = f"/api/projects/{project_id}/artifacts/TEST_VIEW/download"
+
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == generated
+
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.text == generated
+
+    def test_accepts_gzip(self):
+        """Accept-Encoding の解釈"""
+        from services.artifact_storage import accepts_gzip
+        assert accepts_gzip("gzip, deflate, br")
+        assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+        assert accepts_gzip("*")
+        assert not accepts_gzip("gzip;q=0")
+        assert not accepts_gzip("identity")
+        assert not accepts_gzip(None)
+
+
+class TestArtifactDiff:
+    """成果物の版間の差分のテスト"""
+
+    def _generate(self, client, project_id, artifact_type):
+        response = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": [artifact_type]}
+        )
+        return response.json()[0]["id"]
+
+    def test_diff_between_generations(self, client):
+        """回答で変わった行だけが差分に含まれ、変更行の unified diff が返ること"""
+        project_id = client.post("/api/projects/", json={"name": "差分", "mode": "EXPERT"}).json()["id"]
+        first = self._generate(client, project_id, "CONFIG_WORKBOOK")
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+        second = self._generate(client, project_id, "CONFIG_WORKBOOK")
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/diff")
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["from_id"], data["to_id"]) == (first, second)
+        assert data["unchanged"] > 0
+
+        changes = {item["key"]: item for item in data["items"]}
+        assert changes["FI-CORE-001"]["change"] == "changed"
+        assert "**TBD（未決定）**" in changes["FI-CORE-001"]["before"]
+        assert any(line.startswith("+") and "fiscal_year_variant=K4" in line
+                   for line in changes["FI-CORE-001"]["diff"])
+
+        # 逆向きに指定すると同じ行が逆の差分になる
+        reverse = client.get(
+            f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/diff",
+            params={"from": second, "to": first}
+        ).json()
+        assert {item["key"] for item in reverse["items"]} == set(changes)
+
+    def test_decision_added(self, client):
+        """新しい決定事項は added として返ること"""
+        project_id = client.post("/api/projects/", json={"name": "差分", "mode": "EXPERT"}).json()["id"]
+        self._generate(client, project_id, "DECISION_LOG")
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+        self._generate(client, project_id, "DECISION_LOG")
+
+        data = client.get(f"/api/projects/{project_id}/artifacts/DECISION_LOG/diff").json()
+        assert [(item["key"], item["change"]) for item in data["items"]] == [("FI-CORE-001", "added")]
+        assert data["unchanged"] == 0
+
+    def test_diff_is_cached_per_version_pair(self, client):
+        """同じ版の組の差分はキャッシュから返ること"""
+        from services.artifact_diff import get_diff_cache
+
+        project_id = client.post("/api/projects/", json={"name": "差分", "mode": "EXPERT"}).json()["id"]
+        first = self._generate(client, project_id, "TEST_VIEW")
+        second = self._generate(client, project_id, "TEST_VIEW")
+        url = f"/api/projects/{project_id}/artifacts/TEST_VIEW/diff"
+
+        assert client.get(url).json()["items"] == []
+        hits = get_diff_cache().hits
+        assert client.get(url, params={"from": first, "to": second}).status_code == 200
+        assert get_diff_cache().hits == hits + 1
+
+    def test_diff_missing_version(self, client):
+        """比較する版が無い・種類が違う場合は404"""
+        project_id = client.post("/api/projects/", json={"name": "差分", "mode": "EXPERT"}).json()["id"]
+        workbook = self._generate(client, project_id, "CONFIG_WORKBOOK")
+        test_view = self._generate(client, project_id, "TEST_VIEW")
+
+        url = f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/diff"
+        assert client.get(url).status_code == 404  # 1つ前の版が無い
+        assert client.get(url, params={"from": test_view, "to": workbook}).status_code == 404
+
+
+class TestArtifactListing:
+    """成果物一覧（本文なし）と本文の取得のテスト"""
+
+    def _create_project(self, client):
+        response = client.post("/api/projects/", json={"name": "一覧テスト", "mode": "EXPERT"})
+        return response.json()["id"]
+
+    def test_list_returns_metadata_only(self, client):
+        """一覧は本文を含まず、サイズとハッシュを返すこと"""
+        import hashlib
+        project_id = self._create_project(client)
+        generated = client.post(f"/api/projects/{project_id}/artifacts/generate", json={}).json()
+        contents = {a["id"]: a["content"] for a in generated}
+
+        data = client.get(f"/api/projects/{project_id}/artifacts").json()
+        assert len(data) == 4
+        for summary in data:
+            assert "content" not in summary
+            content = contents[summary["id"]].encode("utf-8")
+            assert summary["size"] == len(content)
+            assert summary["content_hash"] == hashlib.sha256(content).hexdigest()
+
+    def test_keyset_pagination(self, client):
+        """before カーソルで新しい順に重複・抜けなくページングできること"""
+        project_id = self._create_project(client)
+        for _ in range(3):
+            client.post(f"/api/projects/{project_id}/artifacts/generate", json={})
+        url = f"/api/projects/{project_id}/artifacts"
+
+        pages = []
+        params = {"limit": 5}
+        while True:
+            response = client.get(url, params=params)
+            pages.append([a["id"] for a in response.json()])
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+            params = {"limit": 5, "before": cursor}
+
+        assert [len(page) for page in pages] == [5, 5, 2]
+        ids = [artifact_id for page in pages for artifact_id in page]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 12
+
+        workbooks = client.get(url, params={"artifact_type": "CONFIG_WORKBOOK"}).json()
+        assert [a["artifact_type"] for a in workbooks] == ["CONFIG_WORKBOOK"] * 3
+
+    def test_get_by_id(self, client):
+        """版をIDで取得でき、種類が違う場合は404"""
+        project_id = self._create_project(client)
+        generated = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["TEST_VIEW"]}
+        ).json()[0]
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/TEST_VIEW/{generated['id']}")
+        assert response.status_code == 200
+        assert response.json()["content"] == generated["content"]
+        assert client.get(f"/api/projects/{project_id}/artifacts/DECISION_LOG/{generated['id']}").status_code == 404
+
+    def test_range_requests(self, client):
+        """Range で展開後の本文の一部を取得できること"""
+        project_id = self._create_project(client)
+        generated = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": ["CONFIG_WORKBOOK"]}
+        ).json()[0]
+        content = generated["content"].encode("utf-8")
+        url = f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/{generated['id']}/download"
+
+        response = client.get(url, headers={"Range": "bytes=0-99"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 0-99/{len(content)}"
+        assert response.content == content[:100]
+
+        response = client.get(url, headers={"Range": "bytes=-50"})
+        assert response.status_code == 206
+        assert response.content == content[-50:]
+
+        response = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+        # If-Range が一致しない場合は全体を返す
+        response = client.get(url, headers={"Range": "bytes=0-99", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["accept-ranges"] == "bytes"
+
+
+class TestArtifactPdf:
+    """成果物のPDF出力のテスト"""
+
+    def _generate(self, client, artifact_type="CONFIG_WORKBOOK"):
+        project_id = client.post("/api/projects/", json={"name": "PDF", "mode": "EXPERT"}).json()["id"]
+        generated = client.post(
+            f"/api/projects/{project_id}/artifacts/generate",
+            json={"artifact_types": [artifact_type]}
+        ).json()[0]
+        return project_id, generated
+
+    def _page_streams(self, pdf):
+        import re
+        import zlib
+        return [zlib.decompress(stream) for stream in re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)]
+
+    def test_markdown_to_pdf_structure(self):
+        """相互参照表の位置が正しく、本文がページに割り付けられること"""
+        import re
+        from services.artifact_pdf import markdown_to_pdf
+
+        markdown = "# テスト観点\n\n" + "\n".join(f"- 観点 {i} の動作確認" for i in range(200))
+        pdf = markdown_to_pdf(markdown)
+        assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+
+        xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[xref:])
+        assert all(pdf[int(offset):].startswith(f"{number} 0 obj".encode()) for number, offset in enumerate(offsets, 1))
+
+        streams = self._page_streams(pdf)
+        assert int(re.search(rb"/Count (\d+)", pdf).group(1)) == len(streams) > 1
+        text = b"".join(streams)
+        assert "テスト観点".encode("utf-16-be").hex().upper().encode() in text
+        assert "・観点 199 の動作確認".encode("utf-16-be").hex().upper().encode() in text
+        # 同じ本文からは同じPDF
+        assert markdown_to_pdf(markdown) == pdf
+
+    def test_download_pdf(self, client):
+        """最新版・版指定でPDFをダウンロードでき、2回目はキャッシュから返すこと"""
+        from services.artifact_pdf import get_pdf_cache
+
+        project_id, generated = self._generate(client)
+        get_pdf_cache().clear()
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/pdf")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["content-disposition"] == "attachment; filename=config_workbook.pdf"
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert response.content.startswith(b"%PDF-")
+        assert "Config Workbook".encode("utf-16-be").hex().upper().encode() in b"".join(
+            self._page_streams(response.content)
+        )
+
+        version = client.get(f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/{generated['id']}/pdf")
+        assert version.content == response.content
+        assert get_pdf_cache().hits == 1
+
+        etag = response.headers["etag"]
+        assert client.get(
+            f"/api/projects/{project_id}/artifacts/CONFIG_WORKBOOK/pdf", headers={"If-None-Match": etag}
+        ).status_code == 304
+
+    def test_pdf_not_found(self, client):
+        """成果物が無い場合は404"""
+        project_id = client.post("/api/projects/", json={"name": "PDF", "mode": "EXPERT"}).json()["id"]
+        assert client.get(f"/api/projects/{project_id}/artifacts/TEST_VIEW/pdf").status_code == 404
+        assert client.get(f"/api/projects/{project_id}/artifacts/TEST_VIEW/999/pdf").status_code == 404
+
+    def test_pdf_busy(self, client, monkeypatch):
+        """レンダリング待ちが上限に達している場合は503"""
+        from config import get_settings
+        from services.artifact_pdf import get_pdf_cache
+
+        project_id, _ = self._generate(client, "TEST_VIEW")
+        get_pdf_cache().clear()
+        monkeypatch.setattr(get_settings(), "artifact_pdf_max_pending", 0)
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/TEST_VIEW/pdf")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+
+class TestTabularExport:
+    """CSV / Parquet エクスポートのテスト"""
+
+    def _create_project(self, client):
+        project_id = client.post("/api/projects/", json={"name": "エクスポート", "mode": "EXPERT"}).json()["id"]
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+        return project_id
+
+    def _read_csv(self, response):
+        import csv
+        import io
+        return list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+
+    def test_export_csv(self, client):
+        """設定項目・決定事項・回答の表をCSVで出力できること"""
+        project_id = self._create_project(client)
+        backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/export/csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert f"imgquest_config_items_{project_id}.csv" in response.headers["content-disposition"]
+        rows = self._read_csv(response)
+        assert len(rows) == len(backlog)
+        row = next(row for row in rows if row["config_item_id"] == "FI-CORE-001")
+        assert row["project_id"] == str(project_id)
+        assert row["answered"] == "True"
+        assert row["status"] == "DONE"
+
+        decisions = self._read_csv(client.get(f"/api/projects/{project_id}/artifacts/export/csv?table=decisions"))
+        assert [row["config_item_id"] for row in decisions] == ["FI-CORE-001"]
+
+        answers = self._read_csv(client.get(f"/api/projects/{project_id}/artifacts/export/csv?table=answers"))
+        assert [(row["input_name"], row["value"]) for row in answers] == [("fiscal_year_variant", '"K4"')]
+
+        assert client.get(f"/api/projects/{project_id}/artifacts/export/csv?table=unknown").status_code == 422
+
+    def test_export_csv_in_batches(self, client, monkeypatch):
+        """少ない行数ずつ読んでも同じ内容になること"""
+        from config import get_settings
+        project_id = self._create_project(client)
+        url = f"/api/projects/{project_id}/artifacts/export/csv"
+        expected = client.get(url).content
+
+        monkeypatch.setattr(get_settings(), "export_batch_size", 2)
+        assert client.get(url).content == expected
+
+    def test_export_parquet(self, client, monkeypatch):
+        """Parquet は行数ごとの行グループで出力されること"""
+        pyarrow = pytest.importorskip("pyarrow")
+        import io
+        import pyarrow.parquet
+        from config import get_settings
+        project_id = self._create_project(client)
+        backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+        monkeypatch.setattr(get_settings(), "export_batch_size", 5)
+
+        response = client.get(f"/api/projects/{project_id}/artifacts/export/parquet")
+        assert response.status_code == 200
+        parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(response.content))
+        assert parquet_file.metadata.num_rows == len(backlog)
+        assert parquet_file.num_row_groups == -(-len(backlog) // 5)
+        table = parquet_file.read()
+        assert table.schema.field("answered").type == pyarrow.bool_()
+        assert "FI-CORE-001" in table.column("config_item_id").to_pylist()
+
+    def test_export_parquet_requires_pyarrow(self, client, monkeypatch):
+        """pyarrow が無い場合は501"""
+        from services import tabular_export
+        project_id = self._create_project(client)
+
+        def missing():
+            raise ImportError("pyarrow")
+
+        monkeypatch.setattr(tabular_export, "_pyarrow", missing)
+        response = client.get(f"/api/projects/{project_id}/artifacts/export/parquet")
+        assert response.status_code == 501
+
+    def test_export_uses_read_session_factory(self, client):
+        """エクスポートは依存関係で渡されたセッションファクトリでDBを読むこと"""
+        from main import app
+        from database import get_read_session_factory
+        from tests.conftest import TestingSessionLocal
+        project_id = self._create_project(client)
+        opened = []
+
+        def factory():
+            opened.append(1)
+            return TestingSessionLocal()
+
+        original = app.dependency_overrides[get_read_session_factory]
+        app.dependency_overrides[get_read_session_factory] = lambda: factory
+        try:
+            response = client.get(f"/api/projects/{project_id}/artifacts/export/csv")
+        finally:
+            app.dependency_overrides[get_read_session_factory] = original
+        assert response.status_code == 200
+        assert opened == [1]
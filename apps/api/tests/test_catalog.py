@@ -0,0 +1,299 @@
+"""
+カタログ読込・再読込のテスト
+"""
+import pytest
+import crud
+from services.catalog_loader import sync_catalog, CatalogWatcher
+from services.catalog_graph import get_catalog_graph
+
+
+def _catalog(title_suffix=""):
+    return [
+        {"id": "CAT-001", "title": f"項目1{title_suffix}", "priority": "P0", "depends_on": []},
+        {"id": "CAT-002", "title": "項目2", "priority": "P0", "depends_on": ["CAT-001"]},
+    ]
+
+
+class TestCatalogSync:
+    """カタログ差分同期のテスト"""
+
+    def test_initial_sync_inserts_all(self, db_session):
+        """初回同期で全項目が追加されバージョン1になること"""
+        result = sync_catalog(db_session, _catalog())
+        assert result["version"] == 1
+        assert sorted(result["inserted"]) == ["CAT-001", "CAT-002"]
+        assert result["updated"] == []
+        assert crud.get_config_item(db_session, "CAT-002").content_hash
+
+    def test_unchanged_sync_keeps_version(self, db_session):
+        """内容が同じならバージョンが上がらず何も書き込まないこと"""
+        sync_catalog(db_session, _catalog())
+        result = sync_catalog(db_session, _catalog())
+        assert result["version"] == 1
+        assert result["inserted"] == []
+        assert result["updated"] == []
+        assert result["unchanged"] == 2
+
+    def test_changed_item_only_is_updated(self, db_session):
+        """変更された項目のみ更新されバージョンが上がること"""
+        sync_catalog(db_session, _catalog())
+        result = sync_catalog(db_session, _catalog(title_suffix="（改）"))
+        assert result["version"] == 2
+        assert result["updated"] == ["CAT-001"]
+        db_session.expire_all()
+        assert crud.get_config_item(db_session, "CAT-001").title == "項目1（改）"
+
+    def test_removed_items_are_reported(self, db_session):
+        """カタログから消えた項目は削除せず報告のみ行うこと"""
+        sync_catalog(db_session, _catalog())
+        result = sync_catalog(db_session, _catalog()[:1])
+        assert result["removed"] == ["CAT-002"]
+        assert crud.get_config_item(db_session, "CAT-002") is not None
+
+    def test_sync_invalidates_graph_cache(self, db_session):
+        """カタログ更新後に依存関係グラフが再構築されること"""
+        sync_catalog(db_session, _catalog())
+        graph = get_catalog_graph(db_session)
+        assert graph.dependents["CAT-001"] == ["CAT-002"]
+
+        changed = _catalog()
+        changed.append({"id": "CAT-003", "title": "項目3", "depends_on": ["CAT-001"]})
+        sync_catalog(db_session, changed)
+        graph = get_catalog_graph(db_session)
+        assert sorted(graph.dependents["CAT-001"]) == ["CAT-002", "CAT-003"]
+
+
+class TestCatalogWatcher:
+    """カタログファイル監視のテスト"""
+
+    def test_check_detects_file_change(self, db_session, tmp_path, monkeypatch):
+        """ファイル更新を検知して再読込すること"""
+        import os
+        import services.catalog_loader as catalog_loader
+
+        catalog_file = tmp_path / "catalog.yml"
+        catalog_file.write_text("- id: CAT-001\n  title: 項目1\n", encoding="utf-8")
+        watcher = CatalogWatcher(str(catalog_file))
+        assert watcher.check() is None
+
+        reloaded = []
+        monkeypatch.setattr(catalog_loader, "reload_catalog", lambda path: reloaded.append(path) or {})
+        catalog_file.write_text("- id: CAT-001\n  title: 項目1（改）\n", encoding="utf-8")
+        os.utime(catalog_file, (0, os.stat(catalog_file).st_mtime + 10))
+        watcher.check()
+        assert reloaded == [str(catalog_file)]
+
+
+class TestCatalogAPI:
+    """カタログ管理APIのテスト"""
+
+    def test_reload_endpoint(self, client):
+        """再読込エンドポイントが差分なしで成功すること"""
+        response = client.post("/api/catalog/reload")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["inserted"] == []
+        assert data["updated"] == []
+
+        version = client.get("/api/catalog/version").json()
+        assert version["version"] == data["version"]
+
+
+class TestCatalogSnapshot:
+    """カタログスナップショットのテスト"""
+
+    def _write_catalog(self, tmp_path, title="項目1"):
+        catalog_file = tmp_path / "catalog.yml"
+        catalog_file.write_text(
+            f"- id: CAT-001\n  title: {title}\n  depends_on: []\n"
+            "- id: CAT-002\n  title: 項目2\n  depends_on: [CAT-001]\n",
+            encoding="utf-8"
+        )
+        return str(catalog_file)
+
+    def test_compile_and_load_snapshot(self, tmp_path):
+        """コンパイルしたスナップショットから正規化済み項目を読み込めること"""
+        from services.catalog_snapshot import compile_catalog, load_snapshot
+        catalog_path = self._write_catalog(tmp_path)
+        snapshot_path = str(tmp_path / "catalog.snapshot.json")
+
+        compile_catalog(catalog_path, snapshot_path)
+        items = load_snapshot(catalog_path, snapshot_path)
+
+        assert [item["id"] for item in items] == ["CAT-001", "CAT-002"]
+        assert items[1]["depends_on"] == ["CAT-001"]
+        assert items[0]["priority"] == "P1"  # 正規化済み
+        assert items[0]["content_hash"]
+
+    def test_stale_snapshot_is_ignored(self, tmp_path):
+        """YAMLが更新されたらスナップショットは使われないこと"""
+        from services.catalog_snapshot import compile_catalog, load_snapshot
+        catalog_path = self._write_catalog(tmp_path)
+        snapshot_path = str(tmp_path / "catalog.snapshot.json")
+        compile_catalog(catalog_path, snapshot_path)
+
+        self._write_catalog(tmp_path, title="項目1（改）")
+        assert load_snapshot(catalog_path, snapshot_path) is None
+
+    def test_duplicate_ids_are_rejected(self, tmp_path):
+        """重複IDを含むカタログはコンパイルできないこと"""
+        from services.catalog_snapshot import compile_catalog, CatalogSnapshotError
+        catalog_file = tmp_path / "catalog.yml"
+        catalog_file.write_text("- id: CAT-001\n  title: a\n- id: CAT-001\n  title: b\n", encoding="utf-8")
+
+        with pytest.raises(CatalogSnapshotError):
+            compile_catalog(str(catalog_file), str(tmp_path / "out.json"))
+
+
+class TestMultiCatalog:
+    """複数カタログ（モジュール別）のテスト"""
+
+    def _write_catalogs(self, tmp_path):
+        catalog_dir = tmp_path / "catalogue"
+        catalog_dir.mkdir()
+        (catalog_dir / "fi_core.yml").write_text(
+            "- id: FI-CORE-001\n  title: 会計年度\n  priority: P0\n  depends_on: []\n",
+            encoding="utf-8"
+        )
+        (catalog_dir / "co_core.yml").write_text(
+            "- id: CO-CORE-001\n  title: 管理領域\n  priority: P0\n  depends_on: [FI-CORE-001]\n"
+            "- id: CO-CORE-002\n  title: 原価センタ\n  priority: P0\n  depends_on: [CO-CORE-001]\n",
+            encoding="utf-8"
+        )
+        return catalog_dir
+
+    def test_directory_is_merged(self, tmp_path):
+        """ディレクトリ配下の全カタログが結合されモジュールが付与されること"""
+        from services.catalog_loader import load_catalog_items, normalize_config_item
+        catalog_dir = self._write_catalogs(tmp_path)
+
+        items = [normalize_config_item(item) for item in load_catalog_items(str(catalog_dir))]
+
+        modules = {item["id"]: item["module"] for item in items}
+        assert modules == {"FI-CORE-001": "FI", "CO-CORE-001": "CO", "CO-CORE-002": "CO"}
+
+    def test_glob_pattern(self, tmp_path):
+        """グロブパターンで対象カタログを絞り込めること"""
+        from services.catalog_loader import resolve_catalog_files
+        catalog_dir = self._write_catalogs(tmp_path)
+
+        files = resolve_catalog_files(str(catalog_dir / "co_*.yml"))
+        assert [f.rsplit("/", 1)[-1] for f in files] == ["co_core.yml"]
+
+    def test_dangling_reference_is_rejected(self, db_session):
+        """存在しない依存先を含むカタログは反映されないこと"""
+        from services.catalog_loader import CatalogValidationError
+        with pytest.raises(CatalogValidationError) as exc_info:
+            sync_catalog(db_session, [{"id": "CO-001", "title": "x", "depends_on": ["FI-404"]}])
+        assert "FI-404" in exc_info.value.errors[0]
+        assert crud.get_config_items(db_session) == []
+
+    def test_cycle_is_rejected(self, db_session):
+        """循環依存を含むカタログは反映されないこと"""
+        from services.catalog_loader import CatalogValidationError
+        with pytest.raises(CatalogValidationError):
+            sync_catalog(db_session, [
+                {"id": "A-1", "title": "a", "depends_on": ["A-2"]},
+                {"id": "A-2", "title": "b", "depends_on": ["A-1"]},
+            ])
+
+    def test_engine_loads_project_modules_only(self, db_session, tmp_path):
+        """プロジェクトの対象モジュールのみがエンジンに読み込まれること"""
+        import models
+        from schemas import ProjectCreate
+        from services.catalog_loader import load_catalog_items
+        from services.dependency_engine import DependencyEngine
+        sync_catalog(db_session, load_catalog_items(str(self._write_catalogs(tmp_path))))
+
+        project = crud.create_project(db_session, ProjectCreate(name="CO only", modules=["CO"]))
+        crud.create_backlog_item(db_session, project.id, "CO-CORE-001")
+        crud.create_backlog_item(db_session, project.id, "CO-CORE-002")
+
+        engine = DependencyEngine(db_session, project.id)
+        engine.update_backlog_statuses()
+
+        assert set(engine.config_items) == {"CO-CORE-001", "CO-CORE-002"}
+        status_map = {item.config_item_id: item.status for item in engine.backlog_items}
+        # FI-CORE-001は対象外モジュールのため依存として扱わない
+        assert status_map["CO-CORE-001"] == models.BacklogStatus.READY
+        assert status_map["CO-CORE-002"] == models.BacklogStatus.BLOCKED
+
+
+    def test_module_change_updates_backlog(self, client, db_session, tmp_path):
+        """対象モジュールを変更するとバックログ項目が追加・削除され、リビジョンが進むこと"""
+        from services.catalog_loader import load_catalog_items
+        sync_catalog(db_session, load_catalog_items(str(self._write_catalogs(tmp_path))))
+
+        created = client.post("/api/projects/", json={"name": "モジュール変更", "modules": ["CO"]}).json()
+        project_id = created["id"]
+
+        def backlog_modules():
+            backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+            return {item["config_item_id"].split("-")[0] for item in backlog}
+
+        assert backlog_modules() == {"CO"}
+
+        updated = client.put(f"/api/projects/{project_id}", json={"modules": ["FI"]}).json()
+        assert backlog_modules() == {"FI"}
+        assert updated["revision"] > created["revision"] + 1
+
+        client.put(f"/api/projects/{project_id}", json={"modules": None})
+        assert backlog_modules() == {"CO", "FI"}
+
+        before = client.get(f"/api/projects/{project_id}").json()["revision"]
+        client.put(f"/api/projects/{project_id}", json={"name": "名前のみ変更"})
+        assert backlog_modules() == {"CO", "FI"}
+        assert client.get(f"/api/projects/{project_id}").json()["revision"] == before + 1
+
+
+class TestCatalogValidator:
+    """カタログ検証CLIのテスト"""
+
+    def _items(self, raw_items):
+        from services.catalog_loader import normalize_config_item
+        return [normalize_config_item(item) for item in raw_items]
+
+    def test_valid_catalog_statistics(self):
+        """正常なカタログで最長チェーンと次数が算出されること"""
+        from services.catalog_validator import analyze_catalog
+        report = analyze_catalog(self._items([
+            {"id": "A", "title": "a", "depends_on": []},
+            {"id": "B", "title": "b", "depends_on": ["A"]},
+            {"id": "C", "title": "c", "depends_on": ["A", "B"], "beginner_mode": False},
+            {"id": "D", "title": "d", "depends_on": ["C"], "beginner_title": "D"},
+        ]))
+
+        assert report["valid"] is True
+        assert report["critical_path_length"] == 4
+        assert report["longest_chains"][0] == ["A", "B", "C", "D"]
+        assert report["degree"]["max_out"] == 2
+        assert report["degree"]["roots"] == 1
+        assert report["beginner_gaps"]["collapsed_dependencies"] == ["D"]
+        assert "D" not in report["beginner_gaps"]["missing_fields"]["beginner_title"]
+
+    def test_errors_are_reported(self):
+        """重複ID・参照切れ・循環が検出され、下流は到達不能になること"""
+        from services.catalog_validator import analyze_catalog
+        report = analyze_catalog(self._items([
+            {"id": "A", "title": "a", "depends_on": ["MISSING"]},
+            {"id": "B", "title": "b", "depends_on": ["A"]},
+            {"id": "C", "title": "c", "depends_on": ["D"]},
+            {"id": "D", "title": "d", "depends_on": ["C"]},
+            {"id": "E", "title": "e", "depends_on": []},
+            {"id": "E", "title": "e2", "depends_on": []},
+        ]))
+
+        assert report["valid"] is False
+        assert report["duplicates"] == ["E"]
+        assert report["dangling_references"] == [{"item": "A", "missing": "MISSING"}]
+        assert sorted(report["cycles"][0]) == ["C", "D"]
+        assert report["unreachable"] == ["A", "B", "C", "D"]
+
+    def test_cli_exit_code(self, tmp_path, capsys):
+        """エラーがある場合は終了コード1を返すこと"""
+        from services.catalog_validator import main
+        catalog_file = tmp_path / "catalog.yml"
+        catalog_file.write_text("- id: A\n  title: a\n  depends_on: [B]\n", encoding="utf-8")
+
+        assert main([str(catalog_file)]) == 1
+        assert "A depends on unknown item B" in capsys.readouterr().out
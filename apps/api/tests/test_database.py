@@ -0,0 +1,117 @@
+"""
+リードレプリカ振り分けのテスト
+
+プライマリとレプリカに別々のSQLiteファイルを使い、
+どちらに振り分けられたかをテーブルの内容で判定する。
+"""
+import pytest
+from sqlalchemy import text
+
+from database import SessionRouter
+
+
+@pytest.fixture
+def session_router(tmp_path):
+    router = SessionRouter(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        [f"sqlite:///{tmp_path / 'replica.db'}"],
+        sticky_seconds=60
+    )
+    for engine in [router.primary] + router.replicas:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE marker (name TEXT)"))
+    with router.primary.begin() as conn:
+        conn.execute(text("INSERT INTO marker VALUES ('primary')"))
+    with router.replicas[0].begin() as conn:
+        conn.execute(text("INSERT INTO marker VALUES ('replica')"))
+    return router
+
+
+def _marker(db):
+    try:
+        return db.execute(text("SELECT name FROM marker")).scalar()
+    finally:
+        db.close()
+
+
+class TestSessionRouter:
+    """SessionRouterのテスト"""
+
+    def test_reads_go_to_replica(self, session_router):
+        """書き込みが無ければ読み取りはレプリカに送られること"""
+        assert _marker(session_router.read_session(1)) == "replica"
+        assert _marker(session_router.write_session(1)) == "primary"
+
+    def test_read_your_writes(self, session_router):
+        """書き込み後はそのプロジェクトとプロジェクト一覧の読み取りがプライマリに固定されること"""
+        session_router.record_write(1)
+
+        assert _marker(session_router.read_session(1)) == "primary"
+        assert _marker(session_router.read_session(None)) == "primary"
+        assert _marker(session_router.read_session(2)) == "replica"
+
+    def test_flush_marks_write(self, session_router):
+        """ORMのflushを伴うコミットで書き込みが記録されること"""
+        from sqlalchemy.orm import declarative_base
+        from sqlalchemy import Column, String
+
+        Base = declarative_base()
+
+        class Marker(Base):
+            __tablename__ = "marker"
+            name = Column(String, primary_key=True)
+
+        db = session_router.write_session(3)
+        db.add(Marker(name="orm"))
+        db.commit()
+        db.close()
+        assert session_router.is_sticky(3)
+
+    def test_global_write_sticks_all_reads(self, session_router):
+        """プロジェクトに紐づかない書き込みは全ての読み取りを固定すること"""
+        session_router.record_write()
+        assert _marker(session_router.read_session(5)) == "primary"
+
+    def test_sticky_window_expires(self, session_router):
+        """固定時間を過ぎたらレプリカに戻ること"""
+        session_router.sticky_seconds = 0
+        session_router.record_write(1)
+        assert _marker(session_router.read_session(1)) == "replica"
+
+    def test_core_update_marks_write(self, session_router):
+        """ORMのflushを伴わない update 文のコミットでも書き込みが記録されること"""
+        from sqlalchemy import column, table, update
+
+        db = session_router.write_session(4)
+        db.execute(update(table("marker", column("name"))).values(name="core"))
+        db.commit()
+        db.close()
+        assert session_router.is_sticky(4)
+
+    def test_select_does_not_mark_write(self, session_router):
+        """読み取りだけのコミットでは書き込みが記録されないこと"""
+        db = session_router.write_session(6)
+        db.execute(text("SELECT name FROM marker"))
+        db.commit()
+        db.close()
+        assert not session_router.is_sticky(6)
+
+    def test_replica_session_rejects_writes(self, session_router):
+        """レプリカのセッションでの書き込みはエラーになること"""
+        from database import ReadOnlySessionError
+
+        db = session_router.read_session(7)
+        with pytest.raises(ReadOnlySessionError):
+            db.execute(text("UPDATE marker SET name = 'written'"))
+        db.close()
+        assert _marker(session_router.read_session(7)) == "replica"
+
+    def test_min_revision_reads_primary(self, session_router):
+        """レプリカのリビジョンがクライアントの見たリビジョンより古ければプライマリで読むこと"""
+        for engine, revision in ((session_router.primary, 2), (session_router.replicas[0], 1)):
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE projects (id INTEGER, revision INTEGER)"))
+                conn.execute(text("INSERT INTO projects VALUES (8, :revision)"), {"revision": revision})
+
+        assert _marker(session_router.read_session(8, min_revision=1)) == "replica"
+        assert _marker(session_router.read_session(8, min_revision=2)) == "primary"
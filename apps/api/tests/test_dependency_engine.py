@@ -4,7 +4,7 @@
 import pytest
 import models
 import crud
-from services.dependency_engine import DependencyEngine
+from services.dependency_engine import DependencyEngine, repair_backlog_statuses
 
 
 class TestDependencyEngine:
@@ -88,6 +88,20 @@ class TestDependencyEngine:
         # TEST-002はTEST-001未回答のためBLOCKED
         assert status_map["TEST-002"] == models.BacklogStatus.BLOCKED
 
+    def test_backlog_status_update_numpy_backend(self, db_session, monkeypatch):
+        """ENGINE_BACKEND=numpy でも同じステータスになること（numpy が無い場合は純Pythonにフォールバック）"""
+        from config import get_settings
+        monkeypatch.setattr(get_settings(), "engine_backend", "numpy")
+        project = self._setup_catalog_and_project(db_session)
+        engine = DependencyEngine(db_session, project.id)
+        engine.update_backlog_statuses()
+
+        status_map = {item.config_item_id: item.status for item in crud.get_backlog_items(db_session, project.id)}
+        assert status_map == {
+            "TEST-001": models.BacklogStatus.READY,
+            "TEST-002": models.BacklogStatus.BLOCKED,
+        }
+
     def test_next_questions(self, db_session):
         """次の質問がREADYのもののみ返されること"""
         project = self._setup_catalog_and_project(db_session)
@@ -99,6 +113,80 @@ class TestDependencyEngine:
         assert "TEST-001" in ids
         assert "TEST-002" not in ids  # BLOCKEDなので含まれない
 
+    def test_dependency_graph_layers(self, db_session):
+        """グラフのノードにレイヤーとクリティカルパスが付き、レイヤー順に並ぶこと"""
+        project = self._setup_catalog_and_project(db_session)
+        engine = DependencyEngine(db_session, project.id)
+        graph = engine.get_dependency_graph()
+
+        nodes = {node["id"]: node for node in graph["nodes"]}
+        assert [node["id"] for node in graph["nodes"]] == ["TEST-001", "TEST-002"]
+        assert nodes["TEST-001"]["layer"] == 0
+        assert nodes["TEST-002"]["layer"] == 1
+        assert nodes["TEST-001"]["critical"] and nodes["TEST-002"]["critical"]
+        assert graph["critical_path_length"] == 2
+        assert graph["edges"] == [{"from": "TEST-001", "to": "TEST-002"}]
+
+    def test_impact_ranking(self, db_session):
+        """impactランキングでは下流を多く解放する項目が優先されること"""
+        items_data = [
+            {"id": "RANK-A", "title": "A", "priority": "P0", "depends_on": []},
+            {"id": "RANK-B", "title": "B", "priority": "P1", "depends_on": []},
+            {"id": "RANK-C", "title": "C", "priority": "P1", "depends_on": ["RANK-B"]},
+            {"id": "RANK-D", "title": "D", "priority": "P1", "depends_on": ["RANK-B"]},
+            {"id": "RANK-E", "title": "E", "priority": "P1", "depends_on": ["RANK-C", "RANK-D"]},
+        ]
+        for data in items_data:
+            crud.upsert_config_item(db_session, data)
+        from schemas import ProjectCreate
+        project = crud.create_project(db_session, ProjectCreate(name="RankingTest", mode="EXPERT"))
+        for data in items_data:
+            crud.create_backlog_item(db_session, project.id, data["id"])
+
+        engine = DependencyEngine(db_session, project.id)
+        engine.update_backlog_statuses()
+        # ダイヤモンド（C, D → E）のEは重複して数えない
+        assert engine.graph.downstream_counts["RANK-B"] == 3
+        assert engine.graph.downstream_counts["RANK-A"] == 0
+
+        assert [q.id for q in engine.get_next_questions(limit=2)] == ["RANK-A", "RANK-B"]
+        assert [q.id for q in engine.get_next_questions(limit=2, ranking="impact")] == ["RANK-B", "RANK-A"]
+
+    def test_downstream_counts_across_blocks(self, monkeypatch):
+        """下流項目数はビット集合の幅（ブロック）に関係なく同じで、グラフ構築時に求まっていること"""
+        import random
+        from types import SimpleNamespace
+        from services import catalog_graph
+
+        rng = random.Random(0)
+        items = [
+            SimpleNamespace(
+                id=f"N-{i:03d}", title="", priority="P1", module="FI", beginner_mode=True,
+                depends_on=[f"N-{j:03d}" for j in rng.sample(range(i), min(i, 3))]
+            )
+            for i in range(60)
+        ]
+        expected = catalog_graph.CatalogGraph(1, items).downstream_counts
+        monkeypatch.setattr(catalog_graph, "_REACH_BLOCK", 7)
+        assert catalog_graph.CatalogGraph(1, items).downstream_counts == expected
+        assert expected["N-059"] == 0
+        assert expected["N-000"] > 0
+
+    def test_repair_backlog_statuses(self, db_session):
+        """保存済みステータスのずれを修復し、リビジョンを進めること"""
+        project = self._setup_catalog_and_project(db_session)
+        assert repair_backlog_statuses(db_session) == {project.id: 2}
+
+        items = crud.get_backlog_items(db_session, project.id)
+        status_map = {item.config_item_id: item.status for item in items}
+        assert status_map["TEST-001"] == models.BacklogStatus.READY
+        assert status_map["TEST-002"] == models.BacklogStatus.BLOCKED
+        db_session.refresh(project)
+        assert project.revision == 2
+
+        # ずれがなければ何もしない
+        assert repair_backlog_statuses(db_session) == {}
+
     def test_expand_backlog_from_answer(self, db_session):
         """回答後にP1項目がバックログに展開されること"""
         project = self._setup_catalog_and_project(db_session)
@@ -123,6 +211,86 @@ class TestDependencyEngine:
         item_ids = [item.config_item_id for item in items]
         assert "TEST-003" in item_ids
 
+    def test_expand_backlog_transitively(self, db_session):
+        """追加された項目に依存する項目も同じパスで展開されること"""
+        project = self._setup_catalog_and_project(db_session)
+        crud.upsert_config_item(db_session, {
+            "id": "TEST-004",
+            "title": "テスト項目4",
+            "priority": "P1",
+            "inputs": [],
+            "depends_on": ["TEST-003"],
+            "produces": ["DECISION_LOG"],
+        })
+
+        from schemas import AnswerCreate
+        crud.create_answer(
+            db_session, project.id,
+            AnswerCreate(config_item_id="TEST-001", input_name="test_field", value="v")
+        )
+
+        engine = DependencyEngine(db_session, project.id)
+        added = engine.expand_backlog_from_answer("TEST-001")
+
+        status_map = {item.config_item_id: item.status for item in added}
+        # TEST-003はTEST-001回答済みでREADY、TEST-004はTEST-003未回答でBLOCKED
+        assert status_map == {
+            "TEST-003": models.BacklogStatus.READY,
+            "TEST-004": models.BacklogStatus.BLOCKED,
+        }
+
+    def test_preview_expansion_does_not_write(self, db_session):
+        """展開プレビューはDBを更新しないこと"""
+        project = self._setup_catalog_and_project(db_session)
+        engine = DependencyEngine(db_session, project.id)
+
+        preview = engine.compute_expansion("TEST-001")
+
+        assert [entry["config_item_id"] for entry in preview] == ["TEST-003"]
+        assert preview[0]["status"] == models.BacklogStatus.READY
+        assert "TEST-001" not in engine.answered_config_ids
+        items = crud.get_backlog_items(db_session, project.id)
+        assert "TEST-003" not in [item.config_item_id for item in items]
+
+    def test_simulate_beginner_chain(self, db_session):
+        """シミュレーションがスキップされる項目越しの依存元まで再計算し、DBは更新しないこと"""
+        from schemas import ProjectCreate
+        for item_id, beginner_mode, depends_on in [
+            ("SIM-A", True, []),
+            ("SIM-B", False, ["SIM-A"]),
+            ("SIM-C", True, ["SIM-B"]),
+        ]:
+            crud.upsert_config_item(db_session, {
+                "id": item_id,
+                "title": item_id,
+                "priority": "P0",
+                "inputs": [],
+                "depends_on": depends_on,
+                "produces": [],
+                "beginner_mode": beginner_mode,
+            })
+        project = crud.create_project(db_session, ProjectCreate(name="Simulate", mode="BEGINNER"))
+        for item_id in ("SIM-A", "SIM-B", "SIM-C"):
+            crud.create_backlog_item(db_session, project.id, item_id)
+        DependencyEngine(db_session, project.id, mode_filter="BEGINNER").update_backlog_statuses()
+
+        engine = DependencyEngine(db_session, project.id, mode_filter="BEGINNER")
+        result = engine.simulate(["SIM-A"])
+
+        changed = {entry["config_item_id"]: entry["status"] for entry in result["changed"]}
+        # SIM-C は初心者モードでスキップされる SIM-B 越しに SIM-A を待っていた
+        assert changed == {
+            "SIM-A": models.BacklogStatus.DONE,
+            "SIM-B": models.BacklogStatus.READY,
+            "SIM-C": models.BacklogStatus.READY,
+        }
+        assert result["progress"]["answered"] == 1
+        assert result["current_progress"] == {
+            "total": 2, "answered": 0, "ready": 1, "blocked": 1, "done": 0, "progress_percentage": 0
+        }
+        status_map = {item.config_item_id: item.status for item in crud.get_backlog_items(db_session, project.id)}
+        assert status_map["SIM-A"] == models.BacklogStatus.READY
+
     def test_dependency_graph(self, db_session):
         """依存関係グラフが正しく構築されること"""
         project = self._setup_catalog_and_project(db_session)
@@ -0,0 +1,112 @@
+"""
+イベント配信（SSE）のテスト
+"""
+import asyncio
+import threading
+
+from routers.events import event_stream
+from services.event_bus import EventBus, get_event_bus, format_sse
+
+
+class _FakeRequest:
+    """切断を指定回数後に通知するリクエストの代用"""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+class TestEventBus:
+    """EventBusのテスト"""
+
+    def test_publish_from_other_thread(self):
+        """別スレッドから発行したイベントが購読者に届くこと"""
+        bus = EventBus()
+
+        async def scenario():
+            subscription = bus.subscribe(1)
+            other = bus.subscribe(2)
+            thread = threading.Thread(target=bus.publish, args=(1, {'type': 'backlog', 'revision': 2}))
+            thread.start()
+            event = await subscription.get(timeout=1)
+            thread.join()
+            assert await other.get(timeout=0.05) is None
+            subscription.close()
+            other.close()
+            return event
+
+        assert asyncio.run(scenario()) == {'type': 'backlog', 'revision': 2}
+        assert bus.subscriber_count(1) == 0
+        assert not bus.has_listeners(1)
+
+    def test_event_stream(self):
+        """初期イベントの後に発行されたイベントを送り、切断で購読を解除すること"""
+        bus = EventBus()
+
+        async def scenario():
+            subscription = bus.subscribe(1)
+            bus.publish(1, {'type': 'artifacts', 'artifacts': []})
+            stream = event_stream(_FakeRequest(polls=1), subscription, {'type': 'progress', 'revision': 1})
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(scenario())
+        assert chunks[0] == format_sse({'type': 'progress', 'revision': 1})
+        assert chunks[1].startswith("event: artifacts\n")
+        assert bus.subscriber_count(1) == 0
+
+
+class TestProjectEvents:
+    """書き込み系APIからのイベント発行のテスト"""
+
+    def test_answer_publishes_backlog_event(self, client):
+        """回答送信でステータスの差分と進捗が配信されること"""
+        project_id = client.post("/api/projects/", json={"name": "SSEテスト"}).json()["id"]
+
+        async def scenario():
+            subscription = get_event_bus().subscribe(project_id)
+            try:
+                await asyncio.to_thread(
+                    client.post,
+                    f"/api/projects/{project_id}/wizard/answers",
+                    json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+                )
+                return await subscription.get(timeout=5)
+            finally:
+                subscription.close()
+
+        event = asyncio.run(scenario())
+        assert event['type'] == 'backlog'
+        assert event['revision'] == 2
+        assert {'config_item_id': 'FI-CORE-001', 'status': 'DONE'} in event['changed']
+        assert event['progress']['answered'] == 1
+
+    def test_events_unknown_project(self, client):
+        """存在しないプロジェクトは404になり、購読が残らないこと"""
+        assert client.get("/api/projects/99999/events").status_code == 404
+        assert get_event_bus().subscriber_count(99999) == 0
+
+    def test_event_during_initial_snapshot_is_delivered(self, client, monkeypatch):
+        """初期イベントの作成中に発行されたイベントも配信されること"""
+        from routers import events
+        from routers.events import stream_project_events
+        from tests.conftest import TestingSessionLocal
+        project_id = client.post("/api/projects/", json={"name": "SSE初期化テスト"}).json()["id"]
+        compute_progress = events.compute_progress
+
+        def publish_while_computing(db, project):
+            get_event_bus().publish(project_id, {'type': 'artifacts', 'artifacts': []})
+            return compute_progress(db, project)
+
+        monkeypatch.setattr(events, "compute_progress", publish_while_computing)
+
+        async def scenario():
+            response = await stream_project_events(project_id, _FakeRequest(polls=1), TestingSessionLocal)
+            return [chunk async for chunk in response.body_iterator]
+
+        chunks = asyncio.run(scenario())
+        assert "event: progress\n" in chunks[0]
+        assert chunks[1].startswith("event: artifacts\n")
+        assert get_event_bus().subscriber_count(project_id) == 0
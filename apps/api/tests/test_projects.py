@@ -58,6 +58,52 @@ class TestProjectsCRUD:
         assert "total_questions" in data
         assert "backlog_ready" in data
 
+    def test_open_tbds(self, client):
+        """全プロジェクトの未決定項目数を、多い順に優先度別・成果物別で取得できること"""
+        first = client.post("/api/projects/", json={"name": "TBD 1"}).json()["id"]
+        second = client.post("/api/projects/", json={"name": "TBD 2"}).json()["id"]
+        client.post(
+            f"/api/projects/{second}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+        client.post(f"/api/projects/{second}/artifacts/generate", json={"artifact_types": ["CONFIG_WORKBOOK"]})
+
+        response = client.get("/api/projects/open-tbds")
+        assert response.status_code == 200
+        summaries = {summary["project_id"]: summary for summary in response.json()}
+        assert list(summaries) == [first, second]
+
+        for project_id in (first, second):
+            backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+            summary = summaries[project_id]
+            assert summary["open_tbd"] == sum(1 for item in backlog if not item["answered"])
+            assert sum(summary["by_priority"].values()) == summary["open_tbd"]
+        assert summaries[first]["artifact_tbd"] == {}
+        assert summaries[second]["artifact_tbd"]["CONFIG_WORKBOOK"] == summaries[second]["open_tbd"]
+
+    def test_portfolio_export_csv(self, client):
+        """全プロジェクトの表を1つのCSVで出力できること"""
+        import csv
+        import io
+        first = client.post("/api/projects/", json={"name": "Export 1"}).json()["id"]
+        second = client.post("/api/projects/", json={"name": "Export 2"}).json()["id"]
+        client.post(
+            f"/api/projects/{second}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+
+        response = client.get("/api/projects/export/csv")
+        assert response.status_code == 200
+        assert "imgquest_config_items.csv" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+        for project_id in (first, second):
+            backlog = client.get(f"/api/projects/{project_id}/backlog").json()
+            assert sum(1 for row in rows if row["project_id"] == str(project_id)) == len(backlog)
+
+        response = client.get("/api/projects/export/csv?table=answers")
+        answers = list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+        assert [row["project_id"] for row in answers] == [str(second)]
+
     def test_get_project_not_found(self, client):
         """存在しないプロジェクトにアクセスすると404になること"""
         response = client.get("/api/projects/99999")
@@ -114,6 +114,23 @@ class TestWizardFlow:
         summary = summary_response.json()
         assert summary["by_status"].get("BLOCKED", 0) > 0
 
+    def test_impact_ranking(self, client):
+        """ranking=impactで質問を取得できること"""
+        project_id = self._create_project(client)
+
+        response = client.get(
+            f"/api/projects/{project_id}/wizard/questions",
+            params={"ranking": "impact"}
+        )
+        assert response.status_code == 200
+        assert response.json()["priority"] == "P0"
+
+        response = client.get(
+            f"/api/projects/{project_id}/wizard/questions",
+            params={"ranking": "random"}
+        )
+        assert response.status_code == 422
+
     def test_get_answers_for_item(self, client):
         """設定項目の回答を取得できること"""
         project_id = self._create_project(client)
@@ -175,3 +192,305 @@ class TestBacklogExpansion:
         updated_backlog = client.get(f"/api/projects/{project_id}/backlog")
         updated_count = len(updated_backlog.json())
         assert updated_count >= initial_count
+
+    def test_expansion_preview(self, client):
+        """展開プレビューが追加予定項目を返し、バックログは変わらないこと"""
+        response = client.post("/api/projects/", json={
+            "name": "プレビューテスト",
+            "mode": "EXPERT",
+        })
+        project_id = response.json()["id"]
+        initial_count = len(client.get(f"/api/projects/{project_id}/backlog").json())
+
+        response = client.get(
+            f"/api/projects/{project_id}/backlog/expansion-preview",
+            params={"config_item_id": "FI-CORE-001"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["config_item_id"] == "FI-CORE-001"
+        assert isinstance(data["items"], list)
+
+        updated_count = len(client.get(f"/api/projects/{project_id}/backlog").json())
+        assert updated_count == initial_count
+
+    def test_expansion_preview_unknown_item(self, client):
+        """存在しない設定項目のプレビューは404になること"""
+        response = client.post("/api/projects/", json={"name": "プレビュー404"})
+        project_id = response.json()["id"]
+
+        response = client.get(
+            f"/api/projects/{project_id}/backlog/expansion-preview",
+            params={"config_item_id": "NOPE-999"}
+        )
+        assert response.status_code == 404
+
+
+class TestAnswerHistory:
+    """回答履歴（版管理）のテスト"""
+
+    def _answer(self, client, project_id, value):
+        return client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": value}}
+        ).json()
+
+    def test_reanswer_keeps_history(self, client):
+        """再回答しても以前の回答が版として残り、決定事項は1件に保たれること"""
+        project_id = client.post("/api/projects/", json={"name": "履歴テスト"}).json()["id"]
+        first = self._answer(client, project_id, "K4")
+        second = self._answer(client, project_id, "V3")
+
+        assert (first["version"], second["version"]) == (1, 2)
+        assert first["decision_id"] == second["decision_id"]
+        decisions = client.get(f"/api/projects/{project_id}/wizard/decisions").json()
+        assert len(decisions) == 1
+        assert decisions[0]["rationale"] == "fiscal_year_variant: V3"
+
+        history = client.get(f"/api/projects/{project_id}/wizard/history/FI-CORE-001").json()
+        assert [version["answer_values"] for version in history] == [
+            {"fiscal_year_variant": "K4"},
+            {"fiscal_year_variant": "V3"},
+        ]
+
+    def test_as_of_and_diff(self, client):
+        """時点指定で過去の回答を復元でき、リビジョン間の差分を取得できること"""
+        project_id = client.post("/api/projects/", json={"name": "時点指定テスト"}).json()["id"]
+        first = self._answer(client, project_id, "K4")
+        self._answer(client, project_id, "V3")
+        base = f"/api/projects/{project_id}/wizard"
+
+        assert client.get(f"{base}/answers/FI-CORE-001").json() == {"fiscal_year_variant": "V3"}
+        assert client.get(f"{base}/answers/FI-CORE-001", params={"as_of": first["revision"]}).json() == {
+            "fiscal_year_variant": "K4"
+        }
+        assert client.get(f"{base}/answers", params={"as_of": 1}).json() == {}
+        assert client.get(f"{base}/answers").json() == {"FI-CORE-001": {"fiscal_year_variant": "V3"}}
+
+        diff = client.get(f"{base}/history/diff", params={"from_revision": first["revision"]}).json()
+        assert diff["items"] == [{
+            "config_item_id": "FI-CORE-001",
+            "change": "changed",
+            "from_version": 1,
+            "to_version": 2,
+            "inputs": [{"input_name": "fiscal_year_variant", "before": "K4", "after": "V3"}],
+        }]
+        diff = client.get(f"{base}/history/diff", params={"from_revision": 1}).json()
+        assert diff["items"][0]["change"] == "added"
+
+    def test_failed_save_keeps_revision(self, client, db_session, monkeypatch):
+        """保存に失敗した場合はリビジョンも進まないこと"""
+        import crud
+        import models
+        import schemas
+
+        project_id = client.post("/api/projects/", json={"name": "失敗テスト"}).json()["id"]
+        revision = db_session.query(models.Project.revision).filter(models.Project.id == project_id).scalar()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(crud, "get_decision_by_config_item", fail)
+        decision = schemas.DecisionCreate(config_item_id="FI-CORE-001", title="t", rationale="r")
+        with pytest.raises(RuntimeError):
+            crud.save_answer_version(db_session, project_id, "FI-CORE-001", {"fiscal_year_variant": "K4"}, decision)
+
+        assert db_session.query(models.Project.revision).filter(models.Project.id == project_id).scalar() == revision
+        assert crud.get_answer_versions(db_session, project_id, "FI-CORE-001") == []
+
+    def test_version_conflict_retries(self, client, db_session, monkeypatch):
+        """同時送信で版番号が衝突した場合はやり直して保存できること"""
+        import crud
+        import models
+        import schemas
+        from sqlalchemy.exc import IntegrityError
+
+        project_id = client.post("/api/projects/", json={"name": "衝突テスト"}).json()["id"]
+        revision = db_session.query(models.Project.revision).filter(models.Project.id == project_id).scalar()
+        original = crud.get_decision_by_config_item
+        calls = []
+
+        def conflict_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise IntegrityError("INSERT INTO answer_versions", {}, Exception("UNIQUE constraint failed"))
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(crud, "get_decision_by_config_item", conflict_once)
+        decision = schemas.DecisionCreate(config_item_id="FI-CORE-001", title="t", rationale="r")
+        db_version, _ = crud.save_answer_version(
+            db_session, project_id, "FI-CORE-001", {"fiscal_year_variant": "K4"}, decision
+        )
+
+        assert (db_version.version, db_version.revision) == (1, revision + 1)
+        assert len(crud.get_answer_versions(db_session, project_id, "FI-CORE-001")) == 1
+
+
+class TestSimulation:
+    """What-ifシミュレーションのテスト"""
+
+    def _create_project(self, client):
+        response = client.post("/api/projects/", json={"name": "シミュレーション", "mode": "EXPERT"})
+        return response.json()["id"]
+
+    def _backlog_statuses(self, client, project_id):
+        return {
+            item["config_item_id"]: item["status"]
+            for item in client.get(f"/api/projects/{project_id}/backlog").json()
+        }
+
+    def test_simulation_matches_actual_answer(self, client):
+        """シミュレーション結果が実際に回答した場合のバックログと一致し、DBは変わらないこと"""
+        project_id = self._create_project(client)
+        before = self._backlog_statuses(client, project_id)
+
+        response = client.post(
+            f"/api/projects/{project_id}/wizard/simulate",
+            json={"answered": ["FI-CORE-001"]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["revision"] == 1
+        changed = {item["config_item_id"]: item for item in data["changed"]}
+        assert changed["FI-CORE-001"]["previous_status"] == "READY"
+        assert changed["FI-CORE-001"]["status"] == "DONE"
+        assert data["progress"]["answered"] == data["current_progress"]["answered"] + 1
+
+        # DBは更新されない
+        assert self._backlog_statuses(client, project_id) == before
+        assert client.get(f"/api/projects/{project_id}").json()["revision"] == 1
+
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+        expected = dict(before)
+        expected.update({item["config_item_id"]: item["status"] for item in data["changed"] + data["added"]})
+        assert self._backlog_statuses(client, project_id) == expected
+        assert client.get(f"/api/projects/{project_id}/wizard/progress").json() == data["progress"]
+
+    def test_simulate_revert(self, client):
+        """回答の取り消しを仮定すると DONE の項目が戻ること"""
+        project_id = self._create_project(client)
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={"config_item_id": "FI-CORE-001", "answers": {"fiscal_year_variant": "K4"}}
+        )
+
+        response = client.post(
+            f"/api/projects/{project_id}/wizard/simulate",
+            json={"unanswered": ["FI-CORE-001"]}
+        )
+        assert response.status_code == 200
+        changed = {item["config_item_id"]: item for item in response.json()["changed"]}
+        assert changed["FI-CORE-001"]["previous_status"] == "DONE"
+        assert changed["FI-CORE-001"]["status"] == "READY"
+        assert response.json()["added"] == []
+
+    def test_simulate_invalid_items(self, client):
+        """存在しない設定項目は404、回答と取り消しの重複は422になること"""
+        project_id = self._create_project(client)
+
+        response = client.post(
+            f"/api/projects/{project_id}/wizard/simulate",
+            json={"answered": ["NOPE-999"]}
+        )
+        assert response.status_code == 404
+
+        response = client.post(
+            f"/api/projects/{project_id}/wizard/simulate",
+            json={"answered": ["FI-CORE-001"], "unanswered": ["FI-CORE-001"]}
+        )
+        assert response.status_code == 422
+
+
+class TestConditionalGet:
+    """ETagによる条件付きGETのテスト"""
+
+    def test_backlog_not_modified(self, client):
+        """If-None-Matchが一致すれば304を返すこと"""
+        response = client.post("/api/projects/", json={"name": "ETagテスト"})
+        project_id = response.json()["id"]
+
+        for path in ("backlog/", "backlog/summary", "backlog/graph", "wizard/progress"):
+            response = client.get(f"/api/projects/{project_id}/{path}")
+            assert response.status_code == 200
+            etag = response.headers["etag"]
+            assert "last-modified" in response.headers
+
+            response = client.get(f"/api/projects/{project_id}/{path}", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+
+    def test_etag_changes_after_answer(self, client):
+        """回答送信でリビジョンが進み、ETagが変わること"""
+        response = client.post("/api/projects/", json={"name": "ETag更新テスト"})
+        project_id = response.json()["id"]
+        etag = client.get(f"/api/projects/{project_id}/backlog/summary").headers["etag"]
+
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={
+                "config_item_id": "FI-CORE-001",
+                "answers": {"fiscal_year_variant": "K4"}
+            }
+        )
+
+        response = client.get(
+            f"/api/projects/{project_id}/backlog/summary",
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert client.get(f"/api/projects/{project_id}").json()["revision"] == 2
+
+    def test_graph_since_revision(self, client):
+        """since_revisionを指定するとステータスが変わったノードのみ返すこと"""
+        response = client.post("/api/projects/", json={"name": "グラフ差分テスト"})
+        project_id = response.json()["id"]
+        full = client.get(f"/api/projects/{project_id}/backlog/graph").json()
+        assert full["revision"] == 1
+        assert full["since_revision"] is None
+
+        client.post(
+            f"/api/projects/{project_id}/wizard/answers",
+            json={
+                "config_item_id": "FI-CORE-001",
+                "answers": {"fiscal_year_variant": "K4"}
+            }
+        )
+
+        delta = client.get(
+            f"/api/projects/{project_id}/backlog/graph",
+            params={"since_revision": full["revision"]}
+        ).json()
+        assert delta["revision"] == 2
+        assert delta["since_revision"] == 1
+        assert 0 < len(delta["nodes"]) < len(full["nodes"])
+        answered_node = next(node for node in delta["nodes"] if node["id"] == "FI-CORE-001")
+        assert answered_node["status"] == "DONE"
+
+        unchanged = client.get(
+            f"/api/projects/{project_id}/backlog/graph",
+            params={"since_revision": delta["revision"]}
+        ).json()
+        assert unchanged["nodes"] == []
+
+    def test_get_does_not_write(self, client, db_session):
+        """GETは保存済みステータスを返すだけで、再計算・更新しないこと"""
+        import models
+        response = client.post("/api/projects/", json={"name": "読み取り専用テスト"})
+        project_id = response.json()["id"]
+
+        item = db_session.query(models.BacklogItem).filter(
+            models.BacklogItem.project_id == project_id,
+            models.BacklogItem.config_item_id == "FI-CORE-001"
+        ).one()
+        item.status = models.BacklogStatus.BLOCKED
+        db_session.commit()
+
+        client.get(f"/api/projects/{project_id}/backlog/")
+        client.get(f"/api/projects/{project_id}/wizard/progress")
+        db_session.refresh(item)
+        assert item.status == models.BacklogStatus.BLOCKED
+
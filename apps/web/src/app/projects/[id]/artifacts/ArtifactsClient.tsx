@@ -3,7 +3,7 @@
 import { useEffect, useState } from 'react';
 import { useRouter, useParams } from 'next/navigation';
 import { artifactsAPI } from '@/lib/api-client';
-import { Artifact, ArtifactType } from '@/lib/types';
+import { Artifact, ArtifactSummary, ArtifactType } from '@/lib/types';
 import HelpButton from '@/components/HelpButton';
 
 const ARTIFACT_TYPES: { value: ArtifactType; label: string; description: string }[] = [
@@ -53,22 +53,29 @@ export default function ArtifactsPage() {
     try {
       setLoading(true);
       setError(null);
+      // 一覧（本文なし、新しい順）から各タイプの最新の版を選ぶ
       const data = await artifactsAPI.list(projectId);
+      const latest = new Map<ArtifactType, ArtifactSummary>();
+      data.forEach((summary: ArtifactSummary) => {
+        if (!latest.has(summary.artifact_type)) {
+          latest.set(summary.artifact_type, summary);
+        }
+      });
       
-      // 各タイプの最新成果物を取得
+      // 最新の版の本文だけを取得
       const artifactMap: Record<ArtifactType, Artifact | null> = {
         DECISION_LOG: null,
         CONFIG_WORKBOOK: null,
         TEST_VIEW: null,
         MIGRATION_VIEW: null,
       };
-      
-      data.forEach((artifact: Artifact) => {
-        if (!artifactMap[artifact.artifact_type] || 
-            new Date(artifact.created_at) > new Date(artifactMap[artifact.artifact_type]!.created_at)) {
-          artifactMap[artifact.artifact_type] = artifact;
-        }
-      });
+      await Promise.all(
+        Array.from(latest.values()).map(async (summary) => {
+          artifactMap[summary.artifact_type] = await artifactsAPI.getById(
+            projectId, summary.artifact_type, summary.id
+          );
+        })
+      );
       
       setArtifacts(artifactMap);
     } catch (err: any) {
@@ -96,6 +103,10 @@ export default function ArtifactsPage() {
     window.open(url, '_blank');
   };
 
+  const handleDownloadPdf = (artifactType: ArtifactType) => {
+    window.open(artifactsAPI.pdfUrl(projectId, artifactType), '_blank');
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-96">
@@ -207,12 +218,20 @@ export default function ArtifactsPage() {
                       </div>
                     )}
                   </div>
-                  <button
-                    onClick={() => handleDownload(activeTab)}
-                    className="btn btn-primary"
-                  >
-                    📥 ダウンロード
-                  </button>
+                  <div className="flex gap-2">
+                    <button
+                      onClick={() => handleDownload(activeTab)}
+                      className="btn btn-primary"
+                    >
+                      📥 ダウンロード
+                    </button>
+                    <button
+                      onClick={() => handleDownloadPdf(activeTab)}
+                      className="btn btn-secondary"
+                    >
+                      📄 PDF
+                    </button>
+                  </div>
                 </div>
 
                 {/* Markdownプレビュー */}
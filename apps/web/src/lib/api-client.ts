@@ -1,5 +1,10 @@
 // APIクライアント
 
+import type {
+  AnswerDiff, AnswerVersion, Artifact, ArtifactSummary, ExportTable, ProjectTbdSummary, SimulationRequest,
+  SimulationResult,
+} from './types';
+
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8001';
 
 class APIError extends Error {
@@ -9,16 +14,27 @@ class APIError extends Error {
   }
 }
 
+// プロジェクトごとに最後に受け取ったリビジョン（X-Min-Revision で送り、古いレプリカからの読み取りを避ける）
+const lastRevisions = new Map<number, number>();
+
+function projectIdOf(endpoint: string): number | null {
+  const match = endpoint.match(/^\/api\/projects\/(\d+)/);
+  return match ? Number(match[1]) : null;
+}
+
 async function fetchAPI<T>(
   endpoint: string,
   options: RequestInit = {}
 ): Promise<T> {
   const url = `${API_URL}${endpoint}`;
+  const projectId = projectIdOf(endpoint);
+  const minRevision = projectId !== null ? lastRevisions.get(projectId) : undefined;
   
   const response = await fetch(url, {
     ...options,
     headers: {
       'Content-Type': 'application/json',
+      ...(minRevision !== undefined ? { 'X-Min-Revision': String(minRevision) } : {}),
       ...options.headers,
     },
   });
@@ -39,7 +55,11 @@ async function fetchAPI<T>(
     return null as T;
   }
 
-  return response.json();
+  const data = await response.json();
+  if (projectId !== null && typeof data?.revision === 'number') {
+    lastRevisions.set(projectId, Math.max(data.revision, lastRevisions.get(projectId) ?? 0));
+  }
+  return data;
 }
 
 // ========== Projects ==========
@@ -65,19 +85,41 @@ export const projectsAPI = {
     fetchAPI<void>(`/api/projects/${id}`, {
       method: 'DELETE',
     }),
+  
+  // 全プロジェクトの未決定（TBD）項目数（多い順）
+  openTbds: () => fetchAPI<ProjectTbdSummary[]>('/api/projects/open-tbds'),
+  
+  // 全プロジェクトの表形式エクスポート
+  exportCsvUrl: (table: ExportTable = 'config_items') =>
+    `${API_URL}/api/projects/export/csv?table=${table}`,
+  
+  exportParquetUrl: (table: ExportTable = 'config_items') =>
+    `${API_URL}/api/projects/export/parquet?table=${table}`,
 };
 
 // ========== Wizard ==========
 
 export const wizardAPI = {
-  getNextQuestion: (projectId: number) =>
-    fetchAPI<any>(`/api/projects/${projectId}/wizard/questions`),
+  // ranking: 'priority'（優先度順）/ 'impact'（解放する下流項目が多い順）
+  getNextQuestion: (projectId: number, ranking?: 'priority' | 'impact') =>
+    fetchAPI<any>(`/api/projects/${projectId}/wizard/questions${ranking ? `?ranking=${ranking}` : ''}`),
   
   getQuestionById: (projectId: number, configItemId: string) =>
     fetchAPI<any>(`/api/projects/${projectId}/wizard/questions/${configItemId}`),
   
-  getAnswersForItem: (projectId: number, configItemId: string) =>
-    fetchAPI<Record<string, any>>(`/api/projects/${projectId}/wizard/answers/${configItemId}`),
+  // asOf: プロジェクトリビジョン（指定した場合はその時点の回答）
+  getAnswersForItem: (projectId: number, configItemId: string, asOf?: number) =>
+    fetchAPI<Record<string, any>>(
+      `/api/projects/${projectId}/wizard/answers/${configItemId}${asOf !== undefined ? `?as_of=${asOf}` : ''}`
+    ),
+  
+  getItemHistory: (projectId: number, configItemId: string) =>
+    fetchAPI<AnswerVersion[]>(`/api/projects/${projectId}/wizard/history/${configItemId}`),
+  
+  getHistoryDiff: (projectId: number, fromRevision: number, toRevision?: number) =>
+    fetchAPI<AnswerDiff>(
+      `/api/projects/${projectId}/wizard/history/diff?from_revision=${fromRevision}${toRevision !== undefined ? `&to_revision=${toRevision}` : ''}`
+    ),
   
   submitAnswer: (projectId: number, data: any) =>
     fetchAPI<any>(`/api/projects/${projectId}/wizard/answers`, {
@@ -88,6 +130,13 @@ export const wizardAPI = {
   getProgress: (projectId: number) =>
     fetchAPI<any>(`/api/projects/${projectId}/wizard/progress`),
   
+  // 回答の追加・取り消しを仮定した場合のバックログ（DBは更新しない）
+  simulate: (projectId: number, data: SimulationRequest) =>
+    fetchAPI<SimulationResult>(`/api/projects/${projectId}/wizard/simulate`, {
+      method: 'POST',
+      body: JSON.stringify(data),
+    }),
+  
   getDecisions: (projectId: number) =>
     fetchAPI<any[]>(`/api/projects/${projectId}/wizard/decisions`),
 };
@@ -100,8 +149,10 @@ export const backlogAPI = {
     return fetchAPI<any[]>(`/api/projects/${projectId}/backlog${params}`);
   },
   
-  getGraph: (projectId: number) =>
-    fetchAPI<any>(`/api/projects/${projectId}/backlog/graph`),
+  getGraph: (projectId: number, sinceRevision?: number) => {
+    const params = sinceRevision !== undefined ? `?since_revision=${sinceRevision}` : '';
+    return fetchAPI<any>(`/api/projects/${projectId}/backlog/graph${params}`);
+  },
   
   getSummary: (projectId: number) =>
     fetchAPI<any>(`/api/projects/${projectId}/backlog/summary`),
@@ -122,20 +173,63 @@ export const artifactsAPI = {
       body: JSON.stringify({ artifact_types: artifactTypes }),
     }),
   
-  list: (projectId: number) =>
-    fetchAPI<any[]>(`/api/projects/${projectId}/artifacts`),
+  // 本文を含まない一覧（新しい順）。続きは before に前ページ最後のIDを渡す
+  list: (projectId: number, options: { limit?: number; before?: number; artifactType?: string } = {}) => {
+    const params = new URLSearchParams();
+    if (options.limit !== undefined) params.set('limit', String(options.limit));
+    if (options.before !== undefined) params.set('before', String(options.before));
+    if (options.artifactType) params.set('artifact_type', options.artifactType);
+    const query = params.toString();
+    return fetchAPI<ArtifactSummary[]>(`/api/projects/${projectId}/artifacts${query ? `?${query}` : ''}`);
+  },
   
   getByType: (projectId: number, artifactType: string) =>
-    fetchAPI<any>(`/api/projects/${projectId}/artifacts/${artifactType}`),
+    fetchAPI<Artifact>(`/api/projects/${projectId}/artifacts/${artifactType}`),
+  
+  getById: (projectId: number, artifactType: string, artifactId: number) =>
+    fetchAPI<Artifact>(`/api/projects/${projectId}/artifacts/${artifactType}/${artifactId}`),
   
   downloadUrl: (projectId: number, artifactType: string) =>
     `${API_URL}/api/projects/${projectId}/artifacts/${artifactType}/download`,
   
+  downloadVersionUrl: (projectId: number, artifactType: string, artifactId: number) =>
+    `${API_URL}/api/projects/${projectId}/artifacts/${artifactType}/${artifactId}/download`,
+  
+  pdfUrl: (projectId: number, artifactType: string) =>
+    `${API_URL}/api/projects/${projectId}/artifacts/${artifactType}/pdf`,
+  
   exportJsonUrl: (projectId: number) =>
     `${API_URL}/api/projects/${projectId}/artifacts/export/json`,
   
   exportXlsxUrl: (projectId: number) =>
     `${API_URL}/api/projects/${projectId}/artifacts/export/xlsx`,
+  
+  // 表形式エクスポート（config_items / decisions / answers）
+  exportCsvUrl: (projectId: number, table: ExportTable = 'config_items') =>
+    `${API_URL}/api/projects/${projectId}/artifacts/export/csv?table=${table}`,
+  
+  exportParquetUrl: (projectId: number, table: ExportTable = 'config_items') =>
+    `${API_URL}/api/projects/${projectId}/artifacts/export/parquet?table=${table}`,
+  
+  // 組み込み + ARTIFACT_TEMPLATE_DIR のテンプレート名
+  listTemplates: (projectId: number) =>
+    fetchAPI<string[]>(`/api/projects/${projectId}/artifacts/templates`),
+  
+  renderTemplateUrl: (projectId: number, templateName: string) =>
+    `${API_URL}/api/projects/${projectId}/artifacts/render/${templateName}`,
+};
+
+// ========== Events (SSE) ==========
+
+export const eventsAPI = {
+  // backlog / progress / artifacts イベントを購読し、解除関数を返す
+  subscribe: (projectId: number, onEvent: (type: string, data: any) => void) => {
+    const source = new EventSource(`${API_URL}/api/projects/${projectId}/events`);
+    for (const type of ['progress', 'backlog', 'artifacts']) {
+      source.addEventListener(type, (event) => onEvent(type, JSON.parse((event as MessageEvent).data)));
+    }
+    return () => source.close();
+  },
 };
 
 export { APIError };
@@ -11,10 +11,23 @@ export interface Project {
   industry: string | null;
   company_count: number | null;
   description: string | null;
+  modules: string[] | null;
   created_at: string;
   updated_at: string;
 }
 
+// プロジェクトごとの未決定（TBD）項目数
+export interface ProjectTbdSummary {
+  project_id: number;
+  name: string;
+  open_tbd: number;
+  by_priority: Record<string, number>;
+  artifact_tbd: Partial<Record<ArtifactType, number>>;
+}
+
+// CSV / Parquet エクスポートの表
+export type ExportTable = 'config_items' | 'decisions' | 'answers';
+
 export interface ProjectWithStats extends Project {
   total_questions: number;
   answered_questions: number;
@@ -31,10 +44,12 @@ export interface ProjectCreate {
   industry?: string;
   company_count?: number;
   description?: string;
+  modules?: string[];
 }
 
 export interface ConfigItem {
   id: string;
+  module: string | null;
   title: string;
   description: string | null;
   priority: string | null;
@@ -42,6 +57,8 @@ export interface ConfigItem {
   depends_on: string[];
   produces: string[];
   notes: string[] | null;
+  test_perspectives: string[] | null;
+  migration_object: string | null;
 }
 
 export interface ConfigItemInput {
@@ -112,6 +129,17 @@ export interface Artifact {
   created_at: string;
 }
 
+// 成果物一覧の項目（本文は含まない）
+export interface ArtifactSummary {
+  id: number;
+  project_id: number;
+  artifact_type: ArtifactType;
+  tbd_count: number;
+  created_at: string;
+  size: number;
+  content_hash: string;
+}
+
 export interface WizardProgress {
   total: number;
   answered: number;
@@ -121,12 +149,60 @@ export interface WizardProgress {
   progress_percentage: number;
 }
 
+// 回答・決定事項の版（追記のみの履歴）
+export interface AnswerVersion {
+  config_item_id: string;
+  version: number;
+  revision: number; // 記録時のプロジェクトリビジョン
+  answer_values: Record<string, any> | null;
+  decision_title: string | null;
+  decision_rationale: string | null;
+  decision_impact: string | null;
+  created_at: string | null;
+}
+
+export interface AnswerDiff {
+  from_revision: number;
+  to_revision: number;
+  items: {
+    config_item_id: string;
+    change: 'added' | 'removed' | 'changed';
+    from_version: number | null;
+    to_version: number | null;
+    inputs: { input_name: string; before: any; after: any }[];
+  }[];
+}
+
+// What-ifシミュレーション（DBは更新しない）
+export interface SimulationRequest {
+  answered?: string[];   // 回答したと仮定する設定項目ID
+  unanswered?: string[]; // 回答を取り消したと仮定する設定項目ID
+}
+
+export interface SimulatedItem {
+  config_item_id: string;
+  title: string;
+  priority: string | null;
+  status: string;
+  previous_status: string | null; // 追加される項目の場合はnull
+}
+
+export interface SimulationResult {
+  revision: number;
+  changed: SimulatedItem[];
+  added: SimulatedItem[];
+  progress: WizardProgress;
+  current_progress: WizardProgress;
+}
+
 export interface DependencyGraphNode {
   id: string;
   label: string;
   priority: string;
   status: string;
   answered: boolean;
+  layer?: number;     // トポロジカル深さ（0 = 依存なし）
+  critical?: boolean; // クリティカルパス上の項目
 }
 
 export interface DependencyGraphEdge {
@@ -137,4 +213,8 @@ export interface DependencyGraphEdge {
 export interface DependencyGraph {
   nodes: DependencyGraphNode[];
   edges: DependencyGraphEdge[];
+  revision?: number;
+  catalog_version?: number;
+  since_revision?: number | null; // 差分レスポンスの場合の起点リビジョン
+  critical_path_length?: number;
 }